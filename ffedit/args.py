@@ -57,6 +57,10 @@ def apply_args(args : Args, apply_state_item : ApplyStateItem) -> None:
 	apply_state_item('face_detector_size', args.get('face_detector_size'))
 	apply_state_item('face_detector_angles', args.get('face_detector_angles'))
 	apply_state_item('face_detector_score', args.get('face_detector_score'))
+	apply_state_item('face_detector_mode', args.get('face_detector_mode'))
+	apply_state_item('face_detector_interval', args.get('face_detector_interval'))
+	apply_state_item('scene_cut_threshold', args.get('scene_cut_threshold'))
+	apply_state_item('face_tracker_score', args.get('face_tracker_score'))
 	# face landmarker
 	apply_state_item('face_landmarker_model', args.get('face_landmarker_model'))
 	apply_state_item('face_landmarker_score', args.get('face_landmarker_score'))
@@ -82,8 +86,12 @@ def apply_args(args : Args, apply_state_item : ApplyStateItem) -> None:
 	apply_state_item('trim_frame_start', args.get('trim_frame_start'))
 	apply_state_item('trim_frame_end', args.get('trim_frame_end'))
 	apply_state_item('temp_frame_format', args.get('temp_frame_format'))
+	apply_state_item('video_pipeline', args.get('video_pipeline'))
+	apply_state_item('frame_duplicate_threshold', args.get('frame_duplicate_threshold'))
+	apply_state_item('shard', args.get('shard'))
 	apply_state_item('keep_temp', args.get('keep_temp'))
 	# output creation
+	apply_state_item('image_pipeline', args.get('image_pipeline'))
 	apply_state_item('output_image_quality', args.get('output_image_quality'))
 	if is_image(args.get('target_path')):
 		output_image_resolution = detect_image_resolution(args.get('target_path'))
@@ -121,7 +129,14 @@ def apply_args(args : Args, apply_state_item : ApplyStateItem) -> None:
 	apply_state_item('execution_device_id', args.get('execution_device_id'))
 	apply_state_item('execution_providers', args.get('execution_providers'))
 	apply_state_item('execution_thread_count', args.get('execution_thread_count'))
+	apply_state_item('execution_backend', args.get('execution_backend'))
 	apply_state_item('execution_queue_count', args.get('execution_queue_count'))
+	apply_state_item('execution_read_ahead_count', args.get('execution_read_ahead_count'))
+	apply_state_item('execution_write_behind_count', args.get('execution_write_behind_count'))
+	apply_state_item('execution_batch_size', args.get('execution_batch_size'))
+	apply_state_item('execution_batch_wait', args.get('execution_batch_wait'))
+	apply_state_item('execution_segment_count', args.get('execution_segment_count'))
+	apply_state_item('execution_model_limits', args.get('execution_model_limits'))
 	# download
 	apply_state_item('download_providers', args.get('download_providers'))
 	apply_state_item('download_scope', args.get('download_scope'))
@@ -131,6 +146,7 @@ def apply_args(args : Args, apply_state_item : ApplyStateItem) -> None:
 	# memory
 	apply_state_item('video_memory_strategy', args.get('video_memory_strategy'))
 	apply_state_item('system_memory_limit', args.get('system_memory_limit'))
+	apply_state_item('temp_memory_limit', args.get('temp_memory_limit'))
 	# misc
 	apply_state_item('log_level', args.get('log_level'))
 	apply_state_item('halt_on_error', args.get('halt_on_error'))
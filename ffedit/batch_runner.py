@@ -0,0 +1,97 @@
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed
+from time import time
+from types import ModuleType
+from typing import Dict, List, Optional, Tuple
+
+from tqdm import tqdm
+
+from ffedit import cli_helper, logger, process_manager, state_manager, wording
+from ffedit.content_analyser import analyse_frame
+from ffedit.filesystem import in_directory, same_file_extension
+from ffedit.processors.core import create_reference_faces, get_processors_modules, get_source_face, process_vision_frame
+from ffedit.types import BatchTask, Face, Resolution
+from ffedit.vision import create_image_options, create_image_resolutions, detect_image_resolution, read_image, resize_frame, restrict_image_resolution, unpack_resolution, write_image
+
+
+def run_batch_images(batch_tasks : List[BatchTask], output_image_resolution : Optional[str]) -> bool:
+	start_time = time()
+	processor_modules = get_processors_modules(state_manager.get_item('processors'))
+	source_face_set : Dict[Tuple[str, ...], Optional[Face]] = {}
+	failed_batch_tasks : List[Tuple[BatchTask, str]] = []
+
+	for batch_task in batch_tasks:
+		source_paths = tuple(batch_task.get('source_paths') or [])
+		if source_paths not in source_face_set:
+			source_face_set[source_paths] = get_source_face(list(source_paths))
+
+	process_manager.start()
+	with tqdm(total = len(batch_tasks), desc = wording.get('processing'), unit = 'image', ascii = ' =', disable = state_manager.get_item('log_level') in [ 'warn', 'error' ]) as progress:
+		progress.set_postfix(execution_providers = state_manager.get_item('execution_providers'))
+		with ThreadPoolExecutor(max_workers = state_manager.get_item('execution_thread_count')) as executor:
+			futures : Dict[Future[Optional[str]], BatchTask] = {}
+
+			for batch_task in batch_tasks:
+				source_face = source_face_set.get(tuple(batch_task.get('source_paths') or []))
+				future = executor.submit(process_batch_image, processor_modules, source_face, output_image_resolution, batch_task)
+				futures[future] = batch_task
+
+			for future in as_completed(futures):
+				try:
+					error_reason = future.result()
+				except Exception as exception:
+					error_reason = str(exception) or type(exception).__name__
+				if error_reason:
+					failed_batch_tasks.append((futures[future], error_reason))
+				progress.update()
+
+	for processor_module in processor_modules:
+		processor_module.post_process()
+	process_manager.end()
+	report_batch_images(batch_tasks, failed_batch_tasks, start_time)
+	return not failed_batch_tasks
+
+
+def process_batch_image(processor_modules : List[ModuleType], source_face : Optional[Face], output_image_resolution : Optional[str], batch_task : BatchTask) -> Optional[str]:
+	target_path = batch_task.get('target_path')
+	output_path = batch_task.get('output_path')
+
+	if not process_manager.is_processing():
+		return wording.get('batch_image_stopped')
+	if not in_directory(output_path) or not same_file_extension(target_path, output_path):
+		return wording.get('batch_image_invalid_output')
+
+	target_vision_frame = read_image(target_path)
+	if target_vision_frame is None:
+		return wording.get('batch_image_invalid_target')
+	if analyse_frame(target_vision_frame):
+		return wording.get('batch_image_content_rejected')
+
+	target_image_resolution = resolve_output_image_resolution(target_path, output_image_resolution)
+	temp_image_resolution = restrict_image_resolution(target_path, target_image_resolution)
+	temp_vision_frame = resize_frame(target_vision_frame, temp_image_resolution)
+	reference_faces = create_reference_faces(batch_task.get('source_paths') or [], target_vision_frame) if 'reference' in state_manager.get_item('face_selector_mode') else None
+	output_vision_frame = process_vision_frame(processor_modules, reference_faces, source_face, None, 0, 0, temp_vision_frame)
+	output_vision_frame = resize_frame(output_vision_frame, target_image_resolution)
+
+	if not write_image(output_path, output_vision_frame, create_image_options(output_path, state_manager.get_item('output_image_quality'))):
+		return wording.get('batch_image_write_failed')
+	return None
+
+
+def resolve_output_image_resolution(target_path : str, output_image_resolution : Optional[str]) -> Resolution:
+	target_image_resolution = detect_image_resolution(target_path)
+	target_image_resolutions = create_image_resolutions(target_image_resolution)
+
+	if output_image_resolution in target_image_resolutions:
+		return unpack_resolution(output_image_resolution)
+	return target_image_resolution
+
+
+def report_batch_images(batch_tasks : List[BatchTask], failed_batch_tasks : List[Tuple[BatchTask, str]], start_time : float) -> None:
+	seconds = '{:.2f}'.format(time() - start_time)
+
+	if failed_batch_tasks:
+		batch_headers = [ 'target_path', 'output_path', 'reason' ]
+		batch_contents = [ [ batch_task.get('target_path'), batch_task.get('output_path'), error_reason ] for batch_task, error_reason in failed_batch_tasks ]
+		cli_helper.render_table(batch_headers, batch_contents)
+	logger.info(wording.get('processing_batch_report').format(image_total = len(batch_tasks), succeed_total = len(batch_tasks) - len(failed_batch_tasks), failed_total = len(failed_batch_tasks), seconds = seconds), __name__)
@@ -75,6 +75,7 @@ def cycle(cycle_count : int) -> BenchmarkCycleSet:
 	{
 		'target_path': state_manager.get_item('target_path'),
 		'cycle_count': cycle_count,
+		'execution_backend': state_manager.get_item('execution_backend'),
 		'average_run': average_run,
 		'fastest_run': fastest_run,
 		'slowest_run': slowest_run,
@@ -93,6 +94,7 @@ def render() -> None:
 	[
 		'target_path',
 		'cycle_count',
+		'execution_backend',
 		'average_run',
 		'fastest_run',
 		'slowest_run',
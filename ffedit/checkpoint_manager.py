@@ -0,0 +1,105 @@
+import os
+from typing import List, Optional
+
+from ffedit.filesystem import is_file
+from ffedit.json import read_json, write_json
+from ffedit.temp_helper import get_temp_directory_path
+from ffedit.types import Checkpoint, FrameRange
+
+
+def get_checkpoint_path(target_path : str) -> str:
+	return os.path.join(get_temp_directory_path(target_path), 'checkpoint.json')
+
+
+def create_checkpoint(target_path : str, checkpoint_hash : str) -> bool:
+	checkpoint : Checkpoint =\
+	{
+		'checkpoint_hash': checkpoint_hash,
+		'frames_extracted': False,
+		'frames_processed': {}
+	}
+	return write_json(get_checkpoint_path(target_path), checkpoint) #type:ignore[arg-type]
+
+
+def read_checkpoint(target_path : str) -> Optional[Checkpoint]:
+	return read_json(get_checkpoint_path(target_path)) #type:ignore[return-value]
+
+
+def validate_checkpoint(target_path : str, checkpoint_hash : str) -> bool:
+	checkpoint = read_checkpoint(target_path)
+	return bool(checkpoint) and checkpoint.get('checkpoint_hash') == checkpoint_hash
+
+
+def has_frames_extracted(target_path : str) -> bool:
+	checkpoint = read_checkpoint(target_path)
+	return bool(checkpoint) and checkpoint.get('frames_extracted') is True
+
+
+def set_frames_extracted(target_path : str) -> bool:
+	checkpoint = read_checkpoint(target_path)
+
+	if checkpoint:
+		checkpoint['frames_extracted'] = True
+		return write_json(get_checkpoint_path(target_path), checkpoint) #type:ignore[arg-type]
+	return False
+
+
+def get_frame_journal_path(target_path : str, processor : str) -> str:
+	return os.path.join(get_temp_directory_path(target_path), 'checkpoint.' + processor + '.log')
+
+
+def read_frame_journal(target_path : str, processor : str) -> List[int]:
+	frame_journal_path = get_frame_journal_path(target_path, processor)
+
+	if is_file(frame_journal_path):
+		with open(frame_journal_path) as frame_journal_file:
+			return [ int(frame_number) for frame_number in frame_journal_file.read().split('\n')[:-1] if frame_number.isdigit() ]
+	return []
+
+
+def get_processed_frame_numbers(target_path : str, processor : str) -> List[int]:
+	checkpoint = read_checkpoint(target_path)
+
+	if checkpoint:
+		processed_frame_numbers = unpack_frame_ranges(checkpoint.get('frames_processed').get(processor, []))
+		return sorted(set(processed_frame_numbers + read_frame_journal(target_path, processor)))
+	return []
+
+
+def append_processed_frame_number(target_path : str, processor : str, frame_number : int) -> bool:
+	frame_journal_path = get_frame_journal_path(target_path, processor)
+
+	if is_file(get_checkpoint_path(target_path)):
+		with open(frame_journal_path, 'a') as frame_journal_file:
+			frame_journal_file.write(str(frame_number) + '\n')
+		return True
+	return False
+
+
+def append_processed_frame_numbers(target_path : str, processor : str, frame_numbers : List[int]) -> bool:
+	checkpoint = read_checkpoint(target_path)
+
+	if checkpoint:
+		processed_frame_numbers = unpack_frame_ranges(checkpoint.get('frames_processed').get(processor, []))
+		checkpoint['frames_processed'][processor] = pack_frame_ranges(processed_frame_numbers + frame_numbers)
+		return write_json(get_checkpoint_path(target_path), checkpoint) #type:ignore[arg-type]
+	return False
+
+
+def pack_frame_ranges(frame_numbers : List[int]) -> List[FrameRange]:
+	frame_ranges : List[FrameRange] = []
+
+	for frame_number in sorted(set(frame_numbers)):
+		if frame_ranges and frame_ranges[-1][1] == frame_number:
+			frame_ranges[-1][1] = frame_number + 1
+		else:
+			frame_ranges.append([ frame_number, frame_number + 1 ])
+	return frame_ranges
+
+
+def unpack_frame_ranges(frame_ranges : List[FrameRange]) -> List[int]:
+	frame_numbers : List[int] = []
+
+	for frame_start, frame_end in frame_ranges:
+		frame_numbers.extend(range(frame_start, frame_end))
+	return frame_numbers
@@ -2,7 +2,7 @@ import logging
 from typing import List, Sequence
 
 from ffedit.common_helper import create_float_range, create_int_range
-from ffedit.types import Angle, AudioEncoder, AudioFormat, AudioTypeSet, BenchmarkResolution, BenchmarkSet, DownloadProvider, DownloadProviderSet, DownloadScope, EncoderSet, ExecutionProvider, ExecutionProviderSet, FaceDetectorModel, FaceDetectorSet, FaceLandmarkerModel, FaceMaskArea, FaceMaskAreaSet, FaceMaskRegion, FaceMaskRegionSet, FaceMaskType, FaceOccluderModel, FaceParserModel, FaceSelectorMode, FaceSelectorOrder, Gender, ImageFormat, ImageTypeSet, JobStatus, LogLevel, LogLevelSet, Race, Score, TempFrameFormat, UiWorkflow, VideoEncoder, VideoFormat, VideoMemoryStrategy, VideoPreset, VideoTypeSet, WebcamMode
+from ffedit.types import Angle, AudioEncoder, AudioFormat, AudioTypeSet, BenchmarkResolution, BenchmarkSet, DownloadProvider, DownloadProviderSet, DownloadScope, EncoderSet, ExecutionBackend, ExecutionProvider, ExecutionProviderSet, FaceDetectorMode, FaceDetectorModel, FaceDetectorSet, FaceLandmarkerModel, FaceMaskArea, FaceMaskAreaSet, FaceMaskRegion, FaceMaskRegionSet, FaceMaskType, FaceOccluderModel, FaceParserModel, FaceSelectorMode, FaceSelectorOrder, Gender, ImageFormat, ImagePipeline, ImageTypeSet, JobStatus, LogLevel, LogLevelSet, Race, Score, TempFrameFormat, UiWorkflow, VideoEncoder, VideoFormat, VideoMemoryStrategy, VideoPipeline, VideoPreset, VideoTypeSet, WebcamMode
 
 face_detector_set : FaceDetectorSet =\
 {
@@ -12,6 +12,7 @@ face_detector_set : FaceDetectorSet =\
 	'yolo_face': [ '640x640' ]
 }
 face_detector_models : List[FaceDetectorModel] = list(face_detector_set.keys())
+face_detector_modes : List[FaceDetectorMode] = [ 'full', 'roi' ]
 face_landmarker_models : List[FaceLandmarkerModel] = [ 'many', '2dfan4', 'peppa_wutz' ]
 face_selector_modes : List[FaceSelectorMode] = [ 'many', 'one', 'reference' ]
 face_selector_orders : List[FaceSelectorOrder] = [ 'left-right', 'right-left', 'top-bottom', 'bottom-top', 'small-large', 'large-small', 'best-worst', 'worst-best' ]
@@ -71,7 +72,10 @@ video_type_set : VideoTypeSet =\
 audio_formats : List[AudioFormat] = list(audio_type_set.keys())
 image_formats : List[ImageFormat] = list(image_type_set.keys())
 video_formats : List[VideoFormat] = list(video_type_set.keys())
-temp_frame_formats : List[TempFrameFormat] = [ 'bmp', 'jpeg', 'png', 'tiff' ]
+temp_frame_formats : List[TempFrameFormat] = [ 'bmp', 'jpeg', 'png', 'tiff', 'raw' ]
+video_pipelines : List[VideoPipeline] = [ 'sequential', 'fused', 'streaming' ]
+image_pipelines : List[ImagePipeline] = [ 'memory', 'ffmpeg' ]
+frame_duplicate_threshold_range : Sequence[int] = create_int_range(0, 16, 1)
 
 output_encoder_set : EncoderSet =\
 {
@@ -149,11 +153,22 @@ ui_workflows : List[UiWorkflow] = [ 'instant_runner', 'job_runner', 'job_manager
 job_statuses : List[JobStatus] = [ 'drafted', 'queued', 'completed', 'failed' ]
 
 benchmark_cycle_count_range : Sequence[int] = create_int_range(1, 10, 1)
+execution_backends : List[ExecutionBackend] = [ 'thread', 'process' ]
 execution_thread_count_range : Sequence[int] = create_int_range(1, 32, 1)
 execution_queue_count_range : Sequence[int] = create_int_range(1, 4, 1)
+execution_read_ahead_count_range : Sequence[int] = create_int_range(0, 16, 1)
+execution_write_behind_count_range : Sequence[int] = create_int_range(0, 16, 1)
+execution_batch_size_range : Sequence[int] = create_int_range(1, 32, 1)
+execution_batch_wait_range : Sequence[int] = create_int_range(0, 100, 1)
+execution_segment_count_range : Sequence[int] = create_int_range(1, 64, 1)
 system_memory_limit_range : Sequence[int] = create_int_range(0, 128, 4)
+temp_memory_limit_range : Sequence[int] = create_int_range(0, 128, 1)
 face_detector_angles : Sequence[Angle] = create_int_range(0, 270, 90)
 face_detector_score_range : Sequence[Score] = create_float_range(0.0, 1.0, 0.05)
+face_detector_interval_range : Sequence[int] = create_int_range(1, 250, 1)
+scene_cut_threshold_range : Sequence[float] = create_float_range(0.0, 1.0, 0.05)
+face_tracker_score_range : Sequence[Score] = create_float_range(0.0, 1.0, 0.05)
+face_tracker_interval : int = 30
 face_landmarker_score_range : Sequence[Score] = create_float_range(0.0, 1.0, 0.05)
 face_mask_blur_range : Sequence[float] = create_float_range(0.0, 1.0, 0.05)
 face_mask_padding_range : Sequence[int] = create_int_range(0, 100, 1)
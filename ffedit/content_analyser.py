@@ -200,7 +200,7 @@ def detect_with_nsfw_3(vision_frame : VisionFrame) -> bool:
 def forward_nsfw(vision_frame : VisionFrame, nsfw_model : str) -> Detection:
 	content_analyser = get_inference_pool().get(nsfw_model)
 
-	with conditional_thread_semaphore():
+	with conditional_thread_semaphore(nsfw_model):
 		detection = content_analyser.run(None,
 		{
 			'input': vision_frame
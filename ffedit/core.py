@@ -1,31 +1,43 @@
 import itertools
+import json
+import multiprocessing
+import os
 import shutil
 import signal
 import sys
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
 from time import time
+from types import ModuleType
+from typing import List, Union
 
-import numpy
-
-from ffedit import benchmarker, cli_helper, content_analyser, face_classifier, face_detector, face_landmarker, face_masker, face_recognizer, logger, process_manager, state_manager, video_manager, voice_extractor, wording
-from ffedit.args import apply_args, collect_job_args, reduce_job_args, reduce_step_args
+from ffedit import batch_runner, benchmarker, cli_helper, content_analyser, face_classifier, face_detector, face_landmarker, face_masker, face_recognizer, logger, process_manager, state_manager, video_manager, voice_extractor, wording
+from ffedit.args import apply_args, collect_job_args, collect_step_args, reduce_job_args, reduce_step_args
+from ffedit.checkpoint_manager import create_checkpoint, has_frames_extracted, set_frames_extracted, validate_checkpoint
 from ffedit.common_helper import get_first
 from ffedit.content_analyser import analyse_image, analyse_video
 from ffedit.download import conditional_download_hashes, conditional_download_sources
 from ffedit.exit_helper import hard_exit, signal_exit
-from ffedit.face_analyser import get_average_face, get_many_faces, get_one_face
-from ffedit.face_selector import sort_and_filter_faces
 from ffedit.face_store import append_reference_face, clear_reference_faces, get_reference_faces
-from ffedit.ffmpeg import copy_image, extract_frames, finalize_image, merge_video, replace_audio, restore_audio
-from ffedit.filesystem import filter_audio_paths, get_file_name, is_image, is_video, resolve_file_paths, resolve_file_pattern
+from ffedit.ffmpeg import concat_video, copy_image, detect_video_key_frames, extract_frames, finalize_image, merge_video, replace_audio, restore_audio, stream_video
+from ffedit.filesystem import filter_audio_paths, get_file_extension, get_file_name, get_file_size, is_file, is_image, is_video, resolve_file_paths, resolve_file_pattern
+from ffedit.frame_deduplicator import detect_duplicate_frames, restore_duplicate_frames
+from ffedit.frame_stager import abort_frame_encoder, finish_frame_encoder, start_frame_encoder
+from ffedit.frame_store import clear_frame_stores, create_frame_store, is_raw_frame_format, resolve_temp_frames
+from ffedit.hash_helper import create_hash
 from ffedit.jobs import job_helper, job_manager, job_runner
 from ffedit.jobs.job_list import compose_job_list
 from ffedit.memory import limit_system_memory
-from ffedit.processors.core import get_processors_modules
+from ffedit.processors.core import create_reference_faces, get_processors_modules, get_source_face, multi_process_vision_frames, process_fused_video, process_vision_frame
+from ffedit.processors.types import ProcessorState
 from ffedit.program import create_program
 from ffedit.program_helper import validate_args
-from ffedit.temp_helper import clear_temp_directory, create_temp_directory, get_temp_file_path, move_temp_file, resolve_temp_frame_paths
-from ffedit.types import Args, ErrorCode
-from ffedit.vision import pack_resolution, read_image, read_static_images, read_video_frame, restrict_image_resolution, restrict_trim_frame, restrict_video_fps, restrict_video_resolution, unpack_resolution
+from ffedit.scene_analyser import analyse_scene_faces
+from ffedit.shard_manager import create_shard_manifest, get_shard_video_path, parse_shard, resolve_shard_manifests, resolve_shard_video_paths, validate_shard_manifests
+from ffedit.temp_helper import balance_temp_memory, clear_temp_directory, create_temp_directory, estimate_temp_frames_size, get_temp_directory_path, get_temp_file_path, move_temp_file, spill_temp_frames
+from ffedit.thread_helper import parse_model_limit
+from ffedit.types import Args, BatchTask, ErrorCode, Fps, ShardManifest, State
+from ffedit.vision import count_video_frame_total, create_image_options, create_video_segments, has_image_writer, pack_resolution, predict_video_frame_total, read_image, read_static_image, read_video_frame, resize_frame, restrict_image_resolution, restrict_trim_frame, restrict_video_fps, restrict_video_resolution, unpack_resolution, write_image
 
 
 def cli() -> None:
@@ -92,6 +104,10 @@ def route(args : Args) -> None:
 		error_core = process_batch(args)
 		hard_exit(error_core)
 
+	if state_manager.get_item('command') == 'job-merge-shards':
+		error_code = merge_shards()
+		hard_exit(error_code)
+
 	if state_manager.get_item('command') in [ 'job-run', 'job-run-all', 'job-retry', 'job-retry-all' ]:
 		if not job_manager.init_jobs(state_manager.get_item('jobs_path')):
 			hard_exit(1)
@@ -126,7 +142,23 @@ def common_pre_check() -> bool:
 		voice_extractor
 	]
 
-	return all(module.pre_check() for module in common_modules)
+	return all(module.pre_check() for module in common_modules) and model_limits_pre_check(common_modules)
+
+
+def model_limits_pre_check(common_modules : List[ModuleType]) -> bool:
+	execution_model_limits = state_manager.get_item('execution_model_limits') or []
+
+	if execution_model_limits:
+		available_processors = [ get_file_name(file_path) for file_path in resolve_file_paths('ffedit/processors/modules') ]
+		model_names = [ model_name for module in common_modules + get_processors_modules(available_processors) if hasattr(module, 'create_static_model_set') for model_name in module.create_static_model_set('full') ]
+
+		for execution_model_limit in execution_model_limits:
+			model_limit = parse_model_limit(execution_model_limit)
+
+			if not model_limit or model_limit[0] not in model_names:
+				logger.error(wording.get('execution_model_limit_invalid').format(execution_model_limit = execution_model_limit), __name__)
+				return False
+	return True
 
 
 def processors_pre_check() -> bool:
@@ -282,6 +314,13 @@ def process_headless(args : Args) -> ErrorCode:
 	job_id = job_helper.suggest_job_id('headless')
 	step_args = reduce_step_args(args)
 
+	if state_manager.get_item('shard') and is_video(state_manager.get_item('target_path')):
+		shard = parse_shard(state_manager.get_item('shard'))
+		if not shard:
+			logger.error(wording.get('shard_invalid'), __name__)
+			return 1
+		step_args['output_path'] = get_shard_video_path(state_manager.get_item('output_path'), *shard)
+
 	if job_manager.create_job(job_id) and job_manager.add_step(job_id, step_args) and job_manager.submit_job(job_id) and job_runner.run_job(job_id, process_step):
 		return 0
 	return 1
@@ -293,26 +332,53 @@ def process_batch(args : Args) -> ErrorCode:
 	job_args = reduce_job_args(args)
 	source_paths = resolve_file_pattern(job_args.get('source_pattern'))
 	target_paths = resolve_file_pattern(job_args.get('target_pattern'))
+	batch_tasks : List[BatchTask] = []
+
+	if source_paths and target_paths:
+		for index, (source_path, target_path) in enumerate(itertools.product(source_paths, target_paths)):
+			batch_tasks.append(
+			{
+				'source_paths': [ source_path ],
+				'target_path': target_path,
+				'output_path': job_args.get('output_pattern').format(index = index)
+			})
+
+	if not source_paths and target_paths:
+		for index, target_path in enumerate(target_paths):
+			batch_tasks.append(
+			{
+				'source_paths': step_args.get('source_paths'),
+				'target_path': target_path,
+				'output_path': job_args.get('output_pattern').format(index = index)
+			})
+
+	if batch_tasks and all(is_image(batch_task.get('target_path')) for batch_task in batch_tasks):
+		return process_batch_images(step_args, batch_tasks)
+
+	if batch_tasks and job_manager.create_job(job_id):
+		for batch_task in batch_tasks:
+			step_args.update(batch_task)
+			if not job_manager.add_step(job_id, step_args):
+				return 1
+		if job_manager.submit_job(job_id) and job_runner.run_job(job_id, process_step):
+			return 0
+	return 1
 
-	if job_manager.create_job(job_id):
-		if source_paths and target_paths:
-			for index, (source_path, target_path) in enumerate(itertools.product(source_paths, target_paths)):
-				step_args['source_paths'] = [ source_path ]
-				step_args['target_path'] = target_path
-				step_args['output_path'] = job_args.get('output_pattern').format(index = index)
-				if not job_manager.add_step(job_id, step_args):
-					return 1
-			if job_manager.submit_job(job_id) and job_runner.run_job(job_id, process_step):
-				return 0
-
-		if not source_paths and target_paths:
-			for index, target_path in enumerate(target_paths):
-				step_args['target_path'] = target_path
-				step_args['output_path'] = job_args.get('output_pattern').format(index = index)
-				if not job_manager.add_step(job_id, step_args):
-					return 1
-			if job_manager.submit_job(job_id) and job_runner.run_job(job_id, process_step):
-				return 0
+
+def process_batch_images(step_args : Args, batch_tasks : List[BatchTask]) -> ErrorCode:
+	output_image_resolution = step_args.get('output_image_resolution')
+	step_args.update(collect_job_args())
+	step_args.update(get_first(batch_tasks))
+	apply_args(step_args, state_manager.set_item)
+
+	if not common_pre_check() or not processors_pre_check():
+		return 2
+	for processor_module in get_processors_modules(state_manager.get_item('processors')):
+		if not processor_module.pre_process('output'):
+			return 2
+
+	if batch_runner.run_batch_images(batch_tasks, output_image_resolution):
+		return 0
 	return 1
 
 
@@ -348,37 +414,72 @@ def conditional_process() -> ErrorCode:
 
 def conditional_append_reference_faces() -> None:
 	if 'reference' in state_manager.get_item('face_selector_mode') and not get_reference_faces():
-		source_frames = read_static_images(state_manager.get_item('source_paths'))
-		source_faces = get_many_faces(source_frames)
-		source_face = get_average_face(source_faces)
 		if is_video(state_manager.get_item('target_path')):
 			reference_frame = read_video_frame(state_manager.get_item('target_path'), state_manager.get_item('reference_frame_number'))
 		else:
 			reference_frame = read_image(state_manager.get_item('target_path'))
-		reference_faces = sort_and_filter_faces(get_many_faces([ reference_frame ]))
-		reference_face = get_one_face(reference_faces, state_manager.get_item('reference_face_position'))
-		append_reference_face('origin', reference_face)
-
-		if source_face and reference_face:
-			for processor_module in get_processors_modules(state_manager.get_item('processors')):
-				abstract_reference_frame = processor_module.get_reference_frame(source_face, reference_face, reference_frame)
-				if numpy.any(abstract_reference_frame):
-					abstract_reference_faces = sort_and_filter_faces(get_many_faces([ abstract_reference_frame ]))
-					abstract_reference_face = get_one_face(abstract_reference_faces, state_manager.get_item('reference_face_position'))
-					append_reference_face(processor_module.__name__, abstract_reference_face)
+		for reference_name, reference_faces in create_reference_faces(state_manager.get_item('source_paths'), reference_frame).items():
+			for reference_face in reference_faces:
+				append_reference_face(reference_name, reference_face)
 
 
 def process_image(start_time : float) -> ErrorCode:
 	if analyse_image(state_manager.get_item('target_path')):
 		return 3
 
+	process_manager.start()
+	temp_image_resolution = pack_resolution(restrict_image_resolution(state_manager.get_item('target_path'), unpack_resolution(state_manager.get_item('output_image_resolution'))))
+	if state_manager.get_item('image_pipeline') == 'memory' and has_image_writer(state_manager.get_item('output_path')):
+		error_code = process_memory_image(temp_image_resolution)
+	else:
+		error_code = process_temp_image(temp_image_resolution)
+	if error_code:
+		return error_code
+
+	if is_image(state_manager.get_item('output_path')):
+		seconds = '{:.2f}'.format((time() - start_time) % 60)
+		logger.info(wording.get('processing_image_succeed').format(seconds = seconds), __name__)
+	else:
+		logger.error(wording.get('processing_image_failed'), __name__)
+		process_manager.end()
+		return 1
+	process_manager.end()
+	return 0
+
+
+def process_memory_image(temp_image_resolution : str) -> ErrorCode:
+	target_vision_frame = read_static_image(state_manager.get_item('target_path'))
+	if target_vision_frame is None:
+		logger.debug(wording.get('processing_image_in_memory_skipped'), __name__)
+		return process_temp_image(temp_image_resolution)
+
+	processor_modules = get_processors_modules(state_manager.get_item('processors'))
+	reference_faces = get_reference_faces() if 'reference' in state_manager.get_item('face_selector_mode') else None
+	source_face = get_source_face(state_manager.get_item('source_paths'))
+	temp_vision_frame = resize_frame(target_vision_frame, unpack_resolution(temp_image_resolution))
+	logger.info(wording.get('processing'), __name__)
+	output_vision_frame = process_vision_frame(processor_modules, reference_faces, source_face, None, 0, 0, temp_vision_frame)
+	for processor_module in processor_modules:
+		processor_module.post_process()
+	if is_process_stopping():
+		process_manager.end()
+		return 4
+
+	logger.info(wording.get('finalizing_image').format(resolution = state_manager.get_item('output_image_resolution')), __name__)
+	output_vision_frame = resize_frame(output_vision_frame, unpack_resolution(state_manager.get_item('output_image_resolution')))
+	if write_image(state_manager.get_item('output_path'), output_vision_frame, create_image_options(state_manager.get_item('output_path'), state_manager.get_item('output_image_quality'))):
+		logger.debug(wording.get('finalizing_image_succeed'), __name__)
+	else:
+		logger.warn(wording.get('finalizing_image_skipped'), __name__)
+	return 0
+
+
+def process_temp_image(temp_image_resolution : str) -> ErrorCode:
 	logger.debug(wording.get('clearing_temp'), __name__)
 	clear_temp_directory(state_manager.get_item('target_path'))
 	logger.debug(wording.get('creating_temp'), __name__)
 	create_temp_directory(state_manager.get_item('target_path'))
 
-	process_manager.start()
-	temp_image_resolution = pack_resolution(restrict_image_resolution(state_manager.get_item('target_path'), unpack_resolution(state_manager.get_item('output_image_resolution'))))
 	logger.info(wording.get('copying_image').format(resolution = temp_image_resolution), __name__)
 	if copy_image(state_manager.get_item('target_path'), temp_image_resolution):
 		logger.debug(wording.get('copying_image_succeed'), __name__)
@@ -404,55 +505,270 @@ def process_image(start_time : float) -> ErrorCode:
 
 	logger.debug(wording.get('clearing_temp'), __name__)
 	clear_temp_directory(state_manager.get_item('target_path'))
-
-	if is_image(state_manager.get_item('output_path')):
-		seconds = '{:.2f}'.format((time() - start_time) % 60)
-		logger.info(wording.get('processing_image_succeed').format(seconds = seconds), __name__)
-	else:
-		logger.error(wording.get('processing_image_failed'), __name__)
-		process_manager.end()
-		return 1
-	process_manager.end()
 	return 0
 
 
 def process_video(start_time : float) -> ErrorCode:
 	trim_frame_start, trim_frame_end = restrict_trim_frame(state_manager.get_item('target_path'), state_manager.get_item('trim_frame_start'), state_manager.get_item('trim_frame_end'))
+	if state_manager.get_item('shard'):
+		return process_video_shard(start_time, trim_frame_start, trim_frame_end)
+	return process_video_range(start_time, trim_frame_start, trim_frame_end)
+
+
+def process_video_range(start_time : float, trim_frame_start : int, trim_frame_end : int) -> ErrorCode:
 	if analyse_video(state_manager.get_item('target_path'), trim_frame_start, trim_frame_end):
 		return 3
 
+	temp_video_resolution = pack_resolution(restrict_video_resolution(state_manager.get_item('target_path'), unpack_resolution(state_manager.get_item('output_video_resolution'))))
+	temp_video_fps = restrict_video_fps(state_manager.get_item('target_path'), state_manager.get_item('output_video_fps'))
+	temp_frames_size = calc_temp_frames_size(temp_video_resolution, temp_video_fps, trim_frame_start, trim_frame_end) if state_manager.get_item('execution_segment_count') == 1 else 0
+	prepare_temp_directory(create_checkpoint_hash(trim_frame_start, trim_frame_end), temp_frames_size)
+	process_manager.start()
+	if state_manager.get_item('execution_segment_count') > 1:
+		error_code = process_video_segments(trim_frame_start, trim_frame_end)
+	elif state_manager.get_item('video_pipeline') == 'streaming':
+		output_audio_volume = state_manager.get_item('output_audio_volume')
+		state_manager.set_item('output_audio_volume', 0)
+		error_code = stream_video_frames(temp_video_resolution, temp_video_fps, trim_frame_start, trim_frame_end)
+		state_manager.set_item('output_audio_volume', output_audio_volume)
+	else:
+		error_code = process_video_frames(temp_video_resolution, temp_video_fps, trim_frame_start, trim_frame_end)
+	if error_code:
+		return error_code
+
+	if state_manager.get_item('output_audio_volume') == 0:
+		logger.info(wording.get('skipping_audio'), __name__)
+		move_temp_file(state_manager.get_item('target_path'), state_manager.get_item('output_path'))
+	elif state_manager.get_item('execution_segment_count') == 1 and state_manager.get_item('video_pipeline') != 'streaming':
+		video_manager.clear_video_pool()
+		move_temp_file(state_manager.get_item('target_path'), state_manager.get_item('output_path'))
+	else:
+		error_code = process_video_audio(trim_frame_start, trim_frame_end)
+		if error_code:
+			return error_code
+
 	logger.debug(wording.get('clearing_temp'), __name__)
 	clear_temp_directory(state_manager.get_item('target_path'))
-	logger.debug(wording.get('creating_temp'), __name__)
-	create_temp_directory(state_manager.get_item('target_path'))
 
+	if is_video(state_manager.get_item('output_path')):
+		seconds = '{:.2f}'.format((time() - start_time))
+		logger.info(wording.get('processing_video_succeed').format(seconds = seconds), __name__)
+	else:
+		logger.error(wording.get('processing_video_failed'), __name__)
+		process_manager.end()
+		return 1
+	process_manager.end()
+	return 0
+
+
+def process_video_audio(trim_frame_start : int, trim_frame_end : int) -> ErrorCode:
+	source_audio_path = get_first(filter_audio_paths(state_manager.get_item('source_paths')))
+	if source_audio_path:
+		if replace_audio(state_manager.get_item('target_path'), source_audio_path, state_manager.get_item('output_path')):
+			video_manager.clear_video_pool()
+			logger.debug(wording.get('replacing_audio_succeed'), __name__)
+		else:
+			video_manager.clear_video_pool()
+			if is_process_stopping():
+				process_manager.end()
+				return 4
+			logger.warn(wording.get('replacing_audio_skipped'), __name__)
+			move_temp_file(state_manager.get_item('target_path'), state_manager.get_item('output_path'))
+	else:
+		if restore_audio(state_manager.get_item('target_path'), state_manager.get_item('output_path'), trim_frame_start, trim_frame_end):
+			video_manager.clear_video_pool()
+			logger.debug(wording.get('restoring_audio_succeed'), __name__)
+		else:
+			video_manager.clear_video_pool()
+			if is_process_stopping():
+				process_manager.end()
+				return 4
+			logger.warn(wording.get('restoring_audio_skipped'), __name__)
+			move_temp_file(state_manager.get_item('target_path'), state_manager.get_item('output_path'))
+	return 0
+
+
+def process_video_shard(start_time : float, trim_frame_start : int, trim_frame_end : int) -> ErrorCode:
+	shard_index, shard_total = parse_shard(state_manager.get_item('shard'))
+	video_shards = create_video_segments(trim_frame_start, trim_frame_end, [], shard_total)
+
+	if shard_index > len(video_shards):
+		logger.error(wording.get('shard_out_of_range').format(shard_index = shard_index), __name__)
+		return 1
+
+	shard_frame_start, shard_frame_end = video_shards[shard_index - 1]
+	output_audio_volume = state_manager.get_item('output_audio_volume')
+	logger.info(wording.get('processing_shard').format(shard_index = shard_index, shard_total = shard_total, frame_start = shard_frame_start, frame_end = shard_frame_end), __name__)
+	state_manager.set_item('output_audio_volume', 0)
+	error_code = process_video_range(start_time, shard_frame_start, shard_frame_end)
+	state_manager.set_item('output_audio_volume', output_audio_volume)
+
+	if error_code == 0:
+		shard_manifest : ShardManifest =\
+		{
+			'shard_hash': create_shard_hash(),
+			'shard_index': shard_index,
+			'shard_total': shard_total,
+			'target_size': get_file_size(state_manager.get_item('target_path')),
+			'trim_frame_start': trim_frame_start,
+			'trim_frame_end': trim_frame_end,
+			'frame_start': shard_frame_start,
+			'frame_end': shard_frame_end,
+			'frame_total': count_video_frame_total(state_manager.get_item('output_path'))
+		}
+		if create_shard_manifest(state_manager.get_item('output_path'), shard_manifest):
+			logger.debug(wording.get('processing_shard_succeed'), __name__)
+			return 0
+		error_code = 1
+	logger.error(wording.get('processing_shard_failed'), __name__)
+	return error_code
+
+
+def create_shard_hash() -> str:
+	step_args = collect_step_args()
+	shard_content = json.dumps({ key: step_args.get(key) for key in step_args if key not in [ 'shard', 'output_path' ] }, sort_keys = True, default = str)
+	return create_hash(shard_content.encode())
+
+
+def merge_shards() -> ErrorCode:
+	start_time = time()
+	target_path = state_manager.get_item('target_path')
+	output_path = state_manager.get_item('output_path')
+	shard_manifests = resolve_shard_manifests(output_path)
+
+	if not validate_shard_manifests(target_path, output_path, shard_manifests):
+		logger.error(wording.get('validating_shards_failed'), __name__)
+		return 1
+
+	trim_frame_start = shard_manifests[0].get('trim_frame_start')
+	trim_frame_end = shard_manifests[0].get('trim_frame_end')
 	process_manager.start()
-	temp_video_resolution = pack_resolution(restrict_video_resolution(state_manager.get_item('target_path'), unpack_resolution(state_manager.get_item('output_video_resolution'))))
-	temp_video_fps = restrict_video_fps(state_manager.get_item('target_path'), state_manager.get_item('output_video_fps'))
-	logger.info(wording.get('extracting_frames').format(resolution = temp_video_resolution, fps = temp_video_fps), __name__)
-	if extract_frames(state_manager.get_item('target_path'), temp_video_resolution, temp_video_fps, trim_frame_start, trim_frame_end):
-		logger.debug(wording.get('extracting_frames_succeed'), __name__)
+	clear_temp_directory(target_path)
+	create_temp_directory(target_path)
+	logger.info(wording.get('merging_shards').format(shard_total = len(shard_manifests)), __name__)
+
+	if concat_video(get_temp_file_path(target_path), resolve_shard_video_paths(output_path, shard_manifests)):
+		if state_manager.get_item('output_audio_volume') == 0:
+			logger.info(wording.get('skipping_audio'), __name__)
+			move_temp_file(target_path, output_path)
+		else:
+			error_code = process_video_audio(trim_frame_start, trim_frame_end)
+			if error_code:
+				return error_code
 	else:
+		clear_temp_directory(target_path)
 		if is_process_stopping():
 			process_manager.end()
 			return 4
-		logger.error(wording.get('extracting_frames_failed'), __name__)
+		logger.error(wording.get('merging_shards_failed'), __name__)
 		process_manager.end()
 		return 1
 
-	temp_frame_paths = resolve_temp_frame_paths(state_manager.get_item('target_path'))
+	clear_temp_directory(target_path)
+
+	if is_video(output_path):
+		seconds = '{:.2f}'.format((time() - start_time))
+		logger.info(wording.get('merging_shards_succeed').format(seconds = seconds), __name__)
+		process_manager.end()
+		return 0
+	logger.error(wording.get('merging_shards_failed'), __name__)
+	process_manager.end()
+	return 1
+
+
+def create_checkpoint_hash(trim_frame_start : int, trim_frame_end : int) -> str:
+	checkpoint_content = json.dumps([ collect_step_args(), trim_frame_start, trim_frame_end ], sort_keys = True, default = str)
+	return create_hash(checkpoint_content.encode())
+
+
+def calc_temp_frames_size(temp_video_resolution : str, temp_video_fps : Fps, trim_frame_start : int, trim_frame_end : int) -> int:
+	if state_manager.get_item('video_pipeline') == 'streaming':
+		return 0
+	temp_frame_total = predict_video_frame_total(state_manager.get_item('target_path'), temp_video_fps, trim_frame_start, trim_frame_end)
+	temp_frame_scale = calc_temp_frame_scale()
+	return estimate_temp_frames_size(unpack_resolution(temp_video_resolution), temp_frame_total, temp_frame_scale) + get_file_size(state_manager.get_item('target_path')) * temp_frame_scale ** 2
+
+
+def calc_temp_frame_scale() -> int:
+	temp_frame_scale = 1
+
+	for processor_module in get_processors_modules(state_manager.get_item('processors')):
+		temp_frame_scale *= processor_module.get_frame_scale()
+	return temp_frame_scale
+
+
+def prepare_temp_directory(checkpoint_hash : str, temp_frames_size : int) -> None:
+	if validate_checkpoint(state_manager.get_item('target_path'), checkpoint_hash):
+		logger.info(wording.get('resuming_temp'), __name__)
+	else:
+		logger.debug(wording.get('clearing_temp'), __name__)
+		clear_temp_directory(state_manager.get_item('target_path'))
+		logger.debug(wording.get('creating_temp'), __name__)
+		create_temp_directory(state_manager.get_item('target_path'), temp_frames_size)
+		create_checkpoint(state_manager.get_item('target_path'), checkpoint_hash)
+
+
+def process_video_frames(temp_video_resolution : str, temp_video_fps : Fps, trim_frame_start : int, trim_frame_end : int) -> ErrorCode:
+	if has_frames_extracted(state_manager.get_item('target_path')):
+		logger.info(wording.get('extracting_frames_skipped'), __name__)
+	else:
+		logger.info(wording.get('extracting_frames').format(resolution = temp_video_resolution, fps = temp_video_fps), __name__)
+		if is_raw_frame_format():
+			create_frame_store(state_manager.get_item('target_path'), temp_video_resolution)
+		else:
+			spill_temp_frames(state_manager.get_item('target_path'), predict_video_frame_total(state_manager.get_item('target_path'), temp_video_fps, trim_frame_start, trim_frame_end), estimate_temp_frames_size(unpack_resolution(temp_video_resolution), 1, 1))
+		if extract_frames(state_manager.get_item('target_path'), temp_video_resolution, temp_video_fps, trim_frame_start, trim_frame_end):
+			set_frames_extracted(state_manager.get_item('target_path'))
+			logger.debug(wording.get('extracting_frames_succeed'), __name__)
+		else:
+			if is_process_stopping():
+				process_manager.end()
+				return 4
+			logger.error(wording.get('extracting_frames_failed'), __name__)
+			process_manager.end()
+			return 1
+
+	balance_temp_memory(state_manager.get_item('target_path'))
+	temp_frame_paths = resolve_temp_frames(state_manager.get_item('target_path'))
 	if temp_frame_paths:
-		for processor_module in get_processors_modules(state_manager.get_item('processors')):
-			logger.info(wording.get('processing'), processor_module.__name__)
-			processor_module.process_video(state_manager.get_item('source_paths'), temp_frame_paths)
-			processor_module.post_process()
+		detect_duplicate_frames(temp_frame_paths)
+		analyse_scene_faces(temp_frame_paths)
+		processor_modules = get_processors_modules(state_manager.get_item('processors'))
+		try:
+			if state_manager.get_item('video_pipeline') == 'fused':
+				logger.info(wording.get('processing'), __name__)
+				start_frame_encoder(state_manager.get_item('target_path'), temp_video_fps, state_manager.get_item('output_video_resolution'), state_manager.get_item('output_video_fps'), trim_frame_start, trim_frame_end)
+				process_fused_video(state_manager.get_item('source_paths'), temp_frame_paths)
+				for processor_module in processor_modules:
+					processor_module.post_process()
+			else:
+				for processor_module in processor_modules:
+					logger.info(wording.get('processing'), processor_module.__name__)
+					if processor_module == processor_modules[-1]:
+						start_frame_encoder(state_manager.get_item('target_path'), temp_video_fps, state_manager.get_item('output_video_resolution'), state_manager.get_item('output_video_fps'), trim_frame_start, trim_frame_end)
+					processor_module.process_video(state_manager.get_item('source_paths'), temp_frame_paths)
+					processor_module.post_process()
+					if processor_module != processor_modules[-1]:
+						balance_temp_memory(state_manager.get_item('target_path'))
+			is_frame_encoded = finish_frame_encoder()
+		finally:
+			abort_frame_encoder()
 		if is_process_stopping():
+			clear_frame_stores()
 			return 4
 	else:
 		logger.error(wording.get('temp_frames_not_found'), __name__)
 		process_manager.end()
 		return 1
 
+	if is_frame_encoded:
+		clear_frame_stores()
+		logger.debug(wording.get('encoding_frames_succeed'), __name__)
+		return 0
+
+	restore_duplicate_frames()
+	clear_frame_stores()
+
 	logger.info(wording.get('merging_video').format(resolution = state_manager.get_item('output_video_resolution'), fps = state_manager.get_item('output_video_fps')), __name__)
 	if merge_video(state_manager.get_item('target_path'), temp_video_fps, state_manager.get_item('output_video_resolution'), state_manager.get_item('output_video_fps'), trim_frame_start, trim_frame_end):
 		logger.debug(wording.get('merging_video_succeed'), __name__)
@@ -463,49 +779,90 @@ def process_video(start_time : float) -> ErrorCode:
 		logger.error(wording.get('merging_video_failed'), __name__)
 		process_manager.end()
 		return 1
+	return 0
 
-	if state_manager.get_item('output_audio_volume') == 0:
-		logger.info(wording.get('skipping_audio'), __name__)
-		move_temp_file(state_manager.get_item('target_path'), state_manager.get_item('output_path'))
+
+def stream_video_frames(temp_video_resolution : str, temp_video_fps : Fps, trim_frame_start : int, trim_frame_end : int) -> ErrorCode:
+	temp_frame_total = predict_video_frame_total(state_manager.get_item('target_path'), temp_video_fps, trim_frame_start, trim_frame_end)
+	logger.info(wording.get('streaming_video').format(resolution = temp_video_resolution, fps = temp_video_fps), __name__)
+	if stream_video(state_manager.get_item('target_path'), temp_video_resolution, temp_video_fps, state_manager.get_item('output_video_resolution'), state_manager.get_item('output_video_fps'), trim_frame_start, trim_frame_end, partial(multi_process_vision_frames, state_manager.get_item('source_paths'), temp_frame_total = temp_frame_total)):
+		logger.debug(wording.get('streaming_video_succeed'), __name__)
 	else:
-		source_audio_path = get_first(filter_audio_paths(state_manager.get_item('source_paths')))
-		if source_audio_path:
-			if replace_audio(state_manager.get_item('target_path'), source_audio_path, state_manager.get_item('output_path')):
-				video_manager.clear_video_pool()
-				logger.debug(wording.get('replacing_audio_succeed'), __name__)
-			else:
-				video_manager.clear_video_pool()
-				if is_process_stopping():
-					process_manager.end()
-					return 4
-				logger.warn(wording.get('replacing_audio_skipped'), __name__)
-				move_temp_file(state_manager.get_item('target_path'), state_manager.get_item('output_path'))
-		else:
-			if restore_audio(state_manager.get_item('target_path'), state_manager.get_item('output_path'), trim_frame_start, trim_frame_end):
-				video_manager.clear_video_pool()
-				logger.debug(wording.get('restoring_audio_succeed'), __name__)
-			else:
-				video_manager.clear_video_pool()
-				if is_process_stopping():
-					process_manager.end()
-					return 4
-				logger.warn(wording.get('restoring_audio_skipped'), __name__)
-				move_temp_file(state_manager.get_item('target_path'), state_manager.get_item('output_path'))
+		if is_process_stopping():
+			process_manager.end()
+			return 4
+		logger.error(wording.get('streaming_video_failed'), __name__)
+		process_manager.end()
+		return 1
 
-	logger.debug(wording.get('clearing_temp'), __name__)
-	clear_temp_directory(state_manager.get_item('target_path'))
+	for processor_module in get_processors_modules(state_manager.get_item('processors')):
+		processor_module.post_process()
+	return 0
 
-	if is_video(state_manager.get_item('output_path')):
-		seconds = '{:.2f}'.format((time() - start_time))
-		logger.info(wording.get('processing_video_succeed').format(seconds = seconds), __name__)
-	else:
-		logger.error(wording.get('processing_video_failed'), __name__)
+
+def process_video_segments(trim_frame_start : int, trim_frame_end : int) -> ErrorCode:
+	target_path = state_manager.get_item('target_path')
+	video_segments = create_video_segments(trim_frame_start, trim_frame_end, detect_video_key_frames(target_path), state_manager.get_item('execution_segment_count'))
+	segment_directory_path = os.path.join(get_temp_directory_path(target_path), 'segments')
+	segment_video_paths = [ os.path.join(segment_directory_path, str(segment_index) + get_file_extension(target_path)) for segment_index in range(len(video_segments)) ]
+	error_codes = []
+
+	logger.info(wording.get('processing_segments').format(segment_total = len(video_segments)), __name__)
+	with ProcessPoolExecutor(max_workers = len(video_segments), mp_context = multiprocessing.get_context('spawn')) as executor:
+		futures = []
+
+		for segment_index, (segment_frame_start, segment_frame_end) in enumerate(video_segments):
+			segment_temp_path = os.path.join(segment_directory_path, str(segment_index))
+			future = executor.submit(process_video_segment, state_manager.get_state().copy(), segment_temp_path, segment_video_paths[segment_index], segment_frame_start, segment_frame_end)
+			futures.append(future)
+
+		for future in futures:
+			error_codes.append(future.result())
+
+	if any(error_codes) or not concat_video(get_temp_file_path(target_path), segment_video_paths):
+		if is_process_stopping() or 4 in error_codes:
+			process_manager.end()
+			return 4
+		logger.error(wording.get('processing_segments_failed'), __name__)
 		process_manager.end()
 		return 1
-	process_manager.end()
+	logger.debug(wording.get('processing_segments_succeed'), __name__)
 	return 0
 
 
+def process_video_segment(state : Union[State, ProcessorState], segment_temp_path : str, segment_video_path : str, trim_frame_start : int, trim_frame_end : int) -> ErrorCode:
+	for key, value in state.items():
+		state_manager.init_item(key, value) #type:ignore[arg-type]
+	state_manager.init_item('temp_path', segment_temp_path)
+	state_manager.init_item('output_audio_volume', 0)
+	logger.init(state_manager.get_item('log_level'))
+
+	for processor_module in get_processors_modules(state_manager.get_item('processors')):
+		if not processor_module.pre_process('output'):
+			return 2
+
+	conditional_append_reference_faces()
+	checkpoint_hash = create_checkpoint_hash(trim_frame_start, trim_frame_end)
+	if validate_checkpoint(state_manager.get_item('target_path'), checkpoint_hash) and is_file(segment_video_path):
+		return 0
+	temp_video_resolution = pack_resolution(restrict_video_resolution(state_manager.get_item('target_path'), unpack_resolution(state_manager.get_item('output_video_resolution'))))
+	temp_video_fps = restrict_video_fps(state_manager.get_item('target_path'), state_manager.get_item('output_video_fps'))
+	prepare_temp_directory(checkpoint_hash, calc_temp_frames_size(temp_video_resolution, temp_video_fps, trim_frame_start, trim_frame_end))
+	process_manager.start()
+
+	if state_manager.get_item('video_pipeline') == 'streaming':
+		error_code = stream_video_frames(temp_video_resolution, temp_video_fps, trim_frame_start, trim_frame_end)
+	else:
+		error_code = process_video_frames(temp_video_resolution, temp_video_fps, trim_frame_start, trim_frame_end)
+	if error_code:
+		return error_code
+	if move_temp_file(state_manager.get_item('target_path'), segment_video_path):
+		process_manager.end()
+		return 0
+	process_manager.end()
+	return 1
+
+
 def is_process_stopping() -> bool:
 	if process_manager.is_stopping():
 		process_manager.end()
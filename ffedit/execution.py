@@ -144,6 +144,17 @@ def detect_execution_devices() -> List[ExecutionDevice]:
 	return execution_devices
 
 
+def detect_free_video_memory(execution_device_id : str) -> Optional[int]:
+	execution_devices = detect_static_execution_devices()
+
+	if execution_device_id.isdigit() and int(execution_device_id) < len(execution_devices):
+		free_video_memory = execution_devices[int(execution_device_id)].get('video_memory').get('free')
+
+		if free_video_memory and free_video_memory.get('unit') == 'MiB':
+			return free_video_memory.get('value') * 1024 ** 2
+	return None
+
+
 def create_value_and_unit(text : str) -> Optional[ValueAndUnit]:
 	if ' ' in text:
 		value, unit = text.split()
@@ -5,15 +5,15 @@ import numpy
 from ffedit import state_manager
 from ffedit.common_helper import get_first
 from ffedit.face_classifier import classify_face
-from ffedit.face_detector import detect_faces, detect_rotated_faces
-from ffedit.face_helper import apply_nms, convert_to_face_landmark_5, estimate_face_angle, get_nms_threshold
+from ffedit.face_detector import detect_faces, detect_roi_faces, detect_rotated_faces
+from ffedit.face_helper import apply_nms, calc_bounding_box_iou, convert_to_face_landmark_5, estimate_face_angle, get_nms_threshold
 from ffedit.face_landmarker import detect_face_landmark, estimate_face_landmark_68_5
 from ffedit.face_recognizer import calc_embedding
 from ffedit.face_store import get_static_faces, set_static_faces
 from ffedit.types import BoundingBox, Face, FaceLandmark5, FaceLandmarkSet, FaceScoreSet, Score, VisionFrame
 
 
-def create_faces(vision_frame : VisionFrame, bounding_boxes : List[BoundingBox], face_scores : List[Score], face_landmarks_5 : List[FaceLandmark5]) -> List[Face]:
+def create_faces(vision_frame : VisionFrame, bounding_boxes : List[BoundingBox], face_scores : List[Score], face_landmarks_5 : List[FaceLandmark5], previous_faces : List[Face]) -> List[Face]:
 	faces = []
 	nms_threshold = get_nms_threshold(state_manager.get_item('face_detector_model'), state_manager.get_item('face_detector_angles'))
 	keep_indices = apply_nms(bounding_boxes, face_scores, state_manager.get_item('face_detector_score'), nms_threshold)
@@ -45,8 +45,14 @@ def create_faces(vision_frame : VisionFrame, bounding_boxes : List[BoundingBox],
 			'detector': face_score,
 			'landmarker': face_landmark_score_68
 		}
-		embedding, normed_embedding = calc_embedding(vision_frame, face_landmark_set.get('5/68'))
-		gender, age, race = classify_face(vision_frame, face_landmark_set.get('5/68'))
+		previous_face = match_previous_face(bounding_box, previous_faces)
+
+		if previous_face:
+			embedding, normed_embedding = previous_face.embedding, previous_face.normed_embedding
+			gender, age, race = previous_face.gender, previous_face.age, previous_face.race
+		else:
+			embedding, normed_embedding = calc_embedding(vision_frame, face_landmark_set.get('5/68'))
+			gender, age, race = classify_face(vision_frame, face_landmark_set.get('5/68'))
 		faces.append(Face(
 			bounding_box = bounding_box,
 			score_set = face_score_set,
@@ -61,6 +67,14 @@ def create_faces(vision_frame : VisionFrame, bounding_boxes : List[BoundingBox],
 	return faces
 
 
+def match_previous_face(bounding_box : BoundingBox, previous_faces : List[Face]) -> Optional[Face]:
+	previous_face_ious = [ calc_bounding_box_iou(bounding_box, previous_face.bounding_box) for previous_face in previous_faces ]
+
+	if previous_face_ious and max(previous_face_ious) > 0.5:
+		return previous_faces[numpy.argmax(previous_face_ious)]
+	return None
+
+
 def get_one_face(faces : List[Face], position : int = 0) -> Optional[Face]:
 	if faces:
 		position = min(position, len(faces) - 1)
@@ -97,28 +111,35 @@ def get_many_faces(vision_frames : List[VisionFrame]) -> List[Face]:
 	many_faces : List[Face] = []
 
 	for vision_frame in vision_frames:
-		if numpy.any(vision_frame):
-			static_faces = get_static_faces(vision_frame)
-			if static_faces:
-				many_faces.extend(static_faces)
-			else:
-				all_bounding_boxes = []
-				all_face_scores = []
-				all_face_landmarks_5 = []
-
-				for face_detector_angle in state_manager.get_item('face_detector_angles'):
-					if face_detector_angle == 0:
-						bounding_boxes, face_scores, face_landmarks_5 = detect_faces(vision_frame)
-					else:
-						bounding_boxes, face_scores, face_landmarks_5 = detect_rotated_faces(vision_frame, face_detector_angle)
-					all_bounding_boxes.extend(bounding_boxes)
-					all_face_scores.extend(face_scores)
-					all_face_landmarks_5.extend(face_landmarks_5)
-
-				if all_bounding_boxes and all_face_scores and all_face_landmarks_5 and state_manager.get_item('face_detector_score') > 0:
-					faces = create_faces(vision_frame, all_bounding_boxes, all_face_scores, all_face_landmarks_5)
-
-					if faces:
-						many_faces.extend(faces)
-						set_static_faces(vision_frame, faces)
+		many_faces.extend(propagate_faces(vision_frame, []))
 	return many_faces
+
+
+def propagate_faces(vision_frame : VisionFrame, previous_faces : List[Face]) -> List[Face]:
+	if numpy.any(vision_frame):
+		static_faces = get_static_faces(vision_frame)
+		if static_faces is not None:
+			return static_faces
+
+		all_bounding_boxes = []
+		all_face_scores = []
+		all_face_landmarks_5 = []
+
+		for face_detector_angle in state_manager.get_item('face_detector_angles'):
+			if previous_faces and state_manager.get_item('face_detector_mode') == 'roi':
+				bounding_boxes, face_scores, face_landmarks_5 = detect_roi_faces(vision_frame, [ previous_face.bounding_box for previous_face in previous_faces ], face_detector_angle)
+			elif face_detector_angle == 0:
+				bounding_boxes, face_scores, face_landmarks_5 = detect_faces(vision_frame)
+			else:
+				bounding_boxes, face_scores, face_landmarks_5 = detect_rotated_faces(vision_frame, face_detector_angle)
+			all_bounding_boxes.extend(bounding_boxes)
+			all_face_scores.extend(face_scores)
+			all_face_landmarks_5.extend(face_landmarks_5)
+
+		if all_bounding_boxes and all_face_scores and all_face_landmarks_5 and state_manager.get_item('face_detector_score') > 0:
+			faces = create_faces(vision_frame, all_bounding_boxes, all_face_scores, all_face_landmarks_5, previous_faces)
+
+			if faces:
+				set_static_faces(vision_frame, faces)
+				return faces
+	return []
@@ -85,7 +85,7 @@ def classify_face(temp_vision_frame : VisionFrame, face_landmark_5 : FaceLandmar
 def forward(crop_vision_frame : VisionFrame) -> Tuple[List[int], List[int], List[int]]:
 	face_classifier = get_inference_pool().get('face_classifier')
 
-	with conditional_thread_semaphore():
+	with conditional_thread_semaphore('fairface'):
 		race_id, gender_id, age_id = face_classifier.run(None,
 		{
 			'input': crop_vision_frame
@@ -8,8 +8,8 @@ from ffedit import inference_manager, state_manager
 from ffedit.download import conditional_download_hashes, conditional_download_sources, resolve_download_url
 from ffedit.face_helper import create_rotated_matrix_and_size, create_static_anchors, distance_to_bounding_box, distance_to_face_landmark_5, normalize_bounding_box, transform_bounding_box, transform_points
 from ffedit.filesystem import resolve_relative_path
-from ffedit.thread_helper import thread_semaphore
-from ffedit.types import Angle, BoundingBox, Detection, DownloadScope, DownloadSet, FaceLandmark5, InferencePool, ModelSet, Score, VisionFrame
+from ffedit.thread_helper import conditional_thread_semaphore
+from ffedit.types import Angle, BoundingBox, Detection, DownloadScope, DownloadSet, FaceLandmark5, InferencePool, ModelSet, Points, Resolution, Score, VisionFrame
 from ffedit.vision import restrict_frame, unpack_resolution
 
 
@@ -145,6 +145,55 @@ def detect_rotated_faces(vision_frame : VisionFrame, angle : Angle) -> Tuple[Lis
 	return bounding_boxes, face_scores, face_landmarks_5
 
 
+def detect_roi_faces(vision_frame : VisionFrame, roi_bounding_boxes : List[BoundingBox], angle : Angle) -> Tuple[List[BoundingBox], List[Score], List[FaceLandmark5]]:
+	all_bounding_boxes : List[BoundingBox] = []
+	all_face_scores : List[Score] = []
+	all_face_landmarks_5 : List[FaceLandmark5] = []
+	face_detector_width, face_detector_height = unpack_resolution(state_manager.get_item('face_detector_size'))
+	mosaic_vision_frame, mosaic_cells = create_roi_mosaic(vision_frame, roi_bounding_boxes, (face_detector_width, face_detector_height))
+
+	if angle == 0:
+		bounding_boxes, face_scores, face_landmarks_5 = detect_faces(mosaic_vision_frame)
+	else:
+		bounding_boxes, face_scores, face_landmarks_5 = detect_rotated_faces(mosaic_vision_frame, angle)
+
+	for bounding_box, face_score, face_landmark_5 in zip(bounding_boxes, face_scores, face_landmarks_5):
+		bounding_box_center = numpy.add(bounding_box[:2], bounding_box[2:]) * 0.5
+
+		for cell_origin, cell_size, crop_origin, crop_scale in mosaic_cells:
+			if numpy.all(bounding_box_center >= cell_origin) and numpy.all(bounding_box_center < numpy.add(cell_origin, cell_size)):
+				all_bounding_boxes.append(numpy.concatenate([ (bounding_box[:2] - cell_origin) / crop_scale + crop_origin, (bounding_box[2:] - cell_origin) / crop_scale + crop_origin ]))
+				all_face_scores.append(face_score)
+				all_face_landmarks_5.append((face_landmark_5 - cell_origin) / crop_scale + crop_origin)
+				break
+
+	return all_bounding_boxes, all_face_scores, all_face_landmarks_5
+
+
+def create_roi_mosaic(vision_frame : VisionFrame, roi_bounding_boxes : List[BoundingBox], mosaic_resolution : Resolution) -> Tuple[VisionFrame, List[Tuple[Points, Points, Points, float]]]:
+	frame_height, frame_width = vision_frame.shape[:2]
+	mosaic_width, mosaic_height = mosaic_resolution
+	mosaic_columns = int(numpy.ceil(numpy.sqrt(len(roi_bounding_boxes))))
+	mosaic_rows = int(numpy.ceil(len(roi_bounding_boxes) / mosaic_columns))
+	cell_width, cell_height = mosaic_width // mosaic_columns, mosaic_height // mosaic_rows
+	mosaic_vision_frame = numpy.zeros((mosaic_height, mosaic_width, 3), dtype = vision_frame.dtype)
+	mosaic_cells = []
+
+	for index, roi_bounding_box in enumerate(roi_bounding_boxes):
+		roi_center = numpy.add(roi_bounding_box[:2], roi_bounding_box[2:]) * 0.5
+		roi_size = numpy.subtract(roi_bounding_box[2:], roi_bounding_box[:2]).max() * 2
+		crop_start_x, crop_start_y = numpy.clip(roi_center - roi_size * 0.5, 0, [ frame_width - 1, frame_height - 1 ]).astype(int)
+		crop_end_x, crop_end_y = numpy.clip(roi_center + roi_size * 0.5, [ crop_start_x + 1, crop_start_y + 1 ], [ frame_width, frame_height ]).astype(int)
+		crop_vision_frame = vision_frame[crop_start_y:crop_end_y, crop_start_x:crop_end_x]
+		crop_scale = min(cell_width / crop_vision_frame.shape[1], cell_height / crop_vision_frame.shape[0])
+		crop_vision_frame = cv2.resize(crop_vision_frame, (max(int(crop_vision_frame.shape[1] * crop_scale), 1), max(int(crop_vision_frame.shape[0] * crop_scale), 1)))
+		cell_x, cell_y = index % mosaic_columns * cell_width, index // mosaic_columns * cell_height
+		mosaic_vision_frame[cell_y:cell_y + crop_vision_frame.shape[0], cell_x:cell_x + crop_vision_frame.shape[1]] = crop_vision_frame
+		mosaic_cells.append((numpy.array([ cell_x, cell_y ]), numpy.array([ cell_width, cell_height ]), numpy.array([ crop_start_x, crop_start_y ]), crop_scale))
+
+	return mosaic_vision_frame, mosaic_cells
+
+
 def detect_with_retinaface(vision_frame : VisionFrame, face_detector_size : str) -> Tuple[List[BoundingBox], List[Score], List[FaceLandmark5]]:
 	bounding_boxes = []
 	face_scores = []
@@ -274,7 +323,7 @@ def detect_with_yolo_face(vision_frame : VisionFrame, face_detector_size : str)
 def forward_with_retinaface(detect_vision_frame : VisionFrame) -> Detection:
 	face_detector = get_inference_pool().get('retinaface')
 
-	with thread_semaphore():
+	with conditional_thread_semaphore('retinaface'):
 		detection = face_detector.run(None,
 		{
 			'input': detect_vision_frame
@@ -286,7 +335,7 @@ def forward_with_retinaface(detect_vision_frame : VisionFrame) -> Detection:
 def forward_with_scrfd(detect_vision_frame : VisionFrame) -> Detection:
 	face_detector = get_inference_pool().get('scrfd')
 
-	with thread_semaphore():
+	with conditional_thread_semaphore('scrfd'):
 		detection = face_detector.run(None,
 		{
 			'input': detect_vision_frame
@@ -298,7 +347,7 @@ def forward_with_scrfd(detect_vision_frame : VisionFrame) -> Detection:
 def forward_with_yolo_face(detect_vision_frame : VisionFrame) -> Detection:
 	face_detector = get_inference_pool().get('yolo_face')
 
-	with thread_semaphore():
+	with conditional_thread_semaphore('yolo_face'):
 		detection = face_detector.run(None,
 		{
 			'input': detect_vision_frame
@@ -234,6 +234,21 @@ def apply_nms(bounding_boxes : List[BoundingBox], scores : List[Score], score_th
 	return keep_indices
 
 
+def calc_bounding_box_iou(source_bounding_box : BoundingBox, target_bounding_box : BoundingBox) -> float:
+	x1 = max(source_bounding_box[0], target_bounding_box[0])
+	y1 = max(source_bounding_box[1], target_bounding_box[1])
+	x2 = min(source_bounding_box[2], target_bounding_box[2])
+	y2 = min(source_bounding_box[3], target_bounding_box[3])
+	intersection_area = max(0, x2 - x1) * max(0, y2 - y1)
+	source_area = (source_bounding_box[2] - source_bounding_box[0]) * (source_bounding_box[3] - source_bounding_box[1])
+	target_area = (target_bounding_box[2] - target_bounding_box[0]) * (target_bounding_box[3] - target_bounding_box[1])
+	union_area = source_area + target_area - intersection_area
+
+	if union_area > 0:
+		return float(intersection_area / union_area)
+	return 0.0
+
+
 def get_nms_threshold(face_detector_model : FaceDetectorModel, face_detector_angles : List[Angle]) -> float:
 	if face_detector_model == 'many':
 		return 0.1
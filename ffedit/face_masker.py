@@ -218,7 +218,7 @@ def forward_occlude_face(prepare_vision_frame : VisionFrame) -> Mask:
 	model_name = state_manager.get_item('face_occluder_model')
 	face_occluder = get_inference_pool().get(model_name)
 
-	with conditional_thread_semaphore():
+	with conditional_thread_semaphore(model_name):
 		occlusion_mask : Mask = face_occluder.run(None,
 		{
 			'input': prepare_vision_frame
@@ -231,7 +231,7 @@ def forward_parse_face(prepare_vision_frame : VisionFrame) -> Mask:
 	model_name = state_manager.get_item('face_parser_model')
 	face_parser = get_inference_pool().get(model_name)
 
-	with conditional_thread_semaphore():
+	with conditional_thread_semaphore(model_name):
 		region_mask : Mask = face_parser.run(None,
 		{
 			'input': prepare_vision_frame
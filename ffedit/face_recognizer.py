@@ -78,7 +78,7 @@ def calc_embedding(temp_vision_frame : VisionFrame, face_landmark_5 : FaceLandma
 def forward(crop_vision_frame : VisionFrame) -> Embedding:
 	face_recognizer = get_inference_pool().get('face_recognizer')
 
-	with conditional_thread_semaphore():
+	with conditional_thread_semaphore('arcface'):
 		embedding = face_recognizer.run(None,
 		{
 			'input': crop_vision_frame
@@ -6,6 +6,7 @@ from ffedit.types import Face, FaceSet, FaceStore, VisionFrame
 FACE_STORE : FaceStore =\
 {
 	'static_faces': {},
+	'matched_faces': {},
 	'reference_faces': {}
 }
 
@@ -31,6 +32,22 @@ def set_static_faces(vision_frame : VisionFrame, faces : List[Face]) -> None:
 
 def clear_static_faces() -> None:
 	FACE_STORE['static_faces'].clear()
+	FACE_STORE['matched_faces'].clear()
+
+
+def get_matched_faces(vision_frame : VisionFrame) -> Optional[List[Face]]:
+	vision_area = crop_vision_area(vision_frame)
+	vision_hash = create_hash(vision_area.tobytes())
+	if vision_hash in FACE_STORE['matched_faces']:
+		return FACE_STORE['matched_faces'][vision_hash]
+	return None
+
+
+def set_matched_faces(vision_frame : VisionFrame, faces : List[Face]) -> None:
+	vision_area = crop_vision_area(vision_frame)
+	vision_hash = create_hash(vision_area.tobytes())
+	if vision_hash:
+		FACE_STORE['matched_faces'][vision_hash] = faces
 
 
 def get_reference_faces() -> Optional[FaceSet]:
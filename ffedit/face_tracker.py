@@ -0,0 +1,103 @@
+from typing import List, Optional
+
+import numpy
+
+from ffedit import state_manager
+from ffedit.face_helper import calc_bounding_box_iou, convert_to_face_landmark_5, estimate_face_angle
+from ffedit.face_landmarker import detect_face_landmark, estimate_face_landmark_68_5
+from ffedit.face_selector import compare_faces, find_similar_faces
+from ffedit.face_store import get_reference_faces, set_matched_faces
+from ffedit.types import BoundingBox, Face, FaceLandmark68, FaceLandmarkSet, FaceScoreSet, Score, VisionFrame
+
+
+def track_faces(vision_frame : VisionFrame, previous_faces : List[Face], track_score : Score) -> Optional[List[Face]]:
+	faces = []
+
+	if not previous_faces:
+		return None
+
+	for previous_face in previous_faces:
+		face = track_face(vision_frame, previous_face, track_score)
+
+		if not face:
+			return None
+		faces.append(face)
+	return faces
+
+
+def track_face(vision_frame : VisionFrame, previous_face : Face, track_score : Score) -> Optional[Face]:
+	face_landmark_68, face_landmark_score_68 = detect_face_landmark(vision_frame, previous_face.bounding_box, previous_face.angle)
+
+	if face_landmark_score_68 < track_score:
+		return None
+
+	bounding_box = estimate_track_bounding_box(previous_face.bounding_box, previous_face.landmark_set.get('68'), face_landmark_68)
+
+	if calc_bounding_box_iou(previous_face.bounding_box, bounding_box) < 0.5:
+		return None
+
+	face_landmark_5_68 = convert_to_face_landmark_5(face_landmark_68)
+	face_landmark_68_5 = estimate_face_landmark_68_5(face_landmark_5_68)
+	face_landmark_set : FaceLandmarkSet =\
+	{
+		'5': face_landmark_5_68,
+		'5/68': face_landmark_5_68,
+		'68': face_landmark_68,
+		'68/5': face_landmark_68_5
+	}
+	face_score_set : FaceScoreSet =\
+	{
+		'detector': previous_face.score_set.get('detector'),
+		'landmarker': face_landmark_score_68
+	}
+	return Face(
+		bounding_box = bounding_box,
+		score_set = face_score_set,
+		landmark_set = face_landmark_set,
+		angle = estimate_face_angle(face_landmark_68_5),
+		embedding = previous_face.embedding,
+		normed_embedding = previous_face.normed_embedding,
+		gender = previous_face.gender,
+		age = previous_face.age,
+		race = previous_face.race
+	)
+
+
+def estimate_track_bounding_box(bounding_box : BoundingBox, previous_face_landmark_68 : FaceLandmark68, face_landmark_68 : FaceLandmark68) -> BoundingBox:
+	previous_landmark_center = numpy.mean(previous_face_landmark_68, axis = 0)
+	landmark_center = numpy.mean(face_landmark_68, axis = 0)
+	previous_landmark_spread = numpy.linalg.norm(numpy.std(previous_face_landmark_68, axis = 0))
+	landmark_spread = numpy.linalg.norm(numpy.std(face_landmark_68, axis = 0))
+	scale = landmark_spread / max(float(previous_landmark_spread), 1e-6)
+	bounding_box_center = numpy.add(bounding_box[:2], bounding_box[2:]) * 0.5 + landmark_center - previous_landmark_center
+	bounding_box_half = numpy.subtract(bounding_box[2:], bounding_box[:2]) * 0.5 * scale
+	return numpy.concatenate([ bounding_box_center - bounding_box_half, bounding_box_center + bounding_box_half ])
+
+
+def select_track_faces(faces : List[Face], previous_faces : List[Face]) -> List[Face]:
+	reference_faces = get_reference_faces()
+
+	if has_reference_track():
+		track_faces = []
+
+		for face in faces:
+			if match_track_face(face, previous_faces) or find_similar_faces([ face ], reference_faces, state_manager.get_item('reference_face_distance')):
+				track_faces.append(face)
+		return track_faces
+	return faces
+
+
+def store_track_faces(vision_frame : VisionFrame, faces : List[Face]) -> None:
+	if has_reference_track():
+		set_matched_faces(vision_frame, faces)
+
+
+def has_reference_track() -> bool:
+	return state_manager.get_item('face_selector_mode') == 'reference' and get_reference_faces() is not None
+
+
+def match_track_face(face : Face, previous_faces : List[Face]) -> bool:
+	for previous_face in previous_faces:
+		if calc_bounding_box_iou(face.bounding_box, previous_face.bounding_box) > 0.5 and compare_faces(face, previous_face, state_manager.get_item('reference_face_distance')):
+			return True
+	return False
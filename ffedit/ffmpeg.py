@@ -2,16 +2,20 @@ import os
 import subprocess
 import tempfile
 from functools import partial
-from typing import List, Optional, cast
+from io import BufferedReader
+from typing import Iterator, List, Optional, cast
 
+import numpy
 from tqdm import tqdm
 
 import ffedit.choices
 from ffedit import ffmpeg_builder, logger, process_manager, state_manager, wording
-from ffedit.filesystem import get_file_format, remove_file
-from ffedit.temp_helper import get_temp_file_path, get_temp_frames_pattern
-from ffedit.types import AudioBuffer, AudioEncoder, Commands, EncoderSet, Fps, UpdateProgress, VideoEncoder, VideoFormat
-from ffedit.vision import detect_video_duration, detect_video_fps, predict_video_frame_total
+from ffedit.common_helper import get_first
+from ffedit.filesystem import filter_audio_paths, get_file_format, remove_file
+from ffedit.frame_store import get_frame_store_path, get_frame_store_resolution, is_raw_frame_format
+from ffedit.temp_helper import get_temp_directory_path, get_temp_file_path, get_temp_frames_pattern
+from ffedit.types import AudioBuffer, AudioEncoder, Commands, EncoderSet, Fps, ProcessVisionFrames, Resolution, UpdateProgress, VideoEncoder, VideoFormat, VisionFrame
+from ffedit.vision import detect_video_duration, detect_video_fps, pack_resolution, predict_video_frame_total, unpack_resolution
 
 
 def run_ffmpeg_with_progress(commands : Commands, update_progress : UpdateProgress) -> subprocess.Popen[bytes]:
@@ -108,14 +112,13 @@ def get_available_encoder_set() -> EncoderSet:
 
 def extract_frames(target_path : str, temp_video_resolution : str, temp_video_fps : Fps, trim_frame_start : int, trim_frame_end : int) -> bool:
 	extract_frame_total = predict_video_frame_total(target_path, temp_video_fps, trim_frame_start, trim_frame_end)
-	temp_frames_pattern = get_temp_frames_pattern(target_path, '%08d')
 	commands = ffmpeg_builder.chain(
 		ffmpeg_builder.set_input(target_path),
 		ffmpeg_builder.set_media_resolution(temp_video_resolution),
 		ffmpeg_builder.set_frame_quality(0),
 		ffmpeg_builder.select_frame_range(trim_frame_start, trim_frame_end, temp_video_fps),
 		ffmpeg_builder.prevent_frame_drop(),
-		ffmpeg_builder.set_output(temp_frames_pattern)
+		set_temp_frames_output(target_path)
 	)
 
 	with tqdm(total = extract_frame_total, desc = wording.get('extracting'), unit = 'frame', ascii = ' =', disable = state_manager.get_item('log_level') in [ 'warn', 'error' ]) as progress:
@@ -123,6 +126,31 @@ def extract_frames(target_path : str, temp_video_resolution : str, temp_video_fp
 		return process.returncode == 0
 
 
+def detect_video_key_frames(target_path : str) -> List[int]:
+	target_video_fps = detect_video_fps(target_path)
+	key_frame_numbers = []
+	commands = ffmpeg_builder.chain(
+		ffmpeg_builder.skip_non_key_frames(),
+		ffmpeg_builder.set_input(target_path),
+		ffmpeg_builder.ignore_audio_stream(),
+		ffmpeg_builder.prevent_frame_drop(),
+		ffmpeg_builder.set_frame_checksum(),
+		ffmpeg_builder.cast_stream()
+	)
+	process = open_ffmpeg(commands)
+	stdout, _ = process.communicate()
+	time_base = 0.0
+
+	for line in stdout.decode().splitlines():
+		if line.startswith('#tb 0:'):
+			numerator, denominator = line.split(':')[1].strip().split('/')
+			time_base = int(numerator) / int(denominator)
+		if line.startswith('0,'):
+			presentation_timestamp = int(line.split(',')[2])
+			key_frame_numbers.append(round(presentation_timestamp * time_base * target_video_fps))
+	return key_frame_numbers
+
+
 def copy_image(target_path : str, temp_image_resolution : str) -> bool:
 	temp_image_path = get_temp_file_path(target_path)
 	commands = ffmpeg_builder.chain(
@@ -212,18 +240,31 @@ def replace_audio(target_path : str, audio_path : str, output_path : str) -> boo
 
 
 def merge_video(target_path : str, temp_video_fps : Fps, output_video_resolution : str, output_video_fps : Fps, trim_frame_start : int, trim_frame_end : int) -> bool:
+	audio_commands = mux_audio(target_path, trim_frame_start, trim_frame_end)
+
+	if render_video(target_path, temp_video_fps, output_video_resolution, output_video_fps, trim_frame_start, trim_frame_end, audio_commands):
+		return True
+	if audio_commands and not process_manager.is_stopping():
+		if get_first(filter_audio_paths(state_manager.get_item('source_paths'))):
+			logger.warn(wording.get('replacing_audio_skipped'), __name__)
+		else:
+			logger.warn(wording.get('restoring_audio_skipped'), __name__)
+		return render_video(target_path, temp_video_fps, output_video_resolution, output_video_fps, trim_frame_start, trim_frame_end, [])
+	return False
+
+
+def render_video(target_path : str, temp_video_fps : Fps, output_video_resolution : str, output_video_fps : Fps, trim_frame_start : int, trim_frame_end : int, audio_commands : Commands) -> bool:
 	output_video_encoder = state_manager.get_item('output_video_encoder')
 	output_video_quality = state_manager.get_item('output_video_quality')
 	output_video_preset = state_manager.get_item('output_video_preset')
 	merge_frame_total = predict_video_frame_total(target_path, output_video_fps, trim_frame_start, trim_frame_end)
 	temp_video_path = get_temp_file_path(target_path)
 	temp_video_format = cast(VideoFormat, get_file_format(temp_video_path))
-	temp_frames_pattern = get_temp_frames_pattern(target_path, '%08d')
 
 	output_video_encoder = fix_video_encoder(temp_video_format, output_video_encoder)
 	commands = ffmpeg_builder.chain(
-		ffmpeg_builder.set_input_fps(temp_video_fps),
-		ffmpeg_builder.set_input(temp_frames_pattern),
+		set_temp_frames_input(target_path, temp_video_fps),
+		audio_commands,
 		ffmpeg_builder.set_media_resolution(output_video_resolution),
 		ffmpeg_builder.set_video_encoder(output_video_encoder),
 		ffmpeg_builder.set_video_quality(output_video_encoder, output_video_quality),
@@ -239,6 +280,164 @@ def merge_video(target_path : str, temp_video_fps : Fps, output_video_resolution
 		return process.returncode == 0
 
 
+def set_temp_frames_output(target_path : str) -> Commands:
+	if is_raw_frame_format():
+		return ffmpeg_builder.chain(
+			ffmpeg_builder.set_raw_frame_format(),
+			ffmpeg_builder.set_output(get_frame_store_path(get_temp_directory_path(target_path)))
+		)
+	return ffmpeg_builder.set_output(get_temp_frames_pattern(target_path, '%08d'))
+
+
+def set_temp_frames_input(target_path : str, temp_video_fps : Fps) -> Commands:
+	if is_raw_frame_format():
+		return ffmpeg_builder.chain(
+			ffmpeg_builder.set_raw_frame_format(),
+			ffmpeg_builder.set_media_resolution(get_frame_store_resolution(target_path)),
+			ffmpeg_builder.set_input_fps(temp_video_fps),
+			ffmpeg_builder.set_input(get_frame_store_path(get_temp_directory_path(target_path)))
+		)
+	return ffmpeg_builder.chain(
+		ffmpeg_builder.set_input_fps(temp_video_fps),
+		ffmpeg_builder.set_input(get_temp_frames_pattern(target_path, '%08d'))
+	)
+
+
+def mux_audio(target_path : str, trim_frame_start : int, trim_frame_end : int) -> Commands:
+	output_audio_encoder = state_manager.get_item('output_audio_encoder')
+	output_audio_quality = state_manager.get_item('output_audio_quality')
+	output_audio_volume = state_manager.get_item('output_audio_volume')
+	source_audio_path = get_first(filter_audio_paths(state_manager.get_item('source_paths')))
+	target_video_fps = detect_video_fps(target_path)
+	temp_video_format = cast(VideoFormat, get_file_format(get_temp_file_path(target_path)))
+	temp_video_duration = (trim_frame_end - trim_frame_start) / target_video_fps
+
+	if output_audio_volume == 0:
+		return []
+
+	output_audio_encoder = fix_audio_encoder(temp_video_format, output_audio_encoder)
+	if source_audio_path:
+		audio_commands = ffmpeg_builder.chain(
+			ffmpeg_builder.set_input(source_audio_path),
+			ffmpeg_builder.select_media_stream('0:v:0'),
+			ffmpeg_builder.select_media_stream('1:a:0')
+		)
+	else:
+		audio_commands = ffmpeg_builder.chain(
+			ffmpeg_builder.select_media_range(trim_frame_start, trim_frame_end, target_video_fps),
+			ffmpeg_builder.set_input(target_path),
+			ffmpeg_builder.select_media_stream('0:v:0'),
+			ffmpeg_builder.select_media_stream('1:a:0?')
+		)
+	return ffmpeg_builder.chain(
+		audio_commands,
+		ffmpeg_builder.set_audio_encoder(output_audio_encoder),
+		ffmpeg_builder.set_audio_quality(output_audio_encoder, output_audio_quality),
+		ffmpeg_builder.set_padded_audio_volume(output_audio_volume),
+		ffmpeg_builder.set_video_duration(temp_video_duration)
+	)
+
+
+def stream_video(target_path : str, temp_video_resolution : str, temp_video_fps : Fps, output_video_resolution : str, output_video_fps : Fps, trim_frame_start : int, trim_frame_end : int, process_vision_frames : ProcessVisionFrames) -> bool:
+	decode_process = open_frame_decoder(target_path, temp_video_resolution, temp_video_fps, trim_frame_start, trim_frame_end)
+	is_frame_encoded = False
+
+	try:
+		temp_vision_frames = read_stream_frames(decode_process, unpack_resolution(temp_video_resolution))
+		is_frame_encoded = encode_frames(target_path, temp_video_fps, output_video_resolution, output_video_fps, trim_frame_start, trim_frame_end, process_vision_frames(temp_vision_frames))
+	finally:
+		close_stream_process(decode_process, is_frame_encoded)
+	return is_frame_encoded and decode_process.returncode == 0
+
+
+def encode_frames(target_path : str, temp_video_fps : Fps, output_video_resolution : str, output_video_fps : Fps, trim_frame_start : int, trim_frame_end : int, temp_vision_frames : Iterator[VisionFrame]) -> bool:
+	encode_process = None
+	is_stream_broken = False
+	is_stream_complete = False
+
+	try:
+		for temp_vision_frame in temp_vision_frames:
+			if not encode_process:
+				temp_frame_height, temp_frame_width = temp_vision_frame.shape[:2]
+				encode_process = open_frame_encoder(target_path, pack_resolution((temp_frame_width, temp_frame_height)), temp_video_fps, output_video_resolution, output_video_fps, trim_frame_start, trim_frame_end)
+			if not write_stream_frame(encode_process, temp_vision_frame):
+				is_stream_broken = True
+				break
+		is_stream_complete = not is_stream_broken
+	finally:
+		if encode_process:
+			close_stream_process(encode_process, is_stream_complete)
+
+	if encode_process:
+		return is_stream_complete and encode_process.returncode == 0
+	return False
+
+
+def close_stream_process(process : subprocess.Popen[bytes], is_stream_complete : bool) -> None:
+	if process_manager.is_stopping() or not is_stream_complete:
+		process.terminate()
+	process.stdin.close()
+	process.stdout.close()
+	process.wait()
+
+
+def open_frame_decoder(target_path : str, temp_video_resolution : str, temp_video_fps : Fps, trim_frame_start : int, trim_frame_end : int) -> subprocess.Popen[bytes]:
+	commands = ffmpeg_builder.chain(
+		ffmpeg_builder.set_input(target_path),
+		ffmpeg_builder.set_media_resolution(temp_video_resolution),
+		ffmpeg_builder.select_frame_range(trim_frame_start, trim_frame_end, temp_video_fps),
+		ffmpeg_builder.prevent_frame_drop(),
+		ffmpeg_builder.set_raw_frame_format(),
+		ffmpeg_builder.cast_stream()
+	)
+	return open_ffmpeg(commands)
+
+
+def open_frame_encoder(target_path : str, temp_frame_resolution : str, temp_video_fps : Fps, output_video_resolution : str, output_video_fps : Fps, trim_frame_start : int, trim_frame_end : int) -> subprocess.Popen[bytes]:
+	output_video_encoder = state_manager.get_item('output_video_encoder')
+	output_video_quality = state_manager.get_item('output_video_quality')
+	output_video_preset = state_manager.get_item('output_video_preset')
+	temp_video_path = get_temp_file_path(target_path)
+	temp_video_format = cast(VideoFormat, get_file_format(temp_video_path))
+
+	output_video_encoder = fix_video_encoder(temp_video_format, output_video_encoder)
+	commands = ffmpeg_builder.chain(
+		ffmpeg_builder.set_raw_frame_format(),
+		ffmpeg_builder.set_media_resolution(temp_frame_resolution),
+		ffmpeg_builder.set_input_fps(temp_video_fps),
+		ffmpeg_builder.set_input('-'),
+		mux_audio(target_path, trim_frame_start, trim_frame_end),
+		ffmpeg_builder.set_media_resolution(output_video_resolution),
+		ffmpeg_builder.set_video_encoder(output_video_encoder),
+		ffmpeg_builder.set_video_quality(output_video_encoder, output_video_quality),
+		ffmpeg_builder.set_video_preset(output_video_encoder, output_video_preset),
+		ffmpeg_builder.set_video_fps(output_video_fps),
+		ffmpeg_builder.set_pixel_format(output_video_encoder),
+		ffmpeg_builder.set_video_colorspace('bt709'),
+		ffmpeg_builder.force_output(temp_video_path)
+	)
+	return open_ffmpeg(commands)
+
+
+def read_stream_frames(process : subprocess.Popen[bytes], stream_resolution : Resolution) -> Iterator[VisionFrame]:
+	stream_width, stream_height = stream_resolution
+	stream_frame_size = stream_width * stream_height * 3
+
+	while process_manager.is_processing():
+		stream_buffer = bytearray(stream_frame_size)
+		if cast(BufferedReader, process.stdout).readinto(stream_buffer) < stream_frame_size:
+			break
+		yield numpy.frombuffer(stream_buffer, dtype = numpy.uint8).reshape(stream_height, stream_width, 3)
+
+
+def write_stream_frame(process : subprocess.Popen[bytes], vision_frame : VisionFrame) -> bool:
+	try:
+		process.stdin.write(numpy.ascontiguousarray(vision_frame).data)
+		return True
+	except (BrokenPipeError, ValueError):
+		return False
+
+
 def concat_video(output_path : str, temp_output_paths : List[str]) -> bool:
 	concat_video_path = tempfile.mktemp()
 
@@ -84,6 +84,10 @@ def select_frame_range(frame_start : int, frame_end : int, video_fps : Fps) -> C
 	return [ '-vf', 'fps=' + str(video_fps) ]
 
 
+def skip_non_key_frames() -> Commands:
+	return [ '-skip_frame', 'nokey' ]
+
+
 def prevent_frame_drop() -> Commands:
 	return [ '-vsync', '0' ]
 
@@ -158,6 +162,10 @@ def set_audio_volume(audio_volume : int) -> Commands:
 	return [ '-filter:a', 'volume=' + str(audio_volume / 100) ]
 
 
+def set_padded_audio_volume(audio_volume : int) -> Commands:
+	return [ '-filter:a', 'volume=' + str(audio_volume / 100) + ',apad' ]
+
+
 def set_video_encoder(video_encoder : str) -> Commands:
 	return [ '-c:v', video_encoder ]
 
@@ -216,10 +224,22 @@ def capture_video() -> Commands:
 	return [ '-f', 'rawvideo', '-pix_fmt', 'rgb24' ]
 
 
+def set_raw_frame_format() -> Commands:
+	return [ '-f', 'rawvideo', '-pix_fmt', 'bgr24' ]
+
+
 def ignore_video_stream() -> Commands:
 	return [ '-vn' ]
 
 
+def ignore_audio_stream() -> Commands:
+	return [ '-an' ]
+
+
+def set_frame_checksum() -> Commands:
+	return [ '-f', 'framecrc' ]
+
+
 def map_nvenc_preset(video_preset : VideoPreset) -> Optional[str]:
 	if video_preset in [ 'ultrafast', 'superfast', 'veryfast', 'faster', 'fast' ]:
 		return 'fast'
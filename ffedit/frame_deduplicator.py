@@ -0,0 +1,50 @@
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Optional
+
+from ffedit import state_manager
+from ffedit.frame_store import copy_temp_frame, read_temp_frame
+from ffedit.types import DuplicateFrameSet, Fingerprint
+from ffedit.vision import calc_fingerprint_distance, create_frame_fingerprint
+
+DUPLICATE_FRAME_SET : DuplicateFrameSet = {}
+
+
+def get_duplicate_frame_set() -> DuplicateFrameSet:
+	return DUPLICATE_FRAME_SET
+
+
+def detect_duplicate_frames(temp_frame_paths : List[str]) -> DuplicateFrameSet:
+	frame_duplicate_threshold = state_manager.get_item('frame_duplicate_threshold')
+	clear_duplicate_frames()
+
+	if isinstance(frame_duplicate_threshold, int) and 'lip_syncer' not in state_manager.get_item('processors'):
+		temp_frame_paths = sorted(temp_frame_paths)
+		anchor_frame_path = None
+		anchor_fingerprint = None
+
+		with ThreadPoolExecutor(max_workers = state_manager.get_item('execution_thread_count')) as executor:
+			frame_fingerprints = executor.map(read_frame_fingerprint, temp_frame_paths)
+
+			for temp_frame_path, frame_fingerprint in zip(temp_frame_paths, frame_fingerprints):
+				if anchor_frame_path and frame_fingerprint is not None and anchor_fingerprint is not None and calc_fingerprint_distance(anchor_fingerprint, frame_fingerprint) <= frame_duplicate_threshold:
+					DUPLICATE_FRAME_SET[temp_frame_path] = anchor_frame_path
+				else:
+					anchor_frame_path = temp_frame_path
+					anchor_fingerprint = frame_fingerprint
+	return DUPLICATE_FRAME_SET
+
+
+def read_frame_fingerprint(frame_path : str) -> Optional[Fingerprint]:
+	vision_frame = read_temp_frame(frame_path)
+
+	if vision_frame is not None:
+		return create_frame_fingerprint(vision_frame)
+	return None
+
+
+def restore_duplicate_frames() -> bool:
+	return all(copy_temp_frame(anchor_frame_path, duplicate_frame_path) for duplicate_frame_path, anchor_frame_path in DUPLICATE_FRAME_SET.items())
+
+
+def clear_duplicate_frames() -> None:
+	DUPLICATE_FRAME_SET.clear()
@@ -0,0 +1,201 @@
+import threading
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from queue import Queue
+from typing import Deque, Dict, Iterator, List, Optional, Tuple
+
+from ffedit import process_manager, state_manager
+from ffedit.checkpoint_manager import append_processed_frame_number
+from ffedit.ffmpeg import encode_frames
+from ffedit.frame_store import read_temp_frame, resolve_frame_store_index, write_temp_frame
+from ffedit.types import Fps, QueuePayload, VisionFrame
+
+FRAME_STAGER_LOCK : threading.Lock = threading.Lock()
+READ_AHEAD_EXECUTOR : Optional[ThreadPoolExecutor] = None
+WRITE_BEHIND_EXECUTOR : Optional[ThreadPoolExecutor] = None
+WRITE_BEHIND_SEMAPHORE : Optional[threading.Semaphore] = None
+WRITE_BEHIND_FUTURES : Dict[str, Future[bool]] = {}
+ENCODE_BEHIND_QUEUE : Optional[Queue[Optional[List[QueuePayload]]]] = None
+ENCODE_BEHIND_FUTURE : Optional[Future[bool]] = None
+ENCODE_BEHIND_ABORTED : bool = False
+CHECKPOINT_PROCESSOR : Optional[str] = None
+
+
+def get_read_ahead_executor() -> ThreadPoolExecutor:
+	global READ_AHEAD_EXECUTOR
+
+	with FRAME_STAGER_LOCK:
+		if not READ_AHEAD_EXECUTOR:
+			READ_AHEAD_EXECUTOR = ThreadPoolExecutor(max_workers = state_manager.get_item('execution_thread_count'))
+	return READ_AHEAD_EXECUTOR
+
+
+def get_write_behind_executor() -> Tuple[ThreadPoolExecutor, threading.Semaphore]:
+	global WRITE_BEHIND_EXECUTOR, WRITE_BEHIND_SEMAPHORE
+
+	with FRAME_STAGER_LOCK:
+		if not WRITE_BEHIND_EXECUTOR or not WRITE_BEHIND_SEMAPHORE:
+			WRITE_BEHIND_EXECUTOR = ThreadPoolExecutor(max_workers = state_manager.get_item('execution_thread_count'))
+			WRITE_BEHIND_SEMAPHORE = threading.Semaphore(state_manager.get_item('execution_thread_count') * state_manager.get_item('execution_write_behind_count'))
+	return WRITE_BEHIND_EXECUTOR, WRITE_BEHIND_SEMAPHORE
+
+
+def read_ahead_frames(queue_payloads : Iterator[QueuePayload]) -> Iterator[Tuple[QueuePayload, VisionFrame]]:
+	read_ahead_count = state_manager.get_item('execution_read_ahead_count')
+	deque_futures : Deque[Tuple[QueuePayload, Future[VisionFrame]]] = deque()
+
+	if read_ahead_count == 0:
+		for queue_payload in queue_payloads:
+			yield queue_payload, read_temp_frame(queue_payload.get('frame_path'))
+		return
+
+	for queue_payload in queue_payloads:
+		future = get_read_ahead_executor().submit(read_temp_frame, queue_payload.get('frame_path'))
+		deque_futures.append((queue_payload, future))
+
+		if len(deque_futures) > read_ahead_count:
+			queue_payload, future = deque_futures.popleft()
+			yield queue_payload, future.result()
+
+	while deque_futures and process_manager.is_processing():
+		queue_payload, future = deque_futures.popleft()
+		yield queue_payload, future.result()
+
+
+def read_ahead_frame_batches(queue_payloads : Iterator[QueuePayload]) -> Iterator[List[Tuple[QueuePayload, VisionFrame]]]:
+	execution_batch_size = state_manager.get_item('execution_batch_size')
+	frame_batch = []
+
+	for queue_payload, vision_frame in read_ahead_frames(queue_payloads):
+		frame_batch.append((queue_payload, vision_frame))
+
+		if len(frame_batch) == execution_batch_size:
+			yield frame_batch
+			frame_batch = []
+
+	if frame_batch:
+		yield frame_batch
+
+
+def set_checkpoint_processor(processor : Optional[str]) -> None:
+	global CHECKPOINT_PROCESSOR
+
+	CHECKPOINT_PROCESSOR = processor
+
+
+def write_checkpoint_frame(frame_path : str, vision_frame : VisionFrame, processor : Optional[str]) -> bool:
+	if write_temp_frame(frame_path, vision_frame):
+		if processor:
+			append_processed_frame_number(state_manager.get_item('target_path'), processor, resolve_frame_store_index(frame_path))
+		return True
+	return False
+
+
+def write_behind_frame(frame_path : str, vision_frame : VisionFrame) -> None:
+	if state_manager.get_item('execution_write_behind_count') == 0:
+		write_checkpoint_frame(frame_path, vision_frame, CHECKPOINT_PROCESSOR)
+		return
+
+	write_behind_executor, write_behind_semaphore = get_write_behind_executor()
+	write_behind_semaphore.acquire()
+	future = write_behind_executor.submit(write_checkpoint_frame, frame_path, vision_frame, CHECKPOINT_PROCESSOR)
+	future.add_done_callback(lambda _: write_behind_semaphore.release())
+
+	with FRAME_STAGER_LOCK:
+		WRITE_BEHIND_FUTURES[frame_path] = future
+
+
+def conditional_write_behind_frame(frame_path : str, target_vision_frame : VisionFrame, output_vision_frame : VisionFrame) -> None:
+	if output_vision_frame is not target_vision_frame:
+		write_behind_frame(frame_path, output_vision_frame)
+
+
+def wait_for_frames(frame_paths : List[str]) -> None:
+	with FRAME_STAGER_LOCK:
+		futures = [ WRITE_BEHIND_FUTURES.pop(frame_path) for frame_path in frame_paths if frame_path in WRITE_BEHIND_FUTURES ]
+	wait(futures)
+
+
+def flush_frames() -> None:
+	with FRAME_STAGER_LOCK:
+		futures = list(WRITE_BEHIND_FUTURES.values())
+		WRITE_BEHIND_FUTURES.clear()
+	wait(futures)
+
+
+def clear_frame_stager() -> None:
+	global READ_AHEAD_EXECUTOR, WRITE_BEHIND_EXECUTOR, WRITE_BEHIND_SEMAPHORE, CHECKPOINT_PROCESSOR
+
+	flush_frames()
+	with FRAME_STAGER_LOCK:
+		if READ_AHEAD_EXECUTOR:
+			READ_AHEAD_EXECUTOR.shutdown()
+		if WRITE_BEHIND_EXECUTOR:
+			WRITE_BEHIND_EXECUTOR.shutdown()
+		READ_AHEAD_EXECUTOR = None
+		WRITE_BEHIND_EXECUTOR = None
+		WRITE_BEHIND_SEMAPHORE = None
+		CHECKPOINT_PROCESSOR = None
+
+
+def start_frame_encoder(target_path : str, temp_video_fps : Fps, output_video_resolution : str, output_video_fps : Fps, trim_frame_start : int, trim_frame_end : int) -> None:
+	global ENCODE_BEHIND_QUEUE, ENCODE_BEHIND_FUTURE, ENCODE_BEHIND_ABORTED
+
+	ENCODE_BEHIND_QUEUE = Queue()
+	ENCODE_BEHIND_ABORTED = False
+	encode_behind_executor = ThreadPoolExecutor(max_workers = 1)
+	ENCODE_BEHIND_FUTURE = encode_behind_executor.submit(encode_frames, target_path, temp_video_fps, output_video_resolution, output_video_fps, trim_frame_start, trim_frame_end, read_encode_frames(ENCODE_BEHIND_QUEUE))
+	encode_behind_executor.shutdown(wait = False)
+
+
+def encode_behind_frames(queue_payloads : List[QueuePayload]) -> None:
+	if ENCODE_BEHIND_QUEUE:
+		ENCODE_BEHIND_QUEUE.put(queue_payloads)
+
+
+def finish_frame_encoder() -> bool:
+	global ENCODE_BEHIND_QUEUE, ENCODE_BEHIND_FUTURE
+
+	if ENCODE_BEHIND_QUEUE and ENCODE_BEHIND_FUTURE:
+		ENCODE_BEHIND_QUEUE.put(None)
+		is_frame_encoded = ENCODE_BEHIND_FUTURE.result()
+		ENCODE_BEHIND_QUEUE = None
+		ENCODE_BEHIND_FUTURE = None
+		return is_frame_encoded
+	return False
+
+
+def abort_frame_encoder() -> None:
+	global ENCODE_BEHIND_QUEUE, ENCODE_BEHIND_FUTURE, ENCODE_BEHIND_ABORTED
+
+	if ENCODE_BEHIND_QUEUE and ENCODE_BEHIND_FUTURE:
+		ENCODE_BEHIND_ABORTED = True
+		ENCODE_BEHIND_QUEUE.put(None)
+		wait([ ENCODE_BEHIND_FUTURE ])
+		ENCODE_BEHIND_QUEUE = None
+		ENCODE_BEHIND_FUTURE = None
+
+
+def read_encode_frames(encode_queue : Queue[Optional[List[QueuePayload]]]) -> Iterator[VisionFrame]:
+	for queue_payload in reorder_queue_payloads(encode_queue):
+		if not process_manager.is_processing() or ENCODE_BEHIND_ABORTED:
+			break
+		yield read_temp_frame(queue_payload.get('frame_path'))
+
+	if ENCODE_BEHIND_ABORTED:
+		raise InterruptedError
+
+
+def reorder_queue_payloads(encode_queue : Queue[Optional[List[QueuePayload]]]) -> Iterator[QueuePayload]:
+	reorder_buffer : Dict[int, QueuePayload] = {}
+	frame_number = 0
+	queue_payloads = encode_queue.get()
+
+	while queue_payloads is not None:
+		for queue_payload in queue_payloads:
+			reorder_buffer[queue_payload.get('frame_number')] = queue_payload
+
+		while frame_number in reorder_buffer:
+			yield reorder_buffer.pop(frame_number)
+			frame_number += 1
+		queue_payloads = encode_queue.get()
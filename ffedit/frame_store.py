@@ -0,0 +1,118 @@
+import os
+import threading
+from typing import Dict, List, Optional
+
+import numpy
+
+from ffedit import logger, state_manager, wording
+from ffedit.filesystem import copy_file, get_file_name, is_file
+from ffedit.json import read_json, write_json
+from ffedit.temp_helper import get_temp_directory_path, get_temp_frames_pattern, resolve_temp_frame_paths
+from ffedit.types import FrameStore, Resolution, VisionFrame
+from ffedit.vision import pack_resolution, read_image, unpack_resolution, write_image
+
+FRAME_STORE_LOCK : threading.Lock = threading.Lock()
+FRAME_STORES : Dict[str, FrameStore] = {}
+
+
+def is_raw_frame_format() -> bool:
+	return state_manager.get_item('temp_frame_format') == 'raw'
+
+
+def get_frame_store_path(temp_directory_path : str) -> str:
+	return os.path.join(temp_directory_path, 'frames.raw')
+
+
+def create_frame_store(target_path : str, temp_video_resolution : str) -> bool:
+	temp_frames_store_path = get_frame_store_path(get_temp_directory_path(target_path))
+	return write_json(temp_frames_store_path + '.json',
+	{
+		'resolution': temp_video_resolution
+	})
+
+
+def detect_frame_store_resolution(temp_frames_store_path : str) -> Optional[Resolution]:
+	frame_store_content = read_json(temp_frames_store_path + '.json')
+
+	if frame_store_content and frame_store_content.get('resolution'):
+		return unpack_resolution(frame_store_content.get('resolution'))
+	return None
+
+
+def get_frame_store(temp_frames_store_path : str) -> Optional[FrameStore]:
+	with FRAME_STORE_LOCK:
+		if temp_frames_store_path not in FRAME_STORES and is_file(temp_frames_store_path):
+			frame_store_resolution = detect_frame_store_resolution(temp_frames_store_path)
+
+			if frame_store_resolution and os.path.getsize(temp_frames_store_path):
+				frame_width, frame_height = frame_store_resolution
+				frame_total = os.path.getsize(temp_frames_store_path) // (frame_width * frame_height * 3)
+				FRAME_STORES[temp_frames_store_path] = numpy.memmap(temp_frames_store_path, dtype = numpy.uint8, mode = 'r+', shape = (frame_total, frame_height, frame_width, 3))
+		return FRAME_STORES.get(temp_frames_store_path)
+
+
+def clear_frame_stores() -> None:
+	with FRAME_STORE_LOCK:
+		for frame_store in FRAME_STORES.values():
+			frame_store.flush()
+		FRAME_STORES.clear()
+
+
+def resolve_frame_store_index(frame_path : str) -> int:
+	return int(get_file_name(frame_path)) - 1
+
+
+def resolve_temp_frames(target_path : str) -> List[str]:
+	if is_raw_frame_format():
+		frame_store = get_frame_store(get_frame_store_path(get_temp_directory_path(target_path)))
+
+		if frame_store is not None:
+			temp_frames_pattern = get_temp_frames_pattern(target_path, '%08d')
+			return [ temp_frames_pattern % frame_number for frame_number in range(1, len(frame_store) + 1) ]
+		return []
+	return resolve_temp_frame_paths(target_path)
+
+
+def read_temp_frame(frame_path : str) -> Optional[VisionFrame]:
+	if is_raw_frame_format():
+		frame_store = get_frame_store(get_frame_store_path(os.path.dirname(frame_path)))
+		frame_store_index = resolve_frame_store_index(frame_path)
+
+		if frame_store is not None and frame_store_index in range(len(frame_store)):
+			vision_frame = frame_store[frame_store_index].view(numpy.ndarray)
+			vision_frame.flags.writeable = False
+			return vision_frame
+		return None
+	return read_image(frame_path)
+
+
+def write_temp_frame(frame_path : str, vision_frame : VisionFrame) -> bool:
+	if is_raw_frame_format():
+		frame_store = get_frame_store(get_frame_store_path(os.path.dirname(frame_path)))
+		frame_store_index = resolve_frame_store_index(frame_path)
+
+		if frame_store is not None and frame_store_index in range(len(frame_store)):
+			frame_height, frame_width = frame_store.shape[1:3]
+
+			if vision_frame.shape[:2] != (frame_height, frame_width):
+				logger.error(wording.get('temp_frame_resolution_mismatch').format(resolution = pack_resolution((vision_frame.shape[1], vision_frame.shape[0])), frame_store_resolution = pack_resolution((frame_width, frame_height))), __name__)
+				return False
+			frame_store[frame_store_index] = vision_frame
+			return True
+		return False
+	return write_image(frame_path, vision_frame)
+
+
+def copy_temp_frame(frame_path : str, copy_path : str) -> bool:
+	if is_raw_frame_format():
+		vision_frame = read_temp_frame(frame_path)
+		return vision_frame is not None and write_temp_frame(copy_path, vision_frame)
+	return copy_file(frame_path, copy_path)
+
+
+def get_frame_store_resolution(target_path : str) -> Optional[str]:
+	frame_store_resolution = detect_frame_store_resolution(get_frame_store_path(get_temp_directory_path(target_path)))
+
+	if frame_store_resolution:
+		return pack_resolution(frame_store_resolution)
+	return None
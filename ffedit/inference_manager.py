@@ -1,14 +1,16 @@
 import importlib
-from time import sleep
-from typing import List
+import threading
+from time import monotonic, sleep
+from typing import Any, List, Optional
 
+import numpy
 from onnxruntime import InferenceSession
 
 from ffedit import process_manager, state_manager
 from ffedit.app_context import detect_app_context
 from ffedit.execution import create_inference_session_providers
 from ffedit.filesystem import is_file
-from ffedit.types import DownloadSet, ExecutionProvider, InferencePool, InferencePoolSet
+from ffedit.types import DownloadSet, ExecutionProvider, InferenceInputFeed, InferenceOutputs, InferencePool, InferencePoolSet, InferenceRequest
 
 INFERENCE_POOL_SET : InferencePoolSet =\
 {
@@ -17,6 +19,100 @@ INFERENCE_POOL_SET : InferencePoolSet =\
 }
 
 
+class BatchInferenceSession(InferenceSession):
+	def __init__(self, model_path : str, providers : List[Any], batch_size : int, batch_wait : int) -> None:
+		super().__init__(model_path, providers = providers)
+		self.batch_size = batch_size
+		self.batch_wait = batch_wait / 1000
+		self.batch_condition = threading.Condition()
+		self.batch_requests : List[InferenceRequest] = []
+		self.batch_running = 0
+		self.batch_support = all(not isinstance(node.shape[0], int) for node in self.get_inputs() + self.get_outputs())
+
+	def run(self, output_names : Optional[List[str]], input_feed : InferenceInputFeed, run_options : Any = None) -> InferenceOutputs:
+		batch_key = create_batch_key(output_names, input_feed)
+
+		if not self.batch_support or run_options or not batch_key:
+			return super().run(output_names, input_feed, run_options)
+
+		inference_request : InferenceRequest =\
+		{
+			'batch_key': batch_key,
+			'output_names': output_names,
+			'input_feed': input_feed,
+			'outputs': None,
+			'error': None
+		}
+		batch_deadline = monotonic() + self.batch_wait
+
+		with self.batch_condition:
+			self.batch_requests.append(inference_request)
+			self.batch_condition.notify_all()
+
+		while inference_request.get('outputs') is None and inference_request.get('error') is None:
+			inference_requests = self.collect_batch(inference_request, batch_deadline)
+
+			if inference_requests:
+				self.run_batch(inference_requests)
+
+		if inference_request.get('error'):
+			raise inference_request.get('error')
+		return inference_request.get('outputs')
+
+	def collect_batch(self, inference_request : InferenceRequest, batch_deadline : float) -> List[InferenceRequest]:
+		with self.batch_condition:
+			if inference_request.get('outputs') is not None or inference_request.get('error') is not None:
+				return []
+			if not any(batch_request is inference_request for batch_request in self.batch_requests):
+				self.batch_condition.wait()
+				return []
+
+			inference_requests = [ batch_request for batch_request in self.batch_requests if batch_request.get('batch_key') == inference_request.get('batch_key') ][:self.batch_size]
+			batch_remain = batch_deadline - monotonic()
+			has_batch_peers = len(inference_requests) > 1 or self.batch_running > 0
+
+			if len(inference_requests) == self.batch_size or batch_remain <= 0 or not has_batch_peers:
+				self.batch_requests = [ batch_request for batch_request in self.batch_requests if not any(batch_request is collect_request for collect_request in inference_requests) ]
+				self.batch_running += len(inference_requests)
+				return inference_requests
+
+			self.batch_condition.wait(batch_remain)
+		return []
+
+	def run_batch(self, inference_requests : List[InferenceRequest]) -> None:
+		batch_outputs_set : List[Optional[InferenceOutputs]] = [ None ] * len(inference_requests)
+		batch_error = None
+
+		try:
+			if len(inference_requests) == 1:
+				batch_outputs_set[0] = super().run(inference_requests[0].get('output_names'), inference_requests[0].get('input_feed'))
+			else:
+				batch_outputs_set = self.run_batch_outputs(inference_requests)
+		except Exception as exception:
+			batch_error = exception
+
+		with self.batch_condition:
+			for inference_request, batch_outputs in zip(inference_requests, batch_outputs_set):
+				inference_request['outputs'] = batch_outputs
+				inference_request['error'] = batch_error
+			self.batch_running -= len(inference_requests)
+			self.batch_condition.notify_all()
+
+	def run_batch_outputs(self, inference_requests : List[InferenceRequest]) -> List[Optional[InferenceOutputs]]:
+		first_input_feed = inference_requests[0].get('input_feed')
+		batch_sizes = [ len(next(iter(inference_request.get('input_feed').values()))) for inference_request in inference_requests ]
+		batch_indices = numpy.cumsum(batch_sizes)[:-1]
+		batch_input_feed = { input_name: numpy.concatenate([ inference_request.get('input_feed').get(input_name) for inference_request in inference_requests ]) for input_name in first_input_feed }
+		batch_outputs = super().run(inference_requests[0].get('output_names'), batch_input_feed)
+
+		if all(isinstance(batch_output, numpy.ndarray) and batch_output.ndim and len(batch_output) == sum(batch_sizes) for batch_output in batch_outputs):
+			batch_output_splits = [ numpy.split(batch_output, batch_indices) for batch_output in batch_outputs ]
+			return [ list(batch_outputs) for batch_outputs in zip(*batch_output_splits) ]
+
+		self.batch_support = False
+		return [ super(BatchInferenceSession, self).run(inference_request.get('output_names'), inference_request.get('input_feed')) for inference_request in inference_requests ]
+
+
 def get_inference_pool(module_name : str, model_names : List[str], model_source_set : DownloadSet) -> InferencePool:
 	while process_manager.is_checking():
 		sleep(0.5)
@@ -58,9 +154,32 @@ def clear_inference_pool(module_name : str, model_names : List[str]) -> None:
 
 def create_inference_session(model_path : str, execution_device_id : str, execution_providers : List[ExecutionProvider]) -> InferenceSession:
 	inference_session_providers = create_inference_session_providers(execution_device_id, execution_providers)
+	execution_batch_size = state_manager.get_item('execution_batch_size')
+
+	if execution_batch_size and execution_batch_size > 1:
+		return BatchInferenceSession(model_path, inference_session_providers, execution_batch_size, state_manager.get_item('execution_batch_wait'))
 	return InferenceSession(model_path, providers = inference_session_providers)
 
 
+def run_direct_inference(inference_session : InferenceSession, output_names : Optional[List[str]], input_feed : InferenceInputFeed) -> InferenceOutputs:
+	return InferenceSession.run(inference_session, output_names, input_feed)
+
+
+def has_batch_axis(inference_session : InferenceSession, input_name : str) -> bool:
+	for session_input in inference_session.get_inputs():
+		if session_input.name == input_name:
+			return not isinstance(session_input.shape[0], int)
+	return False
+
+
+def create_batch_key(output_names : Optional[List[str]], input_feed : InferenceInputFeed) -> Optional[str]:
+	input_frames = list(input_feed.values())
+
+	if input_frames and all(isinstance(input_frame, numpy.ndarray) and input_frame.ndim and len(input_frame) == 1 for input_frame in input_frames):
+		return str(output_names) + ''.join(input_name + str(input_frame.shape[1:]) + str(input_frame.dtype) for input_name, input_frame in input_feed.items())
+	return None
+
+
 def get_inference_context(module_name : str, model_names : List[str], execution_device_id : str, execution_providers : List[ExecutionProvider]) -> str:
 	inference_context = '.'.join([ module_name ] + model_names + [ execution_device_id ] + list(execution_providers))
 	return inference_context
@@ -1,4 +1,8 @@
+import psutil
+
+from ffedit import state_manager
 from ffedit.common_helper import is_macos, is_windows
+from ffedit.execution import detect_free_video_memory
 
 if is_windows():
 	import ctypes
@@ -19,3 +23,14 @@ def limit_system_memory(system_memory_limit : int = 1) -> bool:
 		return True
 	except Exception:
 		return False
+
+
+def detect_free_memory() -> int:
+	execution_providers = state_manager.get_item('execution_providers')
+
+	if 'cuda' in execution_providers or 'tensorrt' in execution_providers:
+		free_video_memory = detect_free_video_memory(state_manager.get_item('execution_device_id'))
+
+		if free_video_memory:
+			return free_video_memory
+	return psutil.virtual_memory().available
@@ -1,15 +1,29 @@
 import importlib
+import multiprocessing
 import os
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from collections import deque
+from concurrent.futures import Executor, FIRST_COMPLETED, Future, ProcessPoolExecutor, ThreadPoolExecutor, wait
 from queue import Queue
 from types import ModuleType
-from typing import Any, List
+from typing import Any, Deque, Dict, Iterator, List, Optional, Union
 
+import numpy
 from tqdm import tqdm
 
-from ffedit import logger, state_manager, wording
+from ffedit import logger, process_manager, state_manager, wording
+from ffedit.audio import create_empty_audio_frame, get_voice_frame, read_static_voice
+from ffedit.checkpoint_manager import append_processed_frame_numbers, get_processed_frame_numbers
+from ffedit.common_helper import get_first
 from ffedit.exit_helper import hard_exit
-from ffedit.types import ProcessFrames, QueuePayload
+from ffedit.face_analyser import get_average_face, get_many_faces, get_one_face
+from ffedit.face_selector import find_similar_faces, sort_and_filter_faces, sort_faces_by_order
+from ffedit.face_store import append_reference_face, get_matched_faces, get_reference_faces, get_static_faces, set_matched_faces, set_static_faces
+from ffedit.filesystem import filter_audio_paths, filter_image_paths
+from ffedit.frame_deduplicator import get_duplicate_frame_set
+from ffedit.frame_stager import clear_frame_stager, conditional_write_behind_frame, encode_behind_frames, flush_frames, read_ahead_frame_batches, set_checkpoint_processor, wait_for_frames
+from ffedit.processors.types import ProcessorState
+from ffedit.types import AudioFrame, Face, FaceSet, Fps, ProcessFrames, QueuePayload, State, UpdateProgress, VisionFrame
+from ffedit.vision import read_static_images, restrict_video_fps
 
 PROCESSORS_METHODS =\
 [
@@ -20,12 +34,18 @@ PROCESSORS_METHODS =\
 	'pre_check',
 	'pre_process',
 	'post_process',
+	'is_face_geometry_preserved',
+	'get_frame_scale',
 	'get_reference_frame',
 	'process_frame',
 	'process_frames',
 	'process_image',
 	'process_video'
 ]
+PROCESSORS_BATCH_METHODS =\
+[
+	'process_frames_batch'
+]
 
 
 def load_processor_module(processor : str) -> Any:
@@ -44,6 +64,10 @@ def load_processor_module(processor : str) -> Any:
 	return processor_module
 
 
+def has_batch_support(processor_module : ModuleType) -> bool:
+	return all(hasattr(processor_module, method_name) for method_name in PROCESSORS_BATCH_METHODS)
+
+
 def get_processors_modules(processors : List[str]) -> List[ModuleType]:
 	processor_modules = []
 
@@ -54,20 +78,233 @@ def get_processors_modules(processors : List[str]) -> List[ModuleType]:
 
 
 def multi_process_frames(source_paths : List[str], temp_frame_paths : List[str], process_frames : ProcessFrames) -> None:
+	target_path = state_manager.get_item('target_path')
+	processed_frame_numbers = set(get_processed_frame_numbers(target_path, process_frames.__module__))
+	duplicate_frame_set = get_duplicate_frame_set()
 	queue_payloads = create_queue_payloads(temp_frame_paths)
-	with tqdm(total = len(queue_payloads), desc = wording.get('processing'), unit = 'frame', ascii = ' =', disable = state_manager.get_item('log_level') in [ 'warn', 'error' ]) as progress:
+	pending_queue_payloads = []
+	finished_queue_payloads = []
+
+	for queue_payload in queue_payloads:
+		if queue_payload.get('frame_path') in duplicate_frame_set:
+			finished_queue_payloads.append(create_duplicate_queue_payload(queue_payload, duplicate_frame_set.get(queue_payload.get('frame_path'))))
+		elif queue_payload.get('frame_number') in processed_frame_numbers:
+			finished_queue_payloads.append(queue_payload)
+		else:
+			pending_queue_payloads.append(queue_payload)
+	encode_behind_frames(finished_queue_payloads)
+	set_checkpoint_processor(process_frames.__module__)
+
+	with tqdm(total = len(queue_payloads), initial = len(queue_payloads) - len(pending_queue_payloads), desc = wording.get('processing'), unit = 'frame', ascii = ' =', disable = state_manager.get_item('log_level') in [ 'warn', 'error' ]) as progress:
+		progress.set_postfix(execution_providers = state_manager.get_item('execution_providers'))
+		with create_executor() as executor:
+			futures : Dict[Future[Optional[int]], List[QueuePayload]] = {}
+			queue : Queue[QueuePayload] = create_queue(pending_queue_payloads)
+
+			while futures or not queue.empty() and process_manager.is_processing():
+				while not queue.empty() and len(futures) < state_manager.get_item('execution_thread_count') and process_manager.is_processing():
+					future_queue_payloads = pick_queue(queue, calculate_queue_per_future(queue.qsize()))
+					if isinstance(executor, ProcessPoolExecutor):
+						future = executor.submit(process_queue_payloads, process_frames, source_paths, future_queue_payloads)
+					else:
+						future = executor.submit(process_frames, source_paths, future_queue_payloads, progress.update)
+					futures[future] = future_queue_payloads
+
+				futures_done, _ = wait(futures, return_when = FIRST_COMPLETED)
+				for future_done in futures_done:
+					frame_total = future_done.result()
+					future_queue_payloads = futures.pop(future_done)
+					if frame_total:
+						progress.update(frame_total)
+					wait_for_frames([ queue_payload.get('frame_path') for queue_payload in future_queue_payloads ])
+					encode_behind_frames(future_queue_payloads)
+					if process_manager.is_processing():
+						append_processed_frame_numbers(target_path, process_frames.__module__, [ queue_payload.get('frame_number') for queue_payload in future_queue_payloads ])
+	clear_frame_stager()
+
+	if duplicate_frame_set:
+		duplicate_frame_ratio = round(len(duplicate_frame_set) / len(queue_payloads) * 100, 2)
+		logger.info(wording.get('reusing_duplicate_frames').format(frame_total = len(duplicate_frame_set), frame_ratio = duplicate_frame_ratio), __name__)
+
+
+def create_executor() -> Executor:
+	if state_manager.get_item('execution_backend') == 'process':
+		return ProcessPoolExecutor(max_workers = state_manager.get_item('execution_thread_count'), mp_context = multiprocessing.get_context('spawn'), initializer = init_process_worker, initargs = (state_manager.get_state().copy(), get_reference_faces()))
+	return ThreadPoolExecutor(max_workers = state_manager.get_item('execution_thread_count'))
+
+
+def init_process_worker(state : Union[State, ProcessorState], reference_faces : Optional[FaceSet]) -> None:
+	for key, value in state.items():
+		state_manager.init_item(key, value) #type:ignore[arg-type]
+	if reference_faces:
+		for reference_name, faces in reference_faces.items():
+			for face in faces:
+				append_reference_face(reference_name, face)
+	logger.init(state_manager.get_item('log_level'))
+	process_manager.start()
+
+
+def process_queue_payloads(process_frames : ProcessFrames, source_paths : List[str], queue_payloads : List[QueuePayload]) -> int:
+	frame_totals : List[int] = []
+	set_checkpoint_processor(process_frames.__module__)
+	process_frames(source_paths, queue_payloads, frame_totals.append)
+	flush_frames()
+	return sum(frame_totals)
+
+
+def multi_process_vision_frames(source_paths : List[str], temp_vision_frames : Iterator[VisionFrame], temp_frame_total : int) -> Iterator[VisionFrame]:
+	processor_modules = get_processors_modules(state_manager.get_item('processors'))
+	reference_faces = get_reference_faces() if 'reference' in state_manager.get_item('face_selector_mode') else None
+	source_face = get_source_face(source_paths)
+	source_audio_path = get_source_audio_path(source_paths)
+	temp_video_fps = restrict_video_fps(state_manager.get_item('target_path'), state_manager.get_item('output_video_fps'))
+	if source_audio_path:
+		read_static_voice(source_audio_path, temp_video_fps)
+	future_limit = state_manager.get_item('execution_thread_count') * state_manager.get_item('execution_queue_count')
+	deque_futures : Deque[Future[VisionFrame]] = deque()
+
+	with tqdm(total = temp_frame_total, desc = wording.get('processing'), unit = 'frame', ascii = ' =', disable = state_manager.get_item('log_level') in [ 'warn', 'error' ]) as progress:
 		progress.set_postfix(execution_providers = state_manager.get_item('execution_providers'))
 		with ThreadPoolExecutor(max_workers = state_manager.get_item('execution_thread_count')) as executor:
-			futures = []
-			queue : Queue[QueuePayload] = create_queue(queue_payloads)
-			queue_per_future = max(len(queue_payloads) // state_manager.get_item('execution_thread_count') * state_manager.get_item('execution_queue_count'), 1)
+			for frame_number, temp_vision_frame in enumerate(temp_vision_frames):
+				future = executor.submit(process_vision_frame, processor_modules, reference_faces, source_face, source_audio_path, temp_video_fps, frame_number, temp_vision_frame)
+				deque_futures.append(future)
+
+				while len(deque_futures) > future_limit:
+					progress.update()
+					yield deque_futures.popleft().result()
+
+			while deque_futures:
+				progress.update()
+				yield deque_futures.popleft().result()
+
+
+def process_fused_video(source_paths : List[str], temp_frame_paths : List[str]) -> None:
+	source_audio_path = get_source_audio_path(source_paths)
+	if source_audio_path:
+		read_static_voice(source_audio_path, restrict_video_fps(state_manager.get_item('target_path'), state_manager.get_item('output_video_fps')))
+	multi_process_frames(source_paths, temp_frame_paths, process_fused_frames)
+
 
-			while not queue.empty():
-				future = executor.submit(process_frames, source_paths, pick_queue(queue, queue_per_future), progress.update)
-				futures.append(future)
+def process_fused_frames(source_paths : List[str], queue_payloads : List[QueuePayload], update_progress : UpdateProgress) -> None:
+	processor_modules = get_processors_modules(state_manager.get_item('processors'))
+	reference_faces = get_reference_faces() if 'reference' in state_manager.get_item('face_selector_mode') else None
+	source_face = get_source_face(source_paths)
+	source_audio_path = get_source_audio_path(source_paths)
+	temp_video_fps = restrict_video_fps(state_manager.get_item('target_path'), state_manager.get_item('output_video_fps'))
 
-			for future_done in as_completed(futures):
-				future_done.result()
+	for frame_batch in read_ahead_frame_batches(process_manager.manage(queue_payloads)):
+		frame_numbers = [ queue_payload.get('frame_number') for queue_payload, _ in frame_batch ]
+		target_vision_frames = [ target_vision_frame for _, target_vision_frame in frame_batch ]
+		output_vision_frames = process_vision_frames(processor_modules, reference_faces, source_face, source_audio_path, temp_video_fps, frame_numbers, target_vision_frames)
+
+		for (queue_payload, target_vision_frame), output_vision_frame in zip(frame_batch, output_vision_frames):
+			conditional_write_behind_frame(queue_payload.get('frame_path'), target_vision_frame, output_vision_frame)
+			update_progress(1)
+
+
+def process_vision_frame(processor_modules : List[ModuleType], reference_faces : Optional[FaceSet], source_face : Optional[Face], source_audio_path : Optional[str], temp_video_fps : Fps, frame_number : int, target_vision_frame : VisionFrame) -> VisionFrame:
+	return process_vision_frames(processor_modules, reference_faces, source_face, source_audio_path, temp_video_fps, [ frame_number ], [ target_vision_frame ])[0]
+
+
+def process_vision_frames(processor_modules : List[ModuleType], reference_faces : Optional[FaceSet], source_face : Optional[Face], source_audio_path : Optional[str], temp_video_fps : Fps, frame_numbers : List[int], target_vision_frames : List[VisionFrame]) -> List[VisionFrame]:
+	source_audio_frames = [ get_source_audio_frame(source_audio_path, temp_video_fps, frame_number) for frame_number in frame_numbers ]
+	source_vision_frames = [ target_vision_frame.copy() for target_vision_frame in target_vision_frames ]
+	target_faces_batch : List[Optional[List[Face]]] = [ None ] * len(target_vision_frames)
+	matched_faces_batch : List[Optional[List[Face]]] = [ None ] * len(target_vision_frames)
+
+	for processor_module in processor_modules:
+		temp_vision_frames = target_vision_frames
+		for temp_vision_frame, target_faces, matched_faces in zip(temp_vision_frames, target_faces_batch, matched_faces_batch):
+			if target_faces is not None:
+				set_static_faces(temp_vision_frame, target_faces)
+			if matched_faces is not None:
+				set_matched_faces(temp_vision_frame, matched_faces)
+		processor_inputs_batch =\
+		[
+			{
+				'reference_faces': reference_faces,
+				'source_face': source_face,
+				'source_audio_frame': source_audio_frame,
+				'source_vision_frame': source_vision_frame,
+				'target_vision_frame': target_vision_frame
+			}
+			for source_audio_frame, source_vision_frame, target_vision_frame in zip(source_audio_frames, source_vision_frames, target_vision_frames)
+		]
+
+		if has_batch_support(processor_module):
+			target_vision_frames = processor_module.process_frames_batch(processor_inputs_batch)
+		else:
+			target_vision_frames = [ processor_module.process_frame(processor_inputs) for processor_inputs in processor_inputs_batch ]
+
+		if processor_module.is_face_geometry_preserved():
+			target_faces_batch = [ get_static_faces(temp_vision_frame) if target_faces is None else target_faces for temp_vision_frame, target_faces in zip(temp_vision_frames, target_faces_batch) ]
+			matched_faces_batch = [ get_matched_faces(temp_vision_frame) if matched_faces is None else matched_faces for temp_vision_frame, matched_faces in zip(temp_vision_frames, matched_faces_batch) ]
+		else:
+			target_faces_batch = [ None ] * len(target_vision_frames)
+			matched_faces_batch = [ None ] * len(target_vision_frames)
+	return target_vision_frames
+
+
+def get_source_audio_frame(source_audio_path : Optional[str], temp_video_fps : Fps, frame_number : int) -> AudioFrame:
+	source_audio_frame = get_voice_frame(source_audio_path, temp_video_fps, frame_number)
+	if not numpy.any(source_audio_frame):
+		source_audio_frame = create_empty_audio_frame()
+	return source_audio_frame
+
+
+def select_target_faces(reference_faces : Optional[FaceSet], target_vision_frame : VisionFrame) -> List[Face]:
+	if state_manager.get_item('face_selector_mode') == 'reference':
+		matched_faces = get_matched_faces(target_vision_frame)
+		if matched_faces is not None:
+			return sort_and_filter_faces(matched_faces)
+	many_faces = sort_and_filter_faces(get_many_faces([ target_vision_frame ]))
+
+	if state_manager.get_item('face_selector_mode') == 'many':
+		return many_faces
+	if state_manager.get_item('face_selector_mode') == 'one':
+		target_face = get_one_face(many_faces)
+		if target_face:
+			return [ target_face ]
+	if state_manager.get_item('face_selector_mode') == 'reference':
+		return find_similar_faces(many_faces, reference_faces, state_manager.get_item('reference_face_distance'))
+	return []
+
+
+def get_source_face(source_paths : List[str]) -> Optional[Face]:
+	source_frames = read_static_images(filter_image_paths(source_paths))
+	source_faces = []
+
+	for source_frame in source_frames:
+		temp_faces = sort_faces_by_order(get_many_faces([ source_frame ]), 'large-small')
+		if temp_faces:
+			source_faces.append(get_first(temp_faces))
+	return get_average_face(source_faces)
+
+
+def create_reference_faces(source_paths : List[str], reference_frame : VisionFrame) -> FaceSet:
+	reference_face_set : FaceSet = {}
+	source_frames = read_static_images(source_paths)
+	source_faces = get_many_faces(source_frames)
+	source_face = get_average_face(source_faces)
+	reference_faces = sort_and_filter_faces(get_many_faces([ reference_frame ]))
+	reference_face = get_one_face(reference_faces, state_manager.get_item('reference_face_position'))
+	reference_face_set['origin'] = [ reference_face ]
+
+	if source_face and reference_face:
+		for processor_module in get_processors_modules(state_manager.get_item('processors')):
+			abstract_reference_frame = processor_module.get_reference_frame(source_face, reference_face, reference_frame)
+			if numpy.any(abstract_reference_frame):
+				abstract_reference_faces = sort_and_filter_faces(get_many_faces([ abstract_reference_frame ]))
+				abstract_reference_face = get_one_face(abstract_reference_faces, state_manager.get_item('reference_face_position'))
+				reference_face_set[processor_module.__name__] = [ abstract_reference_face ]
+	return reference_face_set
+
+
+def get_source_audio_path(source_paths : List[str]) -> Optional[str]:
+	if 'lip_syncer' in state_manager.get_item('processors'):
+		return get_first(filter_audio_paths(source_paths))
+	return None
 
 
 def create_queue(queue_payloads : List[QueuePayload]) -> Queue[QueuePayload]:
@@ -77,6 +314,12 @@ def create_queue(queue_payloads : List[QueuePayload]) -> Queue[QueuePayload]:
 	return queue
 
 
+def calculate_queue_per_future(queue_total : int) -> int:
+	execution_thread_count = state_manager.get_item('execution_thread_count')
+	execution_queue_count = state_manager.get_item('execution_queue_count')
+	return max(queue_total // (execution_thread_count * 4), execution_queue_count)
+
+
 def pick_queue(queue : Queue[QueuePayload], queue_per_future : int) -> List[QueuePayload]:
 	queues = []
 	for _ in range(queue_per_future):
@@ -85,6 +328,15 @@ def pick_queue(queue : Queue[QueuePayload], queue_per_future : int) -> List[Queu
 	return queues
 
 
+def create_duplicate_queue_payload(queue_payload : QueuePayload, anchor_frame_path : str) -> QueuePayload:
+	duplicate_queue_payload : QueuePayload =\
+	{
+		'frame_number': queue_payload.get('frame_number'),
+		'frame_path': anchor_frame_path
+	}
+	return duplicate_queue_payload
+
+
 def create_queue_payloads(temp_frame_paths : List[str]) -> List[QueuePayload]:
 	queue_payloads = []
 	temp_frame_paths = sorted(temp_frame_paths, key = os.path.basename)
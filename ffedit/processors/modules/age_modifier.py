@@ -1,6 +1,6 @@
 from argparse import ArgumentParser
 from functools import lru_cache
-from typing import List
+from typing import List, Tuple
 
 import cv2
 import numpy
@@ -16,15 +16,16 @@ from ffedit.execution import has_execution_provider
 from ffedit.face_analyser import get_many_faces, get_one_face
 from ffedit.face_helper import merge_matrix, paste_back, scale_face_landmark_5, warp_face_by_face_landmark_5
 from ffedit.face_masker import create_box_mask, create_occlusion_mask
-from ffedit.face_selector import find_similar_faces, sort_and_filter_faces
+from ffedit.face_selector import sort_and_filter_faces
 from ffedit.face_store import get_reference_faces
 from ffedit.filesystem import in_directory, is_image, is_video, resolve_relative_path, same_file_extension
+from ffedit.frame_stager import conditional_write_behind_frame, read_ahead_frame_batches
 from ffedit.processors import choices as processors_choices
 from ffedit.processors.types import AgeModifierDirection, AgeModifierInputs
 from ffedit.program_helper import find_argument_group
-from ffedit.thread_helper import thread_semaphore
-from ffedit.types import ApplyStateItem, Args, DownloadScope, Face, InferencePool, ModelOptions, ModelSet, ProcessMode, QueuePayload, UpdateProgress, VisionFrame
-from ffedit.vision import match_frame_color, read_image, read_static_image, write_image
+from ffedit.thread_helper import conditional_thread_semaphore
+from ffedit.types import ApplyStateItem, Args, DownloadScope, Face, InferencePool, Mask, Matrix, ModelOptions, ModelSet, ProcessMode, QueuePayload, UpdateProgress, VisionFrame
+from ffedit.vision import match_frame_color, read_static_image, write_image
 
 
 @lru_cache(maxsize = None)
@@ -128,6 +129,28 @@ def post_process() -> None:
 
 
 def modify_age(target_face : Face, temp_vision_frame : VisionFrame) -> VisionFrame:
+	crop_vision_frame, extend_vision_frame, extend_vision_frame_raw, crop_mask, extend_affine_matrix = crop_face(target_face, temp_vision_frame)
+	age_modifier_direction = numpy.array(numpy.interp(state_manager.get_item('age_modifier_direction'), [ -100, 100 ], [ 2.5, -2.5 ])).astype(numpy.float32)
+	extend_vision_frame = forward(crop_vision_frame, extend_vision_frame, age_modifier_direction)
+	return paste_face(temp_vision_frame, extend_vision_frame, extend_vision_frame_raw, crop_mask, extend_affine_matrix)
+
+
+def modify_ages(target_faces_batch : List[List[Face]], temp_vision_frames : List[VisionFrame]) -> List[VisionFrame]:
+	temp_vision_frames = list(temp_vision_frames)
+
+	for face_index in range(max(map(len, target_faces_batch), default = 0)):
+		crop_face_batch = [ (frame_index, crop_face(target_faces[face_index], temp_vision_frames[frame_index])) for frame_index, target_faces in enumerate(target_faces_batch) if face_index < len(target_faces) ]
+		crop_vision_frames = numpy.concatenate([ crop_vision_frame for _, (crop_vision_frame, _, _, _, _) in crop_face_batch ])
+		extend_vision_frames = numpy.concatenate([ extend_vision_frame for _, (_, extend_vision_frame, _, _, _) in crop_face_batch ])
+		age_modifier_direction = numpy.array(numpy.interp(state_manager.get_item('age_modifier_direction'), [ -100, 100 ], [ 2.5, -2.5 ])).astype(numpy.float32)
+		extend_vision_frames = forward_batch(crop_vision_frames, extend_vision_frames, age_modifier_direction)
+
+		for (frame_index, (_, _, extend_vision_frame_raw, crop_mask, extend_affine_matrix)), extend_vision_frame in zip(crop_face_batch, extend_vision_frames):
+			temp_vision_frames[frame_index] = paste_face(temp_vision_frames[frame_index], extend_vision_frame, extend_vision_frame_raw, crop_mask, extend_affine_matrix)
+	return temp_vision_frames
+
+
+def crop_face(target_face : Face, temp_vision_frame : VisionFrame) -> Tuple[VisionFrame, VisionFrame, VisionFrame, Mask, Matrix]:
 	model_templates = get_model_options().get('templates')
 	model_sizes = get_model_options().get('sizes')
 	face_landmark_5 = target_face.landmark_set.get('5/68').copy()
@@ -149,13 +172,15 @@ def modify_age(target_face : Face, temp_vision_frame : VisionFrame) -> VisionFra
 
 	crop_vision_frame = prepare_vision_frame(crop_vision_frame)
 	extend_vision_frame = prepare_vision_frame(extend_vision_frame)
-	age_modifier_direction = numpy.array(numpy.interp(state_manager.get_item('age_modifier_direction'), [ -100, 100 ], [ 2.5, -2.5 ])).astype(numpy.float32)
-	extend_vision_frame = forward(crop_vision_frame, extend_vision_frame, age_modifier_direction)
-	extend_vision_frame = normalize_extend_frame(extend_vision_frame)
-	extend_vision_frame = match_frame_color(extend_vision_frame_raw, extend_vision_frame)
 	extend_affine_matrix *= (model_sizes.get('target')[0] * 4) / model_sizes.get('target_with_background')[0]
 	crop_mask = numpy.minimum.reduce(crop_masks).clip(0, 1)
 	crop_mask = cv2.resize(crop_mask, (model_sizes.get('target')[0] * 4, model_sizes.get('target')[1] * 4))
+	return crop_vision_frame, extend_vision_frame, extend_vision_frame_raw, crop_mask, extend_affine_matrix
+
+
+def paste_face(temp_vision_frame : VisionFrame, extend_vision_frame : VisionFrame, extend_vision_frame_raw : VisionFrame, crop_mask : Mask, extend_affine_matrix : Matrix) -> VisionFrame:
+	extend_vision_frame = normalize_extend_frame(extend_vision_frame)
+	extend_vision_frame = match_frame_color(extend_vision_frame_raw, extend_vision_frame)
 	paste_vision_frame = paste_back(temp_vision_frame, extend_vision_frame, crop_mask, extend_affine_matrix)
 	return paste_vision_frame
 
@@ -175,12 +200,36 @@ def forward(crop_vision_frame : VisionFrame, extend_vision_frame : VisionFrame,
 		if age_modifier_input.name == 'direction':
 			age_modifier_inputs[age_modifier_input.name] = age_modifier_direction
 
-	with thread_semaphore():
+	with conditional_thread_semaphore(state_manager.get_item('age_modifier_model')):
 		crop_vision_frame = age_modifier.run(None, age_modifier_inputs)[0][0]
 
 	return crop_vision_frame
 
 
+def forward_batch(crop_vision_frames : VisionFrame, extend_vision_frames : VisionFrame, age_modifier_direction : AgeModifierDirection) -> VisionFrame:
+	age_modifier = get_inference_pool().get('age_modifier')
+	age_modifier_inputs = {}
+
+	if not inference_manager.has_batch_axis(age_modifier, 'target'):
+		return numpy.stack([ forward(crop_vision_frame[numpy.newaxis], extend_vision_frame[numpy.newaxis], age_modifier_direction) for crop_vision_frame, extend_vision_frame in zip(crop_vision_frames, extend_vision_frames) ])
+
+	if has_execution_provider('coreml'):
+		age_modifier.set_providers([ ffedit.choices.execution_provider_set.get('cpu') ])
+
+	for age_modifier_input in age_modifier.get_inputs():
+		if age_modifier_input.name == 'target':
+			age_modifier_inputs[age_modifier_input.name] = crop_vision_frames
+		if age_modifier_input.name == 'target_with_background':
+			age_modifier_inputs[age_modifier_input.name] = extend_vision_frames
+		if age_modifier_input.name == 'direction':
+			age_modifier_inputs[age_modifier_input.name] = age_modifier_direction
+
+	with conditional_thread_semaphore(state_manager.get_item('age_modifier_model')):
+		extend_vision_frames = age_modifier.run(None, age_modifier_inputs)[0]
+
+	return extend_vision_frames
+
+
 def prepare_vision_frame(vision_frame : VisionFrame) -> VisionFrame:
 	vision_frame = vision_frame[:, :, ::-1] / 255.0
 	vision_frame = (vision_frame - 0.5) / 0.5
@@ -199,10 +248,27 @@ def normalize_extend_frame(extend_vision_frame : VisionFrame) -> VisionFrame:
 	return extend_vision_frame
 
 
+def is_face_geometry_preserved() -> bool:
+	return False
+
+
+def get_frame_scale() -> int:
+	return 1
+
+
 def get_reference_frame(source_face : Face, target_face : Face, temp_vision_frame : VisionFrame) -> VisionFrame:
 	return modify_age(target_face, temp_vision_frame)
 
 
+def process_frames_batch(inputs_batch : List[AgeModifierInputs]) -> List[VisionFrame]:
+	if len(inputs_batch) == 1:
+		return [ process_frame(inputs_batch[0]) ]
+
+	target_vision_frames = [ inputs.get('target_vision_frame') for inputs in inputs_batch ]
+	target_faces_batch = [ processors.select_target_faces(inputs.get('reference_faces'), inputs.get('target_vision_frame')) for inputs in inputs_batch ]
+	return modify_ages(target_faces_batch, target_vision_frames)
+
+
 def process_frame(inputs : AgeModifierInputs) -> VisionFrame:
 	reference_faces = inputs.get('reference_faces')
 	target_vision_frame = inputs.get('target_vision_frame')
@@ -217,7 +283,7 @@ def process_frame(inputs : AgeModifierInputs) -> VisionFrame:
 		if target_face:
 			target_vision_frame = modify_age(target_face, target_vision_frame)
 	if state_manager.get_item('face_selector_mode') == 'reference':
-		similar_faces = find_similar_faces(many_faces, reference_faces, state_manager.get_item('reference_face_distance'))
+		similar_faces = processors.select_target_faces(reference_faces, target_vision_frame)
 		if similar_faces:
 			for similar_face in similar_faces:
 				target_vision_frame = modify_age(similar_face, target_vision_frame)
@@ -227,16 +293,19 @@ def process_frame(inputs : AgeModifierInputs) -> VisionFrame:
 def process_frames(source_path : List[str], queue_payloads : List[QueuePayload], update_progress : UpdateProgress) -> None:
 	reference_faces = get_reference_faces() if 'reference' in state_manager.get_item('face_selector_mode') else None
 
-	for queue_payload in process_manager.manage(queue_payloads):
-		target_vision_path = queue_payload['frame_path']
-		target_vision_frame = read_image(target_vision_path)
-		output_vision_frame = process_frame(
-		{
-			'reference_faces': reference_faces,
-			'target_vision_frame': target_vision_frame
-		})
-		write_image(target_vision_path, output_vision_frame)
-		update_progress(1)
+	for frame_batch in read_ahead_frame_batches(process_manager.manage(queue_payloads)):
+		output_vision_frames = process_frames_batch(
+		[
+			{
+				'reference_faces': reference_faces,
+				'target_vision_frame': target_vision_frame
+			}
+			for _, target_vision_frame in frame_batch
+		])
+
+		for (queue_payload, target_vision_frame), output_vision_frame in zip(frame_batch, output_vision_frames):
+			conditional_write_behind_frame(queue_payload.get('frame_path'), target_vision_frame, output_vision_frame)
+			update_progress(1)
 
 
 def process_image(source_path : str, target_path : str, output_path : str) -> None:
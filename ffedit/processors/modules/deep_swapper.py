@@ -15,15 +15,16 @@ from ffedit.download import conditional_download_hashes, conditional_download_so
 from ffedit.face_analyser import get_many_faces, get_one_face
 from ffedit.face_helper import paste_back, warp_face_by_face_landmark_5
 from ffedit.face_masker import create_area_mask, create_box_mask, create_occlusion_mask, create_region_mask
-from ffedit.face_selector import find_similar_faces, sort_and_filter_faces
+from ffedit.face_selector import sort_and_filter_faces
 from ffedit.face_store import get_reference_faces
 from ffedit.filesystem import get_file_name, in_directory, is_image, is_video, resolve_file_paths, resolve_relative_path, same_file_extension
+from ffedit.frame_stager import conditional_write_behind_frame, read_ahead_frames
 from ffedit.processors import choices as processors_choices
 from ffedit.processors.types import DeepSwapperInputs, DeepSwapperMorph
 from ffedit.program_helper import find_argument_group
-from ffedit.thread_helper import thread_semaphore
+from ffedit.thread_helper import conditional_thread_semaphore
 from ffedit.types import ApplyStateItem, Args, DownloadScope, Face, InferencePool, Mask, ModelOptions, ModelSet, ProcessMode, QueuePayload, UpdateProgress, VisionFrame
-from ffedit.vision import conditional_match_frame_color, read_image, read_static_image, write_image
+from ffedit.vision import conditional_match_frame_color, read_static_image, write_image
 
 
 @lru_cache(maxsize = None)
@@ -369,7 +370,7 @@ def forward(crop_vision_frame : VisionFrame, deep_swapper_morph : DeepSwapperMor
 		if deep_swapper_input.name == 'morph_value:0':
 			deep_swapper_inputs[deep_swapper_input.name] = deep_swapper_morph
 
-	with thread_semaphore():
+	with conditional_thread_semaphore(state_manager.get_item('deep_swapper_model')):
 		crop_target_mask, crop_vision_frame, crop_source_mask = deep_swapper.run(None, deep_swapper_inputs)
 
 	return crop_vision_frame[0], crop_source_mask[0], crop_target_mask[0]
@@ -409,6 +410,14 @@ def prepare_crop_mask(crop_source_mask : Mask, crop_target_mask : Mask) -> Mask:
 	return crop_mask
 
 
+def is_face_geometry_preserved() -> bool:
+	return True
+
+
+def get_frame_scale() -> int:
+	return 1
+
+
 def get_reference_frame(source_face : Face, target_face : Face, temp_vision_frame : VisionFrame) -> VisionFrame:
 	return swap_face(target_face, temp_vision_frame)
 
@@ -427,7 +436,7 @@ def process_frame(inputs : DeepSwapperInputs) -> VisionFrame:
 		if target_face:
 			target_vision_frame = swap_face(target_face, target_vision_frame)
 	if state_manager.get_item('face_selector_mode') == 'reference':
-		similar_faces = find_similar_faces(many_faces, reference_faces, state_manager.get_item('reference_face_distance'))
+		similar_faces = processors.select_target_faces(reference_faces, target_vision_frame)
 		if similar_faces:
 			for similar_face in similar_faces:
 				target_vision_frame = swap_face(similar_face, target_vision_frame)
@@ -437,15 +446,14 @@ def process_frame(inputs : DeepSwapperInputs) -> VisionFrame:
 def process_frames(source_path : List[str], queue_payloads : List[QueuePayload], update_progress : UpdateProgress) -> None:
 	reference_faces = get_reference_faces() if 'reference' in state_manager.get_item('face_selector_mode') else None
 
-	for queue_payload in process_manager.manage(queue_payloads):
+	for queue_payload, target_vision_frame in read_ahead_frames(process_manager.manage(queue_payloads)):
 		target_vision_path = queue_payload['frame_path']
-		target_vision_frame = read_image(target_vision_path)
 		output_vision_frame = process_frame(
 		{
 			'reference_faces': reference_faces,
 			'target_vision_frame': target_vision_frame
 		})
-		write_image(target_vision_path, output_vision_frame)
+		conditional_write_behind_frame(target_vision_path, target_vision_frame, output_vision_frame)
 		update_progress(1)
 
 
@@ -11,14 +11,15 @@ from ffedit import config, content_analyser, face_classifier, face_detector, fac
 from ffedit.face_analyser import get_many_faces, get_one_face
 from ffedit.face_helper import warp_face_by_face_landmark_5
 from ffedit.face_masker import create_area_mask, create_box_mask, create_occlusion_mask, create_region_mask
-from ffedit.face_selector import find_similar_faces, sort_and_filter_faces
+from ffedit.face_selector import sort_and_filter_faces
 from ffedit.face_store import get_reference_faces
 from ffedit.filesystem import in_directory, same_file_extension
+from ffedit.frame_stager import conditional_write_behind_frame, read_ahead_frames
 from ffedit.processors import choices as processors_choices
 from ffedit.processors.types import FaceDebuggerInputs
 from ffedit.program_helper import find_argument_group
 from ffedit.types import ApplyStateItem, Args, Face, InferencePool, ProcessMode, QueuePayload, UpdateProgress, VisionFrame
-from ffedit.vision import read_image, read_static_image, write_image
+from ffedit.vision import read_static_image, write_image
 
 
 def get_inference_pool() -> InferencePool:
@@ -173,6 +174,14 @@ def debug_face(target_face : Face, temp_vision_frame : VisionFrame) -> VisionFra
 	return temp_vision_frame
 
 
+def is_face_geometry_preserved() -> bool:
+	return True
+
+
+def get_frame_scale() -> int:
+	return 1
+
+
 def get_reference_frame(source_face : Face, target_face : Face, temp_vision_frame : VisionFrame) -> VisionFrame:
 	pass
 
@@ -191,7 +200,7 @@ def process_frame(inputs : FaceDebuggerInputs) -> VisionFrame:
 		if target_face:
 			target_vision_frame = debug_face(target_face, target_vision_frame)
 	if state_manager.get_item('face_selector_mode') == 'reference':
-		similar_faces = find_similar_faces(many_faces, reference_faces, state_manager.get_item('reference_face_distance'))
+		similar_faces = processors.select_target_faces(reference_faces, target_vision_frame)
 		if similar_faces:
 			for similar_face in similar_faces:
 				target_vision_frame = debug_face(similar_face, target_vision_frame)
@@ -201,15 +210,14 @@ def process_frame(inputs : FaceDebuggerInputs) -> VisionFrame:
 def process_frames(source_paths : List[str], queue_payloads : List[QueuePayload], update_progress : UpdateProgress) -> None:
 	reference_faces = get_reference_faces() if 'reference' in state_manager.get_item('face_selector_mode') else None
 
-	for queue_payload in process_manager.manage(queue_payloads):
+	for queue_payload, target_vision_frame in read_ahead_frames(process_manager.manage(queue_payloads)):
 		target_vision_path = queue_payload['frame_path']
-		target_vision_frame = read_image(target_vision_path)
 		output_vision_frame = process_frame(
 		{
 			'reference_faces': reference_faces,
 			'target_vision_frame': target_vision_frame
 		})
-		write_image(target_vision_path, output_vision_frame)
+		conditional_write_behind_frame(target_vision_path, target_vision_frame, output_vision_frame)
 		update_progress(1)
 
 
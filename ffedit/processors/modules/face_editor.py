@@ -14,16 +14,17 @@ from ffedit.download import conditional_download_hashes, conditional_download_so
 from ffedit.face_analyser import get_many_faces, get_one_face
 from ffedit.face_helper import paste_back, scale_face_landmark_5, warp_face_by_face_landmark_5
 from ffedit.face_masker import create_box_mask
-from ffedit.face_selector import find_similar_faces, sort_and_filter_faces
+from ffedit.face_selector import sort_and_filter_faces
 from ffedit.face_store import get_reference_faces
 from ffedit.filesystem import in_directory, is_image, is_video, resolve_relative_path, same_file_extension
+from ffedit.frame_stager import conditional_write_behind_frame, read_ahead_frames
 from ffedit.processors import choices as processors_choices
 from ffedit.processors.live_portrait import create_rotation, limit_euler_angles, limit_expression
 from ffedit.processors.types import FaceEditorInputs, LivePortraitExpression, LivePortraitFeatureVolume, LivePortraitMotionPoints, LivePortraitPitch, LivePortraitRoll, LivePortraitRotation, LivePortraitScale, LivePortraitTranslation, LivePortraitYaw
 from ffedit.program_helper import find_argument_group
-from ffedit.thread_helper import conditional_thread_semaphore, thread_semaphore
+from ffedit.thread_helper import conditional_thread_semaphore
 from ffedit.types import ApplyStateItem, Args, DownloadScope, Face, FaceLandmark68, InferencePool, ModelOptions, ModelSet, ProcessMode, QueuePayload, UpdateProgress, VisionFrame
-from ffedit.vision import read_image, read_static_image, write_image
+from ffedit.vision import read_static_image, write_image
 
 
 @lru_cache(maxsize = None)
@@ -235,7 +236,7 @@ def apply_edit(crop_vision_frame : VisionFrame, face_landmark_68 : FaceLandmark6
 def forward_extract_feature(crop_vision_frame : VisionFrame) -> LivePortraitFeatureVolume:
 	feature_extractor = get_inference_pool().get('feature_extractor')
 
-	with conditional_thread_semaphore():
+	with conditional_thread_semaphore(state_manager.get_item('face_editor_model')):
 		feature_volume = feature_extractor.run(None,
 		{
 			'input': crop_vision_frame
@@ -247,7 +248,7 @@ def forward_extract_feature(crop_vision_frame : VisionFrame) -> LivePortraitFeat
 def forward_extract_motion(crop_vision_frame : VisionFrame) -> Tuple[LivePortraitPitch, LivePortraitYaw, LivePortraitRoll, LivePortraitScale, LivePortraitTranslation, LivePortraitExpression, LivePortraitMotionPoints]:
 	motion_extractor = get_inference_pool().get('motion_extractor')
 
-	with conditional_thread_semaphore():
+	with conditional_thread_semaphore(state_manager.get_item('face_editor_model')):
 		pitch, yaw, roll, scale, translation, expression, motion_points = motion_extractor.run(None,
 		{
 			'input': crop_vision_frame
@@ -259,7 +260,7 @@ def forward_extract_motion(crop_vision_frame : VisionFrame) -> Tuple[LivePortrai
 def forward_retarget_eye(eye_motion_points : LivePortraitMotionPoints) -> LivePortraitMotionPoints:
 	eye_retargeter = get_inference_pool().get('eye_retargeter')
 
-	with conditional_thread_semaphore():
+	with conditional_thread_semaphore(state_manager.get_item('face_editor_model')):
 		eye_motion_points = eye_retargeter.run(None,
 		{
 			'input': eye_motion_points
@@ -271,7 +272,7 @@ def forward_retarget_eye(eye_motion_points : LivePortraitMotionPoints) -> LivePo
 def forward_retarget_lip(lip_motion_points : LivePortraitMotionPoints) -> LivePortraitMotionPoints:
 	lip_retargeter = get_inference_pool().get('lip_retargeter')
 
-	with conditional_thread_semaphore():
+	with conditional_thread_semaphore(state_manager.get_item('face_editor_model')):
 		lip_motion_points = lip_retargeter.run(None,
 		{
 			'input': lip_motion_points
@@ -283,7 +284,7 @@ def forward_retarget_lip(lip_motion_points : LivePortraitMotionPoints) -> LivePo
 def forward_stitch_motion_points(source_motion_points : LivePortraitMotionPoints, target_motion_points : LivePortraitMotionPoints) -> LivePortraitMotionPoints:
 	stitcher = get_inference_pool().get('stitcher')
 
-	with thread_semaphore():
+	with conditional_thread_semaphore(state_manager.get_item('face_editor_model')):
 		motion_points = stitcher.run(None,
 		{
 			'source': source_motion_points,
@@ -296,7 +297,7 @@ def forward_stitch_motion_points(source_motion_points : LivePortraitMotionPoints
 def forward_generate_frame(feature_volume : LivePortraitFeatureVolume, source_motion_points : LivePortraitMotionPoints, target_motion_points : LivePortraitMotionPoints) -> VisionFrame:
 	generator = get_inference_pool().get('generator')
 
-	with thread_semaphore():
+	with conditional_thread_semaphore(state_manager.get_item('face_editor_model')):
 		crop_vision_frame = generator.run(None,
 		{
 			'feature_volume': feature_volume,
@@ -478,6 +479,14 @@ def normalize_crop_frame(crop_vision_frame : VisionFrame) -> VisionFrame:
 	return crop_vision_frame
 
 
+def is_face_geometry_preserved() -> bool:
+	return False
+
+
+def get_frame_scale() -> int:
+	return 1
+
+
 def get_reference_frame(source_face : Face, target_face : Face, temp_vision_frame : VisionFrame) -> VisionFrame:
 	pass
 
@@ -496,7 +505,7 @@ def process_frame(inputs : FaceEditorInputs) -> VisionFrame:
 		if target_face:
 			target_vision_frame = edit_face(target_face, target_vision_frame)
 	if state_manager.get_item('face_selector_mode') == 'reference':
-		similar_faces = find_similar_faces(many_faces, reference_faces, state_manager.get_item('reference_face_distance'))
+		similar_faces = processors.select_target_faces(reference_faces, target_vision_frame)
 		if similar_faces:
 			for similar_face in similar_faces:
 				target_vision_frame = edit_face(similar_face, target_vision_frame)
@@ -506,15 +515,14 @@ def process_frame(inputs : FaceEditorInputs) -> VisionFrame:
 def process_frames(source_path : List[str], queue_payloads : List[QueuePayload], update_progress : UpdateProgress) -> None:
 	reference_faces = get_reference_faces() if 'reference' in state_manager.get_item('face_selector_mode') else None
 
-	for queue_payload in process_manager.manage(queue_payloads):
+	for queue_payload, target_vision_frame in read_ahead_frames(process_manager.manage(queue_payloads)):
 		target_vision_path = queue_payload['frame_path']
-		target_vision_frame = read_image(target_vision_path)
 		output_vision_frame = process_frame(
 		{
 			'reference_faces': reference_faces,
 			'target_vision_frame': target_vision_frame
 		})
-		write_image(target_vision_path, output_vision_frame)
+		conditional_write_behind_frame(target_vision_path, target_vision_frame, output_vision_frame)
 		update_progress(1)
 
 
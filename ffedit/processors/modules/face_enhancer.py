@@ -1,6 +1,6 @@
 from argparse import ArgumentParser
 from functools import lru_cache
-from typing import List
+from typing import List, Tuple
 
 import cv2
 import numpy
@@ -14,15 +14,16 @@ from ffedit.download import conditional_download_hashes, conditional_download_so
 from ffedit.face_analyser import get_many_faces, get_one_face
 from ffedit.face_helper import paste_back, warp_face_by_face_landmark_5
 from ffedit.face_masker import create_box_mask, create_occlusion_mask
-from ffedit.face_selector import find_similar_faces, sort_and_filter_faces
+from ffedit.face_selector import sort_and_filter_faces
 from ffedit.face_store import get_reference_faces
 from ffedit.filesystem import in_directory, is_image, is_video, resolve_relative_path, same_file_extension
+from ffedit.frame_stager import conditional_write_behind_frame, read_ahead_frame_batches
 from ffedit.processors import choices as processors_choices
 from ffedit.processors.types import FaceEnhancerInputs, FaceEnhancerWeight
 from ffedit.program_helper import find_argument_group
-from ffedit.thread_helper import thread_semaphore
-from ffedit.types import ApplyStateItem, Args, DownloadScope, Face, InferencePool, ModelOptions, ModelSet, ProcessMode, QueuePayload, UpdateProgress, VisionFrame
-from ffedit.vision import read_image, read_static_image, write_image
+from ffedit.thread_helper import conditional_thread_semaphore
+from ffedit.types import ApplyStateItem, Args, DownloadScope, Face, InferencePool, Mask, Matrix, ModelOptions, ModelSet, ProcessMode, QueuePayload, UpdateProgress, VisionFrame
+from ffedit.vision import read_static_image, write_image
 
 
 @lru_cache(maxsize = None)
@@ -288,6 +289,27 @@ def post_process() -> None:
 
 
 def enhance_face(target_face : Face, temp_vision_frame : VisionFrame) -> VisionFrame:
+	crop_vision_frame, crop_mask, affine_matrix = crop_face(target_face, temp_vision_frame)
+	face_enhancer_weight = numpy.array([ state_manager.get_item('face_enhancer_weight') ]).astype(numpy.double)
+	crop_vision_frame = forward(crop_vision_frame, face_enhancer_weight)
+	return paste_face(temp_vision_frame, crop_vision_frame, crop_mask, affine_matrix)
+
+
+def enhance_faces(target_faces_batch : List[List[Face]], temp_vision_frames : List[VisionFrame]) -> List[VisionFrame]:
+	temp_vision_frames = list(temp_vision_frames)
+
+	for face_index in range(max(map(len, target_faces_batch), default = 0)):
+		crop_face_batch = [ (frame_index, crop_face(target_faces[face_index], temp_vision_frames[frame_index])) for frame_index, target_faces in enumerate(target_faces_batch) if face_index < len(target_faces) ]
+		crop_vision_frames = numpy.concatenate([ crop_vision_frame for _, (crop_vision_frame, _, _) in crop_face_batch ])
+		face_enhancer_weight = numpy.array([ state_manager.get_item('face_enhancer_weight') ]).astype(numpy.double)
+		crop_vision_frames = forward_batch(crop_vision_frames, face_enhancer_weight)
+
+		for (frame_index, (_, crop_mask, affine_matrix)), crop_vision_frame in zip(crop_face_batch, crop_vision_frames):
+			temp_vision_frames[frame_index] = paste_face(temp_vision_frames[frame_index], crop_vision_frame, crop_mask, affine_matrix)
+	return temp_vision_frames
+
+
+def crop_face(target_face : Face, temp_vision_frame : VisionFrame) -> Tuple[VisionFrame, Mask, Matrix]:
 	model_template = get_model_options().get('template')
 	model_size = get_model_options().get('size')
 	crop_vision_frame, affine_matrix = warp_face_by_face_landmark_5(temp_vision_frame, target_face.landmark_set.get('5/68'), model_template, model_size)
@@ -302,10 +324,12 @@ def enhance_face(target_face : Face, temp_vision_frame : VisionFrame) -> VisionF
 		crop_masks.append(occlusion_mask)
 
 	crop_vision_frame = prepare_crop_frame(crop_vision_frame)
-	face_enhancer_weight = numpy.array([ state_manager.get_item('face_enhancer_weight') ]).astype(numpy.double)
-	crop_vision_frame = forward(crop_vision_frame, face_enhancer_weight)
-	crop_vision_frame = normalize_crop_frame(crop_vision_frame)
 	crop_mask = numpy.minimum.reduce(crop_masks).clip(0, 1)
+	return crop_vision_frame, crop_mask, affine_matrix
+
+
+def paste_face(temp_vision_frame : VisionFrame, crop_vision_frame : VisionFrame, crop_mask : Mask, affine_matrix : Matrix) -> VisionFrame:
+	crop_vision_frame = normalize_crop_frame(crop_vision_frame)
 	paste_vision_frame = paste_back(temp_vision_frame, crop_vision_frame, crop_mask, affine_matrix)
 	temp_vision_frame = blend_frame(temp_vision_frame, paste_vision_frame)
 	return temp_vision_frame
@@ -321,12 +345,31 @@ def forward(crop_vision_frame : VisionFrame, face_enhancer_weight : FaceEnhancer
 		if face_enhancer_input.name == 'weight':
 			face_enhancer_inputs[face_enhancer_input.name] = face_enhancer_weight
 
-	with thread_semaphore():
+	with conditional_thread_semaphore(state_manager.get_item('face_enhancer_model')):
 		crop_vision_frame = face_enhancer.run(None, face_enhancer_inputs)[0][0]
 
 	return crop_vision_frame
 
 
+def forward_batch(crop_vision_frames : VisionFrame, face_enhancer_weight : FaceEnhancerWeight) -> VisionFrame:
+	face_enhancer = get_inference_pool().get('face_enhancer')
+	face_enhancer_inputs = {}
+
+	if not inference_manager.has_batch_axis(face_enhancer, 'input'):
+		return numpy.stack([ forward(crop_vision_frame[numpy.newaxis], face_enhancer_weight) for crop_vision_frame in crop_vision_frames ])
+
+	for face_enhancer_input in face_enhancer.get_inputs():
+		if face_enhancer_input.name == 'input':
+			face_enhancer_inputs[face_enhancer_input.name] = crop_vision_frames
+		if face_enhancer_input.name == 'weight':
+			face_enhancer_inputs[face_enhancer_input.name] = face_enhancer_weight
+
+	with conditional_thread_semaphore(state_manager.get_item('face_enhancer_model')):
+		crop_vision_frames = face_enhancer.run(None, face_enhancer_inputs)[0]
+
+	return crop_vision_frames
+
+
 def has_weight_input() -> bool:
 	face_enhancer = get_inference_pool().get('face_enhancer')
 
@@ -359,10 +402,27 @@ def blend_frame(temp_vision_frame : VisionFrame, paste_vision_frame : VisionFram
 	return temp_vision_frame
 
 
+def is_face_geometry_preserved() -> bool:
+	return True
+
+
+def get_frame_scale() -> int:
+	return 1
+
+
 def get_reference_frame(source_face : Face, target_face : Face, temp_vision_frame : VisionFrame) -> VisionFrame:
 	return enhance_face(target_face, temp_vision_frame)
 
 
+def process_frames_batch(inputs_batch : List[FaceEnhancerInputs]) -> List[VisionFrame]:
+	if len(inputs_batch) == 1:
+		return [ process_frame(inputs_batch[0]) ]
+
+	target_vision_frames = [ inputs.get('target_vision_frame') for inputs in inputs_batch ]
+	target_faces_batch = [ processors.select_target_faces(inputs.get('reference_faces'), inputs.get('target_vision_frame')) for inputs in inputs_batch ]
+	return enhance_faces(target_faces_batch, target_vision_frames)
+
+
 def process_frame(inputs : FaceEnhancerInputs) -> VisionFrame:
 	reference_faces = inputs.get('reference_faces')
 	target_vision_frame = inputs.get('target_vision_frame')
@@ -377,7 +437,7 @@ def process_frame(inputs : FaceEnhancerInputs) -> VisionFrame:
 		if target_face:
 			target_vision_frame = enhance_face(target_face, target_vision_frame)
 	if state_manager.get_item('face_selector_mode') == 'reference':
-		similar_faces = find_similar_faces(many_faces, reference_faces, state_manager.get_item('reference_face_distance'))
+		similar_faces = processors.select_target_faces(reference_faces, target_vision_frame)
 		if similar_faces:
 			for similar_face in similar_faces:
 				target_vision_frame = enhance_face(similar_face, target_vision_frame)
@@ -387,16 +447,19 @@ def process_frame(inputs : FaceEnhancerInputs) -> VisionFrame:
 def process_frames(source_path : List[str], queue_payloads : List[QueuePayload], update_progress : UpdateProgress) -> None:
 	reference_faces = get_reference_faces() if 'reference' in state_manager.get_item('face_selector_mode') else None
 
-	for queue_payload in process_manager.manage(queue_payloads):
-		target_vision_path = queue_payload['frame_path']
-		target_vision_frame = read_image(target_vision_path)
-		output_vision_frame = process_frame(
-		{
-			'reference_faces': reference_faces,
-			'target_vision_frame': target_vision_frame
-		})
-		write_image(target_vision_path, output_vision_frame)
-		update_progress(1)
+	for frame_batch in read_ahead_frame_batches(process_manager.manage(queue_payloads)):
+		output_vision_frames = process_frames_batch(
+		[
+			{
+				'reference_faces': reference_faces,
+				'target_vision_frame': target_vision_frame
+			}
+			for _, target_vision_frame in frame_batch
+		])
+
+		for (queue_payload, target_vision_frame), output_vision_frame in zip(frame_batch, output_vision_frames):
+			conditional_write_behind_frame(queue_payload.get('frame_path'), target_vision_frame, output_vision_frame)
+			update_progress(1)
 
 
 def process_image(source_path : str, target_path : str, output_path : str) -> None:
@@ -16,17 +16,18 @@ from ffedit.execution import has_execution_provider
 from ffedit.face_analyser import get_average_face, get_many_faces, get_one_face
 from ffedit.face_helper import paste_back, warp_face_by_face_landmark_5
 from ffedit.face_masker import create_area_mask, create_box_mask, create_occlusion_mask, create_region_mask
-from ffedit.face_selector import find_similar_faces, sort_and_filter_faces, sort_faces_by_order
+from ffedit.face_selector import sort_and_filter_faces, sort_faces_by_order
 from ffedit.face_store import get_reference_faces
 from ffedit.filesystem import filter_image_paths, has_image, in_directory, is_image, is_video, resolve_relative_path, same_file_extension
+from ffedit.frame_stager import conditional_write_behind_frame, read_ahead_frame_batches
 from ffedit.model_helper import get_static_model_initializer
 from ffedit.processors import choices as processors_choices
 from ffedit.processors.pixel_boost import explode_pixel_boost, implode_pixel_boost
 from ffedit.processors.types import FaceSwapperInputs
 from ffedit.program_helper import find_argument_group
 from ffedit.thread_helper import conditional_thread_semaphore
-from ffedit.types import ApplyStateItem, Args, DownloadScope, Embedding, Face, InferencePool, ModelOptions, ModelSet, ProcessMode, QueuePayload, UpdateProgress, VisionFrame
-from ffedit.vision import read_image, read_static_image, read_static_images, unpack_resolution, write_image
+from ffedit.types import ApplyStateItem, Args, DownloadScope, Embedding, Face, InferencePool, Mask, Matrix, ModelOptions, ModelSet, ProcessMode, QueuePayload, UpdateProgress, VisionFrame
+from ffedit.vision import read_static_image, read_static_images, unpack_resolution, write_image
 
 
 @lru_cache(maxsize = None)
@@ -493,12 +494,34 @@ def post_process() -> None:
 
 
 def swap_face(source_face : Face, target_face : Face, temp_vision_frame : VisionFrame) -> VisionFrame:
+	pixel_boost_vision_frames, crop_masks, affine_matrix = crop_face(target_face, temp_vision_frame)
+	crop_vision_frames = numpy.concatenate([ prepare_crop_frame(pixel_boost_vision_frame) for pixel_boost_vision_frame in pixel_boost_vision_frames ])
+	crop_vision_frames = forward_swap_face_batch(source_face, crop_vision_frames)
+	temp_vision_frames = [ normalize_crop_frame(crop_vision_frame) for crop_vision_frame in crop_vision_frames ]
+	return paste_face(target_face, temp_vision_frame, temp_vision_frames, crop_masks, affine_matrix)
+
+
+def swap_faces(source_face : Face, target_faces_batch : List[List[Face]], temp_vision_frames : List[VisionFrame]) -> List[VisionFrame]:
+	temp_vision_frames = list(temp_vision_frames)
+
+	for face_index in range(max(map(len, target_faces_batch), default = 0)):
+		crop_face_batch = [ (frame_index, target_faces[face_index], crop_face(target_faces[face_index], temp_vision_frames[frame_index])) for frame_index, target_faces in enumerate(target_faces_batch) if face_index < len(target_faces) ]
+		crop_vision_frames = numpy.concatenate([ prepare_crop_frame(pixel_boost_vision_frame) for _, _, (pixel_boost_vision_frames, _, _) in crop_face_batch for pixel_boost_vision_frame in pixel_boost_vision_frames ])
+		crop_vision_frames = forward_swap_face_batch(source_face, crop_vision_frames)
+		pixel_boost_count = len(crop_vision_frames) // len(crop_face_batch)
+
+		for crop_face_index, (frame_index, target_face, (_, crop_masks, affine_matrix)) in enumerate(crop_face_batch):
+			swap_vision_frames = [ normalize_crop_frame(crop_vision_frame) for crop_vision_frame in crop_vision_frames[crop_face_index * pixel_boost_count:(crop_face_index + 1) * pixel_boost_count] ]
+			temp_vision_frames[frame_index] = paste_face(target_face, temp_vision_frames[frame_index], swap_vision_frames, crop_masks, affine_matrix)
+	return temp_vision_frames
+
+
+def crop_face(target_face : Face, temp_vision_frame : VisionFrame) -> Tuple[VisionFrame, List[Mask], Matrix]:
 	model_template = get_model_options().get('template')
 	model_size = get_model_options().get('size')
 	pixel_boost_size = unpack_resolution(state_manager.get_item('face_swapper_pixel_boost'))
 	pixel_boost_total = pixel_boost_size[0] // model_size[0]
 	crop_vision_frame, affine_matrix = warp_face_by_face_landmark_5(temp_vision_frame, target_face.landmark_set.get('5/68'), model_template, pixel_boost_size)
-	temp_vision_frames = []
 	crop_masks = []
 
 	if 'box' in state_manager.get_item('face_mask_types'):
@@ -510,12 +533,15 @@ def swap_face(source_face : Face, target_face : Face, temp_vision_frame : Vision
 		crop_masks.append(occlusion_mask)
 
 	pixel_boost_vision_frames = implode_pixel_boost(crop_vision_frame, pixel_boost_total, model_size)
-	for pixel_boost_vision_frame in pixel_boost_vision_frames:
-		pixel_boost_vision_frame = prepare_crop_frame(pixel_boost_vision_frame)
-		pixel_boost_vision_frame = forward_swap_face(source_face, pixel_boost_vision_frame)
-		pixel_boost_vision_frame = normalize_crop_frame(pixel_boost_vision_frame)
-		temp_vision_frames.append(pixel_boost_vision_frame)
+	return pixel_boost_vision_frames, crop_masks, affine_matrix
+
+
+def paste_face(target_face : Face, temp_vision_frame : VisionFrame, temp_vision_frames : List[VisionFrame], crop_masks : List[Mask], affine_matrix : Matrix) -> VisionFrame:
+	model_size = get_model_options().get('size')
+	pixel_boost_size = unpack_resolution(state_manager.get_item('face_swapper_pixel_boost'))
+	pixel_boost_total = pixel_boost_size[0] // model_size[0]
 	crop_vision_frame = explode_pixel_boost(temp_vision_frames, pixel_boost_total, model_size, pixel_boost_size)
+	crop_masks = list(crop_masks)
 
 	if 'area' in state_manager.get_item('face_mask_types'):
 		face_landmark_68 = cv2.transform(target_face.landmark_set.get('68').reshape(1, -1, 2), affine_matrix).reshape(-1, 2)
@@ -548,16 +574,42 @@ def forward_swap_face(source_face : Face, crop_vision_frame : VisionFrame) -> Vi
 		if face_swapper_input.name == 'target':
 			face_swapper_inputs[face_swapper_input.name] = crop_vision_frame
 
-	with conditional_thread_semaphore():
+	with conditional_thread_semaphore(get_model_name()):
 		crop_vision_frame = face_swapper.run(None, face_swapper_inputs)[0][0]
 
 	return crop_vision_frame
 
 
+def forward_swap_face_batch(source_face : Face, crop_vision_frames : VisionFrame) -> VisionFrame:
+	face_swapper = get_inference_pool().get('face_swapper')
+	model_type = get_model_options().get('type')
+	face_swapper_inputs = {}
+
+	if not inference_manager.has_batch_axis(face_swapper, 'target'):
+		return numpy.stack([ forward_swap_face(source_face, crop_vision_frame[numpy.newaxis]) for crop_vision_frame in crop_vision_frames ])
+
+	if has_execution_provider('coreml') and model_type in [ 'ghost', 'uniface' ]:
+		face_swapper.set_providers([ ffedit.choices.execution_provider_set.get('cpu') ])
+
+	for face_swapper_input in face_swapper.get_inputs():
+		if face_swapper_input.name == 'source':
+			if model_type in [ 'blendswap', 'uniface' ]:
+				face_swapper_inputs[face_swapper_input.name] = numpy.repeat(prepare_source_frame(source_face), len(crop_vision_frames), axis = 0)
+			else:
+				face_swapper_inputs[face_swapper_input.name] = numpy.repeat(prepare_source_embedding(source_face), len(crop_vision_frames), axis = 0)
+		if face_swapper_input.name == 'target':
+			face_swapper_inputs[face_swapper_input.name] = crop_vision_frames
+
+	with conditional_thread_semaphore(get_model_name()):
+		crop_vision_frames = face_swapper.run(None, face_swapper_inputs)[0]
+
+	return crop_vision_frames
+
+
 def forward_convert_embedding(embedding : Embedding) -> Embedding:
 	embedding_converter = get_inference_pool().get('embedding_converter')
 
-	with conditional_thread_semaphore():
+	with conditional_thread_semaphore(get_model_name()):
 		embedding = embedding_converter.run(None,
 		{
 			'input': embedding
@@ -636,10 +688,28 @@ def normalize_crop_frame(crop_vision_frame : VisionFrame) -> VisionFrame:
 	return crop_vision_frame
 
 
+def is_face_geometry_preserved() -> bool:
+	return True
+
+
+def get_frame_scale() -> int:
+	return 1
+
+
 def get_reference_frame(source_face : Face, target_face : Face, temp_vision_frame : VisionFrame) -> VisionFrame:
 	return swap_face(source_face, target_face, temp_vision_frame)
 
 
+def process_frames_batch(inputs_batch : List[FaceSwapperInputs]) -> List[VisionFrame]:
+	if len(inputs_batch) == 1:
+		return [ process_frame(inputs_batch[0]) ]
+
+	source_face = inputs_batch[0].get('source_face')
+	target_vision_frames = [ inputs.get('target_vision_frame') for inputs in inputs_batch ]
+	target_faces_batch = [ processors.select_target_faces(inputs.get('reference_faces'), inputs.get('target_vision_frame')) for inputs in inputs_batch ]
+	return swap_faces(source_face, target_faces_batch, target_vision_frames)
+
+
 def process_frame(inputs : FaceSwapperInputs) -> VisionFrame:
 	reference_faces = inputs.get('reference_faces')
 	source_face = inputs.get('source_face')
@@ -655,7 +725,7 @@ def process_frame(inputs : FaceSwapperInputs) -> VisionFrame:
 		if target_face:
 			target_vision_frame = swap_face(source_face, target_face, target_vision_frame)
 	if state_manager.get_item('face_selector_mode') == 'reference':
-		similar_faces = find_similar_faces(many_faces, reference_faces, state_manager.get_item('reference_face_distance'))
+		similar_faces = processors.select_target_faces(reference_faces, target_vision_frame)
 		if similar_faces:
 			for similar_face in similar_faces:
 				target_vision_frame = swap_face(source_face, similar_face, target_vision_frame)
@@ -674,17 +744,20 @@ def process_frames(source_paths : List[str], queue_payloads : List[QueuePayload]
 			source_faces.append(get_first(temp_faces))
 	source_face = get_average_face(source_faces)
 
-	for queue_payload in process_manager.manage(queue_payloads):
-		target_vision_path = queue_payload['frame_path']
-		target_vision_frame = read_image(target_vision_path)
-		output_vision_frame = process_frame(
-		{
-			'reference_faces': reference_faces,
-			'source_face': source_face,
-			'target_vision_frame': target_vision_frame
-		})
-		write_image(target_vision_path, output_vision_frame)
-		update_progress(1)
+	for frame_batch in read_ahead_frame_batches(process_manager.manage(queue_payloads)):
+		output_vision_frames = process_frames_batch(
+		[
+			{
+				'reference_faces': reference_faces,
+				'source_face': source_face,
+				'target_vision_frame': target_vision_frame
+			}
+			for _, target_vision_frame in frame_batch
+		])
+
+		for (queue_payload, target_vision_frame), output_vision_frame in zip(frame_batch, output_vision_frames):
+			conditional_write_behind_frame(queue_payload.get('frame_path'), target_vision_frame, output_vision_frame)
+			update_progress(1)
 
 
 def process_image(source_paths : List[str], target_path : str, output_path : str) -> None:
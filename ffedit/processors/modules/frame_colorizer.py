@@ -13,12 +13,13 @@ from ffedit.common_helper import create_int_metavar
 from ffedit.download import conditional_download_hashes, conditional_download_sources, resolve_download_url
 from ffedit.execution import has_execution_provider
 from ffedit.filesystem import in_directory, is_image, is_video, resolve_relative_path, same_file_extension
+from ffedit.frame_stager import conditional_write_behind_frame, read_ahead_frames
 from ffedit.processors import choices as processors_choices
 from ffedit.processors.types import FrameColorizerInputs
 from ffedit.program_helper import find_argument_group
-from ffedit.thread_helper import thread_semaphore
+from ffedit.thread_helper import conditional_thread_semaphore
 from ffedit.types import ApplyStateItem, Args, DownloadScope, ExecutionProvider, Face, InferencePool, ModelOptions, ModelSet, ProcessMode, QueuePayload, UpdateProgress, VisionFrame
-from ffedit.vision import read_image, read_static_image, unpack_resolution, write_image
+from ffedit.vision import read_static_image, unpack_resolution, write_image
 
 
 @lru_cache(maxsize = None)
@@ -206,7 +207,7 @@ def colorize_frame(temp_vision_frame : VisionFrame) -> VisionFrame:
 def forward(color_vision_frame : VisionFrame) -> VisionFrame:
 	frame_colorizer = get_inference_pool().get('frame_colorizer')
 
-	with thread_semaphore():
+	with conditional_thread_semaphore(state_manager.get_item('frame_colorizer_model')):
 		color_vision_frame = frame_colorizer.run(None,
 		{
 			'input': color_vision_frame
@@ -261,6 +262,14 @@ def blend_frame(temp_vision_frame : VisionFrame, paste_vision_frame : VisionFram
 	return temp_vision_frame
 
 
+def is_face_geometry_preserved() -> bool:
+	return True
+
+
+def get_frame_scale() -> int:
+	return 1
+
+
 def get_reference_frame(source_face : Face, target_face : Face, temp_vision_frame : VisionFrame) -> VisionFrame:
 	pass
 
@@ -271,14 +280,13 @@ def process_frame(inputs : FrameColorizerInputs) -> VisionFrame:
 
 
 def process_frames(source_paths : List[str], queue_payloads : List[QueuePayload], update_progress : UpdateProgress) -> None:
-	for queue_payload in process_manager.manage(queue_payloads):
+	for queue_payload, target_vision_frame in read_ahead_frames(process_manager.manage(queue_payloads)):
 		target_vision_path = queue_payload['frame_path']
-		target_vision_frame = read_image(target_vision_path)
 		output_vision_frame = process_frame(
 		{
 			'target_vision_frame': target_vision_frame
 		})
-		write_image(target_vision_path, output_vision_frame)
+		conditional_write_behind_frame(target_vision_path, target_vision_frame, output_vision_frame)
 		update_progress(1)
 
 
@@ -1,6 +1,6 @@
 from argparse import ArgumentParser
 from functools import lru_cache
-from typing import List
+from typing import List, Tuple
 
 import cv2
 import numpy
@@ -13,12 +13,19 @@ from ffedit.common_helper import create_int_metavar
 from ffedit.download import conditional_download_hashes, conditional_download_sources, resolve_download_url
 from ffedit.execution import has_execution_provider
 from ffedit.filesystem import in_directory, is_image, is_video, resolve_relative_path, same_file_extension
+from ffedit.frame_stager import conditional_write_behind_frame, read_ahead_frames
+from ffedit.frame_store import is_raw_frame_format
+from ffedit.memory import detect_free_memory
 from ffedit.processors import choices as processors_choices
-from ffedit.processors.types import FrameEnhancerInputs
+from ffedit.processors.types import FrameEnhancerInputs, FrameEnhancerModel
 from ffedit.program_helper import find_argument_group
 from ffedit.thread_helper import conditional_thread_semaphore
 from ffedit.types import ApplyStateItem, Args, DownloadScope, Face, InferencePool, ModelOptions, ModelSet, ProcessMode, QueuePayload, UpdateProgress, VisionFrame
-from ffedit.vision import create_tile_frames, merge_tile_frames, read_image, read_static_image, write_image
+from ffedit.vision import create_tile_frames, merge_tile_frames, read_static_image, write_image
+
+TILE_FEATURE_CHANNELS : int = 64
+TILE_FEATURE_MAPS : int = 8
+TILE_FLOAT_BYTES : int = 4
 
 
 @lru_cache(maxsize = None)
@@ -466,11 +473,15 @@ def pre_process(mode : ProcessMode) -> bool:
 	if mode == 'output' and not same_file_extension(state_manager.get_item('target_path'), state_manager.get_item('output_path')):
 		logger.error(wording.get('match_target_and_output_extension') + wording.get('exclamation_mark'), __name__)
 		return False
+	if mode == 'output' and is_video(state_manager.get_item('target_path')) and is_raw_frame_format() and state_manager.get_item('video_pipeline') != 'streaming':
+		logger.error(wording.get('choose_image_temp_frame_format') + wording.get('exclamation_mark'), __name__)
+		return False
 	return True
 
 
 def post_process() -> None:
 	read_static_image.cache_clear()
+	get_static_tile_options.cache_clear()
 	video_manager.clear_video_pool()
 	if state_manager.get_item('video_memory_strategy') in [ 'strict', 'moderate' ]:
 		clear_inference_pool()
@@ -479,44 +490,79 @@ def post_process() -> None:
 
 
 def enhance_frame(temp_vision_frame : VisionFrame) -> VisionFrame:
-	model_size = get_model_options().get('size')
 	model_scale = get_model_options().get('scale')
 	temp_height, temp_width = temp_vision_frame.shape[:2]
+	model_size, tile_batch_size = get_static_tile_options(state_manager.get_item('frame_enhancer_model'), state_manager.get_item('execution_batch_size'), state_manager.get_item('execution_thread_count'), temp_width, temp_height)
 	tile_vision_frames, pad_width, pad_height = create_tile_frames(temp_vision_frame, model_size)
 
-	for index, tile_vision_frame in enumerate(tile_vision_frames):
-		tile_vision_frame = prepare_tile_frame(tile_vision_frame)
-		tile_vision_frame = forward(tile_vision_frame)
-		tile_vision_frames[index] = normalize_tile_frame(tile_vision_frame)
+	for index in range(0, len(tile_vision_frames), tile_batch_size):
+		tile_batch_frames = prepare_tile_frames(tile_vision_frames[index:index + tile_batch_size])
+		tile_batch_frames = forward(tile_batch_frames)
+		tile_vision_frames[index:index + tile_batch_size] = normalize_tile_frames(tile_batch_frames)
 
 	merge_vision_frame = merge_tile_frames(tile_vision_frames, temp_width * model_scale, temp_height * model_scale, pad_width * model_scale, pad_height * model_scale, (model_size[0] * model_scale, model_size[1] * model_scale, model_size[2] * model_scale))
 	temp_vision_frame = blend_frame(temp_vision_frame, merge_vision_frame)
 	return temp_vision_frame
 
 
-def forward(tile_vision_frame : VisionFrame) -> VisionFrame:
+def forward(tile_vision_frames : VisionFrame) -> VisionFrame:
 	frame_enhancer = get_inference_pool().get('frame_enhancer')
 
-	with conditional_thread_semaphore():
-		tile_vision_frame = frame_enhancer.run(None,
+	with conditional_thread_semaphore(get_frame_enhancer_model()):
+		tile_vision_frames = inference_manager.run_direct_inference(frame_enhancer, None,
 		{
-			'input': tile_vision_frame
+			'input': tile_vision_frames
 		})[0]
 
-	return tile_vision_frame
+	return tile_vision_frames
+
+
+@lru_cache(maxsize = None)
+def get_static_tile_options(frame_enhancer_model : FrameEnhancerModel, execution_batch_size : int, execution_thread_count : int, temp_width : int, temp_height : int) -> Tuple[Tuple[int, int, int], int]:
+	frame_enhancer = get_inference_pool().get('frame_enhancer')
+	model_size = get_model_options().get('size')
+	tile_size = model_size[0]
+	tile_batch_size = 1
+
+	if execution_batch_size > 1:
+		tile_memory_limit = detect_free_memory() // 2 // execution_thread_count
+
+		if has_dynamic_tile_size():
+			while tile_size * 2 <= min(model_size[0] * 4, max(temp_width, temp_height)) and estimate_tile_memory(tile_size * 2) <= tile_memory_limit:
+				tile_size *= 2
+		if inference_manager.has_batch_axis(frame_enhancer, 'input'):
+			tile_batch_size = max(1, min(execution_batch_size, tile_memory_limit // estimate_tile_memory(tile_size)))
+	return (tile_size, model_size[1], model_size[2]), tile_batch_size
+
 
+def has_dynamic_tile_size() -> bool:
+	frame_enhancer = get_inference_pool().get('frame_enhancer')
+
+	for frame_enhancer_input in frame_enhancer.get_inputs():
+		if frame_enhancer_input.name == 'input':
+			return not any(isinstance(input_axis, int) for input_axis in frame_enhancer_input.shape[2:])
+
+	return False
+
+
+def estimate_tile_memory(tile_size : int) -> int:
+	model_scale = get_model_options().get('scale')
+	tile_feature_size = TILE_FEATURE_CHANNELS * TILE_FEATURE_MAPS
+	tile_frame_size = 3 + 3 * model_scale ** 2
+	return tile_size ** 2 * (tile_feature_size + tile_frame_size) * TILE_FLOAT_BYTES
 
-def prepare_tile_frame(vision_tile_frame : VisionFrame) -> VisionFrame:
-	vision_tile_frame = numpy.expand_dims(vision_tile_frame[:, :, ::-1], axis = 0)
-	vision_tile_frame = vision_tile_frame.transpose(0, 3, 1, 2)
-	vision_tile_frame = vision_tile_frame.astype(numpy.float32) / 255.0
-	return vision_tile_frame
 
+def prepare_tile_frames(tile_vision_frames : List[VisionFrame]) -> VisionFrame:
+	tile_batch_frames = numpy.stack(tile_vision_frames)[:, :, :, ::-1]
+	tile_batch_frames = tile_batch_frames.transpose(0, 3, 1, 2)
+	tile_batch_frames = tile_batch_frames.astype(numpy.float32) / 255.0
+	return tile_batch_frames
 
-def normalize_tile_frame(vision_tile_frame : VisionFrame) -> VisionFrame:
-	vision_tile_frame = vision_tile_frame.transpose(0, 2, 3, 1).squeeze(0) * 255
-	vision_tile_frame = vision_tile_frame.clip(0, 255).astype(numpy.uint8)[:, :, ::-1]
-	return vision_tile_frame
+
+def normalize_tile_frames(tile_vision_frames : VisionFrame) -> List[VisionFrame]:
+	tile_vision_frames = tile_vision_frames.transpose(0, 2, 3, 1) * 255
+	tile_vision_frames = tile_vision_frames.clip(0, 255).astype(numpy.uint8)[:, :, :, ::-1]
+	return list(tile_vision_frames)
 
 
 def blend_frame(temp_vision_frame : VisionFrame, merge_vision_frame : VisionFrame) -> VisionFrame:
@@ -526,6 +572,14 @@ def blend_frame(temp_vision_frame : VisionFrame, merge_vision_frame : VisionFram
 	return temp_vision_frame
 
 
+def is_face_geometry_preserved() -> bool:
+	return False
+
+
+def get_frame_scale() -> int:
+	return get_model_options().get('scale')
+
+
 def get_reference_frame(source_face : Face, target_face : Face, temp_vision_frame : VisionFrame) -> VisionFrame:
 	pass
 
@@ -536,14 +590,13 @@ def process_frame(inputs : FrameEnhancerInputs) -> VisionFrame:
 
 
 def process_frames(source_paths : List[str], queue_payloads : List[QueuePayload], update_progress : UpdateProgress) -> None:
-	for queue_payload in process_manager.manage(queue_payloads):
+	for queue_payload, target_vision_frame in read_ahead_frames(process_manager.manage(queue_payloads)):
 		target_vision_path = queue_payload['frame_path']
-		target_vision_frame = read_image(target_vision_path)
 		output_vision_frame = process_frame(
 		{
 			'target_vision_frame': target_vision_frame
 		})
-		write_image(target_vision_path, output_vision_frame)
+		conditional_write_behind_frame(target_vision_path, target_vision_frame, output_vision_frame)
 		update_progress(1)
 
 
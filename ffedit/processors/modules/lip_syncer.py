@@ -1,6 +1,6 @@
 from argparse import ArgumentParser
 from functools import lru_cache
-from typing import List
+from typing import List, Optional, Tuple
 
 import cv2
 import numpy
@@ -9,22 +9,23 @@ import ffedit.jobs.job_manager
 import ffedit.jobs.job_store
 import ffedit.processors.core as processors
 from ffedit import config, content_analyser, face_classifier, face_detector, face_landmarker, face_masker, face_recognizer, inference_manager, logger, process_manager, state_manager, video_manager, voice_extractor, wording
-from ffedit.audio import create_empty_audio_frame, get_voice_frame, read_static_voice
+from ffedit.audio import create_empty_audio_frame, read_static_voice
 from ffedit.common_helper import create_float_metavar
 from ffedit.common_helper import get_first
 from ffedit.download import conditional_download_hashes, conditional_download_sources, resolve_download_url
 from ffedit.face_analyser import get_many_faces, get_one_face
 from ffedit.face_helper import create_bounding_box, paste_back, warp_face_by_bounding_box, warp_face_by_face_landmark_5
 from ffedit.face_masker import create_area_mask, create_box_mask, create_occlusion_mask
-from ffedit.face_selector import find_similar_faces, sort_and_filter_faces
+from ffedit.face_selector import sort_and_filter_faces
 from ffedit.face_store import get_reference_faces
 from ffedit.filesystem import filter_audio_paths, has_audio, in_directory, is_image, is_video, resolve_relative_path, same_file_extension
+from ffedit.frame_stager import conditional_write_behind_frame, read_ahead_frame_batches
 from ffedit.processors import choices as processors_choices
 from ffedit.processors.types import LipSyncerInputs, LipSyncerWeight
 from ffedit.program_helper import find_argument_group
 from ffedit.thread_helper import conditional_thread_semaphore
-from ffedit.types import ApplyStateItem, Args, AudioFrame, BoundingBox, DownloadScope, Face, InferencePool, ModelOptions, ModelSet, ProcessMode, QueuePayload, UpdateProgress, VisionFrame
-from ffedit.vision import read_image, read_static_image, restrict_video_fps, write_image
+from ffedit.types import ApplyStateItem, Args, AudioFrame, BoundingBox, DownloadScope, Face, InferencePool, Mask, Matrix, ModelOptions, ModelSet, ProcessMode, QueuePayload, UpdateProgress, VisionFrame
+from ffedit.vision import read_static_image, restrict_video_fps, write_image
 
 
 @lru_cache(maxsize = None)
@@ -167,10 +168,31 @@ def post_process() -> None:
 
 
 def sync_lip(target_face : Face, temp_audio_frame : AudioFrame, temp_vision_frame : VisionFrame) -> VisionFrame:
+	temp_audio_frame, crop_vision_frame, crop_mask, affine_matrix, area_matrix = crop_face(target_face, temp_audio_frame, temp_vision_frame)
+	crop_vision_frame = forward(temp_audio_frame, crop_vision_frame)
+	return paste_face(temp_vision_frame, crop_vision_frame, crop_mask, affine_matrix, area_matrix)
+
+
+def sync_lips(target_faces_batch : List[List[Face]], temp_audio_frames : List[AudioFrame], temp_vision_frames : List[VisionFrame]) -> List[VisionFrame]:
+	temp_vision_frames = list(temp_vision_frames)
+
+	for face_index in range(max(map(len, target_faces_batch), default = 0)):
+		crop_face_batch = [ (frame_index, crop_face(target_faces[face_index], temp_audio_frames[frame_index], temp_vision_frames[frame_index])) for frame_index, target_faces in enumerate(target_faces_batch) if face_index < len(target_faces) ]
+		crop_audio_frames = numpy.concatenate([ temp_audio_frame for _, (temp_audio_frame, _, _, _, _) in crop_face_batch ])
+		crop_vision_frames = numpy.concatenate([ crop_vision_frame for _, (_, crop_vision_frame, _, _, _) in crop_face_batch ])
+		crop_vision_frames = forward_batch(crop_audio_frames, crop_vision_frames)
+
+		for (frame_index, (_, _, crop_mask, affine_matrix, area_matrix)), crop_vision_frame in zip(crop_face_batch, crop_vision_frames):
+			temp_vision_frames[frame_index] = paste_face(temp_vision_frames[frame_index], crop_vision_frame[numpy.newaxis], crop_mask, affine_matrix, area_matrix)
+	return temp_vision_frames
+
+
+def crop_face(target_face : Face, temp_audio_frame : AudioFrame, temp_vision_frame : VisionFrame) -> Tuple[AudioFrame, VisionFrame, Mask, Matrix, Optional[Matrix]]:
 	model_type = get_model_options().get('type')
 	model_size = get_model_options().get('size')
 	temp_audio_frame = prepare_audio_frame(temp_audio_frame)
 	crop_vision_frame, affine_matrix = warp_face_by_face_landmark_5(temp_vision_frame, target_face.landmark_set.get('5/68'), 'ffhq_512', (512, 512))
+	area_matrix = None
 	crop_masks = []
 
 	if 'occlusion' in state_manager.get_item('face_mask_types'):
@@ -178,12 +200,9 @@ def sync_lip(target_face : Face, temp_audio_frame : AudioFrame, temp_vision_fram
 		crop_masks.append(occlusion_mask)
 
 	if model_type == 'edtalk':
-		lip_syncer_weight = numpy.array([ state_manager.get_item('lip_syncer_weight') ]).astype(numpy.float32)
 		box_mask = create_box_mask(crop_vision_frame, state_manager.get_item('face_mask_blur'), state_manager.get_item('face_mask_padding'))
 		crop_masks.append(box_mask)
 		crop_vision_frame = prepare_crop_frame(crop_vision_frame)
-		crop_vision_frame = forward_edtalk(temp_audio_frame, crop_vision_frame, lip_syncer_weight)
-		crop_vision_frame = normalize_crop_frame(crop_vision_frame)
 	if model_type == 'wav2lip':
 		face_landmark_68 = cv2.transform(target_face.landmark_set.get('68').reshape(1, -1, 2), affine_matrix).reshape(-1, 2)
 		area_mask = create_area_mask(crop_vision_frame, face_landmark_68, [ 'lower-face' ])
@@ -191,20 +210,43 @@ def sync_lip(target_face : Face, temp_audio_frame : AudioFrame, temp_vision_fram
 		bounding_box = create_bounding_box(face_landmark_68)
 		bounding_box = resize_bounding_box(bounding_box, 1 / 8)
 		area_vision_frame, area_matrix = warp_face_by_bounding_box(crop_vision_frame, bounding_box, model_size)
-		area_vision_frame = prepare_crop_frame(area_vision_frame)
-		area_vision_frame = forward_wav2lip(temp_audio_frame, area_vision_frame)
-		area_vision_frame = normalize_crop_frame(area_vision_frame)
-		crop_vision_frame = cv2.warpAffine(area_vision_frame, cv2.invertAffineTransform(area_matrix), (512, 512), borderMode = cv2.BORDER_REPLICATE)
+		crop_vision_frame = prepare_crop_frame(area_vision_frame)
 
 	crop_mask = numpy.minimum.reduce(crop_masks)
+	return temp_audio_frame, crop_vision_frame, crop_mask, affine_matrix, area_matrix
+
+
+def paste_face(temp_vision_frame : VisionFrame, crop_vision_frame : VisionFrame, crop_mask : Mask, affine_matrix : Matrix, area_matrix : Optional[Matrix]) -> VisionFrame:
+	crop_vision_frame = normalize_crop_frame(crop_vision_frame)
+
+	if area_matrix is not None:
+		crop_vision_frame = cv2.warpAffine(crop_vision_frame, cv2.invertAffineTransform(area_matrix), (512, 512), borderMode = cv2.BORDER_REPLICATE)
+
 	paste_vision_frame = paste_back(temp_vision_frame, crop_vision_frame, crop_mask, affine_matrix)
 	return paste_vision_frame
 
 
+def forward(temp_audio_frame : AudioFrame, crop_vision_frame : VisionFrame) -> VisionFrame:
+	model_type = get_model_options().get('type')
+
+	if model_type == 'edtalk':
+		lip_syncer_weight = numpy.array([ state_manager.get_item('lip_syncer_weight') ]).astype(numpy.float32)
+		return forward_edtalk(temp_audio_frame, crop_vision_frame, lip_syncer_weight)
+	return forward_wav2lip(temp_audio_frame, crop_vision_frame)
+
+
+def forward_batch(temp_audio_frames : AudioFrame, crop_vision_frames : VisionFrame) -> VisionFrame:
+	lip_syncer = get_inference_pool().get('lip_syncer')
+
+	if inference_manager.has_batch_axis(lip_syncer, 'target'):
+		return forward(temp_audio_frames, crop_vision_frames)
+	return numpy.concatenate([ forward(temp_audio_frame[numpy.newaxis], crop_vision_frame[numpy.newaxis]) for temp_audio_frame, crop_vision_frame in zip(temp_audio_frames, crop_vision_frames) ])
+
+
 def forward_edtalk(temp_audio_frame : AudioFrame, crop_vision_frame : VisionFrame, lip_syncer_weight : LipSyncerWeight) -> VisionFrame:
 	lip_syncer = get_inference_pool().get('lip_syncer')
 
-	with conditional_thread_semaphore():
+	with conditional_thread_semaphore(state_manager.get_item('lip_syncer_model')):
 		crop_vision_frame = lip_syncer.run(None,
 		{
 			'source': temp_audio_frame,
@@ -218,7 +260,7 @@ def forward_edtalk(temp_audio_frame : AudioFrame, crop_vision_frame : VisionFram
 def forward_wav2lip(temp_audio_frame : AudioFrame, area_vision_frame : VisionFrame) -> VisionFrame:
 	lip_syncer = get_inference_pool().get('lip_syncer')
 
-	with conditional_thread_semaphore():
+	with conditional_thread_semaphore(state_manager.get_item('lip_syncer_model')):
 		area_vision_frame = lip_syncer.run(None,
 		{
 			'source': temp_audio_frame,
@@ -279,10 +321,28 @@ def normalize_crop_frame(crop_vision_frame : VisionFrame) -> VisionFrame:
 	return crop_vision_frame
 
 
+def is_face_geometry_preserved() -> bool:
+	return False
+
+
+def get_frame_scale() -> int:
+	return 1
+
+
 def get_reference_frame(source_face : Face, target_face : Face, temp_vision_frame : VisionFrame) -> VisionFrame:
 	pass
 
 
+def process_frames_batch(inputs_batch : List[LipSyncerInputs]) -> List[VisionFrame]:
+	if len(inputs_batch) == 1:
+		return [ process_frame(inputs_batch[0]) ]
+
+	temp_audio_frames = [ inputs.get('source_audio_frame') for inputs in inputs_batch ]
+	target_vision_frames = [ inputs.get('target_vision_frame') for inputs in inputs_batch ]
+	target_faces_batch = [ processors.select_target_faces(inputs.get('reference_faces'), inputs.get('target_vision_frame')) for inputs in inputs_batch ]
+	return sync_lips(target_faces_batch, temp_audio_frames, target_vision_frames)
+
+
 def process_frame(inputs : LipSyncerInputs) -> VisionFrame:
 	reference_faces = inputs.get('reference_faces')
 	source_audio_frame = inputs.get('source_audio_frame')
@@ -298,7 +358,7 @@ def process_frame(inputs : LipSyncerInputs) -> VisionFrame:
 		if target_face:
 			target_vision_frame = sync_lip(target_face, source_audio_frame, target_vision_frame)
 	if state_manager.get_item('face_selector_mode') == 'reference':
-		similar_faces = find_similar_faces(many_faces, reference_faces, state_manager.get_item('reference_face_distance'))
+		similar_faces = processors.select_target_faces(reference_faces, target_vision_frame)
 		if similar_faces:
 			for similar_face in similar_faces:
 				target_vision_frame = sync_lip(similar_face, source_audio_frame, target_vision_frame)
@@ -310,21 +370,20 @@ def process_frames(source_paths : List[str], queue_payloads : List[QueuePayload]
 	source_audio_path = get_first(filter_audio_paths(source_paths))
 	temp_video_fps = restrict_video_fps(state_manager.get_item('target_path'), state_manager.get_item('output_video_fps'))
 
-	for queue_payload in process_manager.manage(queue_payloads):
-		frame_number = queue_payload.get('frame_number')
-		target_vision_path = queue_payload.get('frame_path')
-		source_audio_frame = get_voice_frame(source_audio_path, temp_video_fps, frame_number)
-		if not numpy.any(source_audio_frame):
-			source_audio_frame = create_empty_audio_frame()
-		target_vision_frame = read_image(target_vision_path)
-		output_vision_frame = process_frame(
-		{
-			'reference_faces': reference_faces,
-			'source_audio_frame': source_audio_frame,
-			'target_vision_frame': target_vision_frame
-		})
-		write_image(target_vision_path, output_vision_frame)
-		update_progress(1)
+	for frame_batch in read_ahead_frame_batches(process_manager.manage(queue_payloads)):
+		output_vision_frames = process_frames_batch(
+		[
+			{
+				'reference_faces': reference_faces,
+				'source_audio_frame': processors.get_source_audio_frame(source_audio_path, temp_video_fps, queue_payload.get('frame_number')),
+				'target_vision_frame': target_vision_frame
+			}
+			for queue_payload, target_vision_frame in frame_batch
+		])
+
+		for (queue_payload, target_vision_frame), output_vision_frame in zip(frame_batch, output_vision_frames):
+			conditional_write_behind_frame(queue_payload.get('frame_path'), target_vision_frame, output_vision_frame)
+			update_progress(1)
 
 
 def process_image(source_paths : List[str], target_path : str, output_path : str) -> None:
@@ -101,7 +101,11 @@ def create_face_detector_program() -> ArgumentParser:
 	group_face_detector.add_argument('--face-detector-size', help = wording.get('help.face_detector_size'), default = config.get_str_value('face_detector', 'face_detector_size', get_last(face_detector_size_choices)), choices = face_detector_size_choices)
 	group_face_detector.add_argument('--face-detector-angles', help = wording.get('help.face_detector_angles'), type = int, default = config.get_int_list('face_detector', 'face_detector_angles', '0'), choices = ffedit.choices.face_detector_angles, nargs = '+', metavar = 'FACE_DETECTOR_ANGLES')
 	group_face_detector.add_argument('--face-detector-score', help = wording.get('help.face_detector_score'), type = float, default = config.get_float_value('face_detector', 'face_detector_score', '0.5'), choices = ffedit.choices.face_detector_score_range, metavar = create_float_metavar(ffedit.choices.face_detector_score_range))
-	job_store.register_step_keys([ 'face_detector_model', 'face_detector_angles', 'face_detector_size', 'face_detector_score' ])
+	group_face_detector.add_argument('--face-detector-mode', help = wording.get('help.face_detector_mode'), default = config.get_str_value('face_detector', 'face_detector_mode', 'full'), choices = ffedit.choices.face_detector_modes)
+	group_face_detector.add_argument('--face-detector-interval', help = wording.get('help.face_detector_interval'), type = int, default = config.get_int_value('face_detector', 'face_detector_interval'), choices = ffedit.choices.face_detector_interval_range, metavar = create_int_metavar(ffedit.choices.face_detector_interval_range))
+	group_face_detector.add_argument('--scene-cut-threshold', help = wording.get('help.scene_cut_threshold'), type = float, default = config.get_float_value('face_detector', 'scene_cut_threshold', '0.75'), choices = ffedit.choices.scene_cut_threshold_range, metavar = create_float_metavar(ffedit.choices.scene_cut_threshold_range))
+	group_face_detector.add_argument('--face-tracker-score', help = wording.get('help.face_tracker_score'), type = float, default = config.get_float_value('face_detector', 'face_tracker_score'), choices = ffedit.choices.face_tracker_score_range, metavar = create_float_metavar(ffedit.choices.face_tracker_score_range))
+	job_store.register_step_keys([ 'face_detector_model', 'face_detector_angles', 'face_detector_size', 'face_detector_score', 'face_detector_mode', 'face_detector_interval', 'scene_cut_threshold', 'face_tracker_score' ])
 	return program
 
 
@@ -150,19 +154,22 @@ def create_frame_extraction_program() -> ArgumentParser:
 	group_frame_extraction.add_argument('--trim-frame-start', help = wording.get('help.trim_frame_start'), type = int, default = config.get_int_value('frame_extraction', 'trim_frame_start'))
 	group_frame_extraction.add_argument('--trim-frame-end', help = wording.get('help.trim_frame_end'), type = int, default = config.get_int_value('frame_extraction', 'trim_frame_end'))
 	group_frame_extraction.add_argument('--temp-frame-format', help = wording.get('help.temp_frame_format'), default = config.get_str_value('frame_extraction', 'temp_frame_format', 'png'), choices = ffedit.choices.temp_frame_formats)
-	job_store.register_step_keys([ 'trim_frame_start', 'trim_frame_end', 'temp_frame_format' ])
+	group_frame_extraction.add_argument('--video-pipeline', help = wording.get('help.video_pipeline'), default = config.get_str_value('frame_extraction', 'video_pipeline', 'sequential'), choices = ffedit.choices.video_pipelines)
+	group_frame_extraction.add_argument('--frame-duplicate-threshold', help = wording.get('help.frame_duplicate_threshold'), type = int, default = config.get_int_value('frame_extraction', 'frame_duplicate_threshold'), choices = ffedit.choices.frame_duplicate_threshold_range, metavar = create_int_metavar(ffedit.choices.frame_duplicate_threshold_range))
+	job_store.register_step_keys([ 'trim_frame_start', 'trim_frame_end', 'temp_frame_format', 'video_pipeline', 'frame_duplicate_threshold' ])
 	return program
 
 
 def create_output_creation_program() -> ArgumentParser:
 	program = ArgumentParser(add_help = False)
 	group_output_creation = program.add_argument_group('output creation')
+	group_output_creation.add_argument('--image-pipeline', help = wording.get('help.image_pipeline'), default = config.get_str_value('output_creation', 'image_pipeline', 'memory'), choices = ffedit.choices.image_pipelines)
 	group_output_creation.add_argument('--output-image-quality', help = wording.get('help.output_image_quality'), type = int, default = config.get_int_value('output_creation', 'output_image_quality', '80'), choices = ffedit.choices.output_image_quality_range, metavar = create_int_metavar(ffedit.choices.output_image_quality_range))
 	group_output_creation.add_argument('--output-audio-quality', help = wording.get('help.output_audio_quality'), type = int, default = config.get_int_value('output_creation', 'output_audio_quality', '80'), choices = ffedit.choices.output_audio_quality_range, metavar = create_int_metavar(ffedit.choices.output_audio_quality_range))
 	group_output_creation.add_argument('--output-audio-volume', help = wording.get('help.output_audio_volume'), type = int, default = config.get_int_value('output_creation', 'output_audio_volume', '100'), choices = ffedit.choices.output_audio_volume_range, metavar = create_int_metavar(ffedit.choices.output_audio_volume_range))
 	group_output_creation.add_argument('--output-video-preset', help = wording.get('help.output_video_preset'), default = config.get_str_value('output_creation', 'output_video_preset', 'veryfast'), choices = ffedit.choices.output_video_presets)
 	group_output_creation.add_argument('--output-video-quality', help = wording.get('help.output_video_quality'), type = int, default = config.get_int_value('output_creation', 'output_video_quality', '80'), choices = ffedit.choices.output_video_quality_range, metavar = create_int_metavar(ffedit.choices.output_video_quality_range))
-	job_store.register_step_keys([ 'output_image_quality', 'output_image_resolution', 'output_audio_encoder', 'output_audio_quality', 'output_audio_volume', 'output_video_encoder', 'output_video_preset', 'output_video_quality', 'output_video_resolution', 'output_video_fps' ])
+	job_store.register_step_keys([ 'image_pipeline', 'output_image_quality', 'output_image_resolution', 'output_audio_encoder', 'output_audio_quality', 'output_audio_volume', 'output_video_encoder', 'output_video_preset', 'output_video_quality', 'output_video_resolution', 'output_video_fps' ])
 	return program
 
 
@@ -220,8 +227,15 @@ def create_execution_program() -> ArgumentParser:
 	group_execution.add_argument('--execution-device-id', help = wording.get('help.execution_device_id'), default = config.get_str_value('execution', 'execution_device_id', '0'))
 	group_execution.add_argument('--execution-providers', help = wording.get('help.execution_providers').format(choices = ', '.join(available_execution_providers)), default = config.get_str_list('execution', 'execution_providers', get_first(available_execution_providers)), choices = available_execution_providers, nargs = '+', metavar = 'EXECUTION_PROVIDERS')
 	group_execution.add_argument('--execution-thread-count', help = wording.get('help.execution_thread_count'), type = int, default = config.get_int_value('execution', 'execution_thread_count', '4'), choices = ffedit.choices.execution_thread_count_range, metavar = create_int_metavar(ffedit.choices.execution_thread_count_range))
+	group_execution.add_argument('--execution-backend', help = wording.get('help.execution_backend'), default = config.get_str_value('execution', 'execution_backend', 'thread'), choices = ffedit.choices.execution_backends)
 	group_execution.add_argument('--execution-queue-count', help = wording.get('help.execution_queue_count'), type = int, default = config.get_int_value('execution', 'execution_queue_count', '1'), choices = ffedit.choices.execution_queue_count_range, metavar = create_int_metavar(ffedit.choices.execution_queue_count_range))
-	job_store.register_job_keys([ 'execution_device_id', 'execution_providers', 'execution_thread_count', 'execution_queue_count' ])
+	group_execution.add_argument('--execution-read-ahead-count', help = wording.get('help.execution_read_ahead_count'), type = int, default = config.get_int_value('execution', 'execution_read_ahead_count', '4'), choices = ffedit.choices.execution_read_ahead_count_range, metavar = create_int_metavar(ffedit.choices.execution_read_ahead_count_range))
+	group_execution.add_argument('--execution-write-behind-count', help = wording.get('help.execution_write_behind_count'), type = int, default = config.get_int_value('execution', 'execution_write_behind_count', '4'), choices = ffedit.choices.execution_write_behind_count_range, metavar = create_int_metavar(ffedit.choices.execution_write_behind_count_range))
+	group_execution.add_argument('--execution-batch-size', help = wording.get('help.execution_batch_size'), type = int, default = config.get_int_value('execution', 'execution_batch_size', '1'), choices = ffedit.choices.execution_batch_size_range, metavar = create_int_metavar(ffedit.choices.execution_batch_size_range))
+	group_execution.add_argument('--execution-batch-wait', help = wording.get('help.execution_batch_wait'), type = int, default = config.get_int_value('execution', 'execution_batch_wait', '5'), choices = ffedit.choices.execution_batch_wait_range, metavar = create_int_metavar(ffedit.choices.execution_batch_wait_range))
+	group_execution.add_argument('--execution-segment-count', help = wording.get('help.execution_segment_count'), type = int, default = config.get_int_value('execution', 'execution_segment_count', '1'), choices = ffedit.choices.execution_segment_count_range, metavar = create_int_metavar(ffedit.choices.execution_segment_count_range))
+	group_execution.add_argument('--execution-model-limits', help = wording.get('help.execution_model_limits'), default = config.get_str_list('execution', 'execution_model_limits'), nargs = '+', metavar = 'MODEL_NAME:LIMIT')
+	job_store.register_job_keys([ 'execution_device_id', 'execution_providers', 'execution_thread_count', 'execution_backend', 'execution_queue_count', 'execution_read_ahead_count', 'execution_write_behind_count', 'execution_batch_size', 'execution_batch_wait', 'execution_segment_count', 'execution_model_limits' ])
 	return program
 
 
@@ -230,7 +244,8 @@ def create_memory_program() -> ArgumentParser:
 	group_memory = program.add_argument_group('memory')
 	group_memory.add_argument('--video-memory-strategy', help = wording.get('help.video_memory_strategy'), default = config.get_str_value('memory', 'video_memory_strategy', 'strict'), choices = ffedit.choices.video_memory_strategies)
 	group_memory.add_argument('--system-memory-limit', help = wording.get('help.system_memory_limit'), type = int, default = config.get_int_value('memory', 'system_memory_limit', '0'), choices = ffedit.choices.system_memory_limit_range, metavar = create_int_metavar(ffedit.choices.system_memory_limit_range))
-	job_store.register_job_keys([ 'video_memory_strategy', 'system_memory_limit' ])
+	group_memory.add_argument('--temp-memory-limit', help = wording.get('help.temp_memory_limit'), type = int, default = config.get_int_value('memory', 'temp_memory_limit', '0'), choices = ffedit.choices.temp_memory_limit_range, metavar = create_int_metavar(ffedit.choices.temp_memory_limit_range))
+	job_store.register_job_keys([ 'video_memory_strategy', 'system_memory_limit', 'temp_memory_limit' ])
 	return program
 
 
@@ -269,6 +284,14 @@ def create_step_index_program() -> ArgumentParser:
 	return program
 
 
+def create_shard_program() -> ArgumentParser:
+	program = ArgumentParser(add_help = False)
+	group_sharding = program.add_argument_group('sharding')
+	group_sharding.add_argument('--shard', help = wording.get('help.shard'), metavar = 'SHARD_INDEX/SHARD_TOTAL')
+	job_store.register_step_keys([ 'shard' ])
+	return program
+
+
 def collect_step_program() -> ArgumentParser:
 	return ArgumentParser(parents = [ create_face_detector_program(), create_face_landmarker_program(), create_face_selector_program(), create_face_masker_program(), create_frame_extraction_program(), create_output_creation_program(), create_processors_program() ], add_help = False)
 
@@ -284,7 +307,7 @@ def create_program() -> ArgumentParser:
 	sub_program = program.add_subparsers(dest = 'command')
 	# general
 	sub_program.add_parser('run', help = wording.get('help.run'), parents = [ create_config_path_program(), create_temp_path_program(), create_jobs_path_program(), create_source_paths_program(), create_target_path_program(), create_output_path_program(), collect_step_program(), create_uis_program(), collect_job_program() ], formatter_class = create_help_formatter_large)
-	sub_program.add_parser('headless-run', help = wording.get('help.headless_run'), parents = [ create_config_path_program(), create_temp_path_program(), create_jobs_path_program(), create_source_paths_program(), create_target_path_program(), create_output_path_program(), collect_step_program(), collect_job_program() ], formatter_class = create_help_formatter_large)
+	sub_program.add_parser('headless-run', help = wording.get('help.headless_run'), parents = [ create_config_path_program(), create_temp_path_program(), create_jobs_path_program(), create_source_paths_program(), create_target_path_program(), create_output_path_program(), collect_step_program(), create_shard_program(), collect_job_program() ], formatter_class = create_help_formatter_large)
 	sub_program.add_parser('batch-run', help = wording.get('help.batch_run'), parents = [ create_config_path_program(), create_temp_path_program(), create_jobs_path_program(), create_source_pattern_program(), create_target_pattern_program(), create_output_pattern_program(), collect_step_program(), collect_job_program() ], formatter_class = create_help_formatter_large)
 	sub_program.add_parser('force-download', help = wording.get('help.force_download'), parents = [ create_download_providers_program(), create_download_scope_program(), create_log_level_program() ], formatter_class = create_help_formatter_large)
 	sub_program.add_parser('benchmark', help = wording.get('help.benchmark'), parents = [ create_temp_path_program(), collect_step_program(), create_benchmark_program(), collect_job_program() ], formatter_class = create_help_formatter_large)
@@ -304,6 +327,7 @@ def create_program() -> ArgumentParser:
 	sub_program.add_parser('job-run-all', help = wording.get('help.job_run_all'), parents = [ create_config_path_program(), create_temp_path_program(), create_jobs_path_program(), collect_job_program(), create_halt_on_error_program() ], formatter_class = create_help_formatter_large)
 	sub_program.add_parser('job-retry', help = wording.get('help.job_retry'), parents = [ create_job_id_program(), create_config_path_program(), create_temp_path_program(), create_jobs_path_program(), collect_job_program() ], formatter_class = create_help_formatter_large)
 	sub_program.add_parser('job-retry-all', help = wording.get('help.job_retry_all'), parents = [ create_config_path_program(), create_temp_path_program(), create_jobs_path_program(), collect_job_program(), create_halt_on_error_program() ], formatter_class = create_help_formatter_large)
+	sub_program.add_parser('job-merge-shards', help = wording.get('help.job_merge_shards'), parents = [ create_config_path_program(), create_temp_path_program(), create_source_paths_program(), create_target_path_program(), create_output_path_program(), create_output_creation_program(), create_log_level_program() ], formatter_class = create_help_formatter_large)
 	return ArgumentParser(parents = [ program ], formatter_class = create_help_formatter_small)
 
 
@@ -0,0 +1,118 @@
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed
+from typing import List, Optional, Tuple
+
+from tqdm import tqdm
+
+import ffedit.choices
+from ffedit import logger, process_manager, state_manager, wording
+from ffedit.face_analyser import propagate_faces
+from ffedit.face_store import set_static_faces
+from ffedit.face_tracker import select_track_faces, store_track_faces, track_faces
+from ffedit.frame_deduplicator import get_duplicate_frame_set
+from ffedit.frame_store import read_temp_frame
+from ffedit.types import Face, Histogram, UpdateProgress, VisionFrame
+from ffedit.vision import calc_histogram, compare_histograms
+
+
+def detect_scene_cuts(temp_frame_paths : List[str]) -> List[int]:
+	scene_cut_threshold = state_manager.get_item('scene_cut_threshold')
+	scene_cut_frame_numbers = []
+	previous_histogram = None
+
+	with ThreadPoolExecutor(max_workers = state_manager.get_item('execution_thread_count')) as executor:
+		frame_histograms = executor.map(read_frame_histogram, temp_frame_paths)
+
+		for frame_number, frame_histogram in enumerate(frame_histograms):
+			if previous_histogram is not None and frame_histogram is not None and compare_histograms(previous_histogram, frame_histogram) < scene_cut_threshold:
+				scene_cut_frame_numbers.append(frame_number)
+			if frame_histogram is not None:
+				previous_histogram = frame_histogram
+	return scene_cut_frame_numbers
+
+
+def read_frame_histogram(frame_path : str) -> Optional[Histogram]:
+	vision_frame = read_temp_frame(frame_path)
+
+	if vision_frame is not None:
+		return calc_histogram(vision_frame)
+	return None
+
+
+def create_analysis_ranges(frame_total : int, scene_cut_frame_numbers : List[int], face_detector_interval : int) -> List[Tuple[int, int]]:
+	analysis_ranges = []
+	scene_frame_numbers = [ 0 ] + [ frame_number for frame_number in scene_cut_frame_numbers if 0 < frame_number < frame_total ] + [ frame_total ]
+
+	for scene_start, scene_end in zip(scene_frame_numbers, scene_frame_numbers[1:]):
+		for analysis_start in range(scene_start, scene_end, face_detector_interval):
+			analysis_ranges.append((analysis_start, min(analysis_start + face_detector_interval, scene_end)))
+	return analysis_ranges
+
+
+def resolve_analysis_interval(frame_total : int) -> int:
+	face_detector_interval = state_manager.get_item('face_detector_interval')
+
+	if isinstance(face_detector_interval, int):
+		return min(face_detector_interval, frame_total)
+	if isinstance(state_manager.get_item('face_tracker_score'), float):
+		return min(ffedit.choices.face_tracker_interval, frame_total)
+	return frame_total
+
+
+def analyse_scene_faces(temp_frame_paths : List[str]) -> None:
+	if isinstance(state_manager.get_item('face_detector_interval'), int) or isinstance(state_manager.get_item('face_tracker_score'), float):
+		temp_frame_paths = sorted(temp_frame_paths)
+		scene_cut_frame_numbers = detect_scene_cuts(temp_frame_paths)
+		analysis_ranges = create_analysis_ranges(len(temp_frame_paths), scene_cut_frame_numbers, resolve_analysis_interval(len(temp_frame_paths)))
+
+		with tqdm(total = len(temp_frame_paths), desc = wording.get('analysing'), unit = 'frame', ascii = ' =', disable = state_manager.get_item('log_level') in [ 'warn', 'error' ]) as progress:
+			progress.set_postfix(scene_cuts = len(scene_cut_frame_numbers))
+			with ThreadPoolExecutor(max_workers = state_manager.get_item('execution_thread_count')) as executor:
+				futures : List[Future[None]] = []
+
+				for analysis_start, analysis_end in analysis_ranges:
+					future = executor.submit(analyse_range_faces, temp_frame_paths[analysis_start:analysis_end], progress.update)
+					futures.append(future)
+
+				for future in as_completed(futures):
+					future.result()
+	elif state_manager.get_item('face_detector_mode') == 'roi':
+		logger.warn(wording.get('face_detector_mode_roi_skipped'), __name__)
+
+
+def analyse_range_faces(temp_frame_paths : List[str], update_progress : UpdateProgress) -> None:
+	duplicate_frame_set = get_duplicate_frame_set()
+	previous_faces : Optional[List[Face]] = None
+
+	for temp_frame_path in temp_frame_paths:
+		if not process_manager.is_processing():
+			return
+		if temp_frame_path not in duplicate_frame_set:
+			vision_frame = read_temp_frame(temp_frame_path)
+
+			if vision_frame is not None:
+				previous_faces = analyse_frame_faces(vision_frame, previous_faces)
+		update_progress(1)
+
+
+def analyse_frame_faces(vision_frame : VisionFrame, previous_faces : Optional[List[Face]]) -> List[Face]:
+	face_tracker_score = state_manager.get_item('face_tracker_score')
+
+	if isinstance(face_tracker_score, float):
+		if previous_faces is not None:
+			faces = track_faces(vision_frame, previous_faces, face_tracker_score)
+
+			if faces is not None:
+				set_static_faces(vision_frame, faces)
+				store_track_faces(vision_frame, faces)
+				return faces
+		faces = propagate_faces(vision_frame, previous_faces or [])
+		faces = select_track_faces(faces, previous_faces or [])
+		store_track_faces(vision_frame, faces)
+		return faces
+	if previous_faces:
+		faces = track_faces(vision_frame, previous_faces, state_manager.get_item('face_landmarker_score'))
+
+		if faces is not None:
+			set_static_faces(vision_frame, faces)
+			return faces
+	return propagate_faces(vision_frame, previous_faces or [])
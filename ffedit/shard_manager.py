@@ -0,0 +1,68 @@
+import os
+from typing import List, Optional, Tuple
+
+from ffedit.filesystem import get_file_extension, get_file_name, get_file_size, resolve_file_pattern
+from ffedit.json import read_json, write_json
+from ffedit.types import ShardManifest
+from ffedit.vision import count_video_frame_total
+
+
+def parse_shard(shard : str) -> Optional[Tuple[int, int]]:
+	shard_index, _, shard_total = shard.partition('/')
+
+	if shard_index.isdigit() and shard_total.isdigit() and 0 < int(shard_index) <= int(shard_total):
+		return int(shard_index), int(shard_total)
+	return None
+
+
+def get_shard_video_path(output_path : str, shard_index : int, shard_total : int) -> str:
+	output_directory_path, output_file_name_and_extension = os.path.split(output_path)
+	output_file_name = get_file_name(output_file_name_and_extension)
+	output_file_extension = get_file_extension(output_file_name_and_extension)
+	return os.path.join(output_directory_path, output_file_name + '-shard-' + str(shard_index) + '-of-' + str(shard_total) + output_file_extension)
+
+
+def get_shard_manifest_path(shard_video_path : str) -> str:
+	shard_directory_path, shard_file_name_and_extension = os.path.split(shard_video_path)
+	return os.path.join(shard_directory_path, get_file_name(shard_file_name_and_extension) + '.json')
+
+
+def create_shard_manifest(shard_video_path : str, shard_manifest : ShardManifest) -> bool:
+	return write_json(get_shard_manifest_path(shard_video_path), shard_manifest) #type:ignore[arg-type]
+
+
+def resolve_shard_manifests(output_path : str) -> List[ShardManifest]:
+	output_directory_path, output_file_name_and_extension = os.path.split(output_path)
+	shard_manifest_pattern = os.path.join(output_directory_path, get_file_name(output_file_name_and_extension) + '-shard-*-of-*.json')
+	shard_manifests = [ read_shard_manifest(shard_manifest_path) for shard_manifest_path in resolve_file_pattern(shard_manifest_pattern) ]
+	return sorted([ shard_manifest for shard_manifest in shard_manifests if shard_manifest ], key = lambda shard_manifest : shard_manifest.get('shard_index'))
+
+
+def read_shard_manifest(shard_manifest_path : str) -> Optional[ShardManifest]:
+	return read_json(shard_manifest_path) #type:ignore[return-value]
+
+
+def resolve_shard_video_paths(output_path : str, shard_manifests : List[ShardManifest]) -> List[str]:
+	return [ get_shard_video_path(output_path, shard_manifest.get('shard_index'), shard_manifest.get('shard_total')) for shard_manifest in shard_manifests ]
+
+
+def validate_shard_manifests(target_path : str, output_path : str, shard_manifests : List[ShardManifest]) -> bool:
+	if shard_manifests:
+		first_shard_manifest = shard_manifests[0]
+		shard_indices = [ shard_manifest.get('shard_index') for shard_manifest in shard_manifests ]
+		shard_frame_numbers = [ first_shard_manifest.get('trim_frame_start') ] + [ shard_manifest.get('frame_end') for shard_manifest in shard_manifests ]
+
+		if shard_indices != list(range(1, first_shard_manifest.get('shard_total') + 1)):
+			return False
+		if shard_frame_numbers[-1] != first_shard_manifest.get('trim_frame_end'):
+			return False
+
+		for shard_manifest, shard_frame_start, shard_video_path in zip(shard_manifests, shard_frame_numbers, resolve_shard_video_paths(output_path, shard_manifests)):
+			if shard_manifest.get('frame_start') != shard_frame_start:
+				return False
+			if any(shard_manifest.get(key) != first_shard_manifest.get(key) for key in [ 'shard_hash', 'shard_total', 'target_size', 'trim_frame_start', 'trim_frame_end' ]):
+				return False
+			if shard_manifest.get('target_size') != get_file_size(target_path) or shard_manifest.get('frame_total') != count_video_frame_total(shard_video_path):
+				return False
+		return True
+	return False
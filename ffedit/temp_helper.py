@@ -1,8 +1,19 @@
 import os
-from typing import List
+import shutil
+from typing import Dict, List, Optional
 
 from ffedit import state_manager
-from ffedit.filesystem import create_directory, get_file_extension, get_file_name, move_file, remove_directory, resolve_file_pattern
+from ffedit.common_helper import is_linux
+from ffedit.filesystem import create_directory, get_file_extension, get_file_name, is_directory, is_file, move_file, remove_directory, resolve_file_pattern
+from ffedit.hash_helper import create_hash
+from ffedit.json import read_json, write_json
+from ffedit.types import Resolution
+
+if is_linux():
+	import fcntl
+
+TEMP_MEMORY_PATH : str = '/dev/shm'
+TEMP_DIRECTORY_PATHS : Dict[str, str] = {}
 
 
 def get_temp_file_path(file_path : str) -> str:
@@ -27,17 +38,171 @@ def get_temp_frames_pattern(target_path : str, temp_frame_prefix : str) -> str:
 
 
 def get_temp_directory_path(file_path : str) -> str:
+	temp_disk_directory_path = get_temp_disk_directory_path(file_path)
+
+	if temp_disk_directory_path not in TEMP_DIRECTORY_PATHS:
+		TEMP_DIRECTORY_PATHS[temp_disk_directory_path] = resolve_temp_directory_path(file_path)
+	return TEMP_DIRECTORY_PATHS.get(temp_disk_directory_path)
+
+
+def resolve_temp_directory_path(file_path : str) -> str:
+	temp_memory_directory_path = get_temp_memory_directory_path(file_path)
+
+	if temp_memory_directory_path and is_directory(temp_memory_directory_path):
+		return temp_memory_directory_path
+	return get_temp_disk_directory_path(file_path)
+
+
+def get_temp_disk_directory_path(file_path : str) -> str:
 	temp_file_name = get_file_name(file_path)
 	return os.path.join(state_manager.get_item('temp_path'), 'ffedit', temp_file_name)
 
 
-def create_temp_directory(file_path : str) -> bool:
-	temp_directory_path = get_temp_directory_path(file_path)
-	return create_directory(temp_directory_path)
+def get_temp_memory_directory_path(file_path : str) -> Optional[str]:
+	if state_manager.get_item('temp_memory_limit') and is_directory(TEMP_MEMORY_PATH):
+		temp_file_name = get_file_name(file_path)
+		temp_directory_hash = create_hash(get_temp_disk_directory_path(file_path).encode())
+		return os.path.join(TEMP_MEMORY_PATH, 'ffedit', temp_file_name + '-' + temp_directory_hash)
+	return None
+
+
+def create_temp_directory(file_path : str, temp_directory_size : int = 0) -> bool:
+	temp_memory_directory_path = get_temp_memory_directory_path(file_path)
+	TEMP_DIRECTORY_PATHS.pop(get_temp_disk_directory_path(file_path), None)
+
+	if create_directory(get_temp_disk_directory_path(file_path)):
+		if temp_memory_directory_path and temp_directory_size > 0:
+			reserve_temp_memory(temp_memory_directory_path, temp_directory_size)
+		return True
+	return False
 
 
 def clear_temp_directory(file_path : str) -> bool:
+	TEMP_DIRECTORY_PATHS.pop(get_temp_disk_directory_path(file_path), None)
+
 	if not state_manager.get_item('keep_temp'):
-		temp_directory_path = get_temp_directory_path(file_path)
+		temp_memory_directory_path = get_temp_memory_directory_path(file_path)
+
+		if temp_memory_directory_path and is_directory(temp_memory_directory_path):
+			remove_directory(temp_memory_directory_path)
+			release_temp_memory(temp_memory_directory_path)
+		temp_directory_path = get_temp_disk_directory_path(file_path)
 		return remove_directory(temp_directory_path)
 	return True
+
+
+def estimate_temp_frames_size(temp_video_resolution : Resolution, temp_frame_total : int, temp_frame_scale : int) -> int:
+	temp_video_width, temp_video_height = temp_video_resolution
+	return temp_video_width * temp_frame_scale * temp_video_height * temp_frame_scale * 3 * temp_frame_total
+
+
+def reserve_temp_memory(temp_memory_directory_path : str, temp_directory_size : int) -> bool:
+	if create_directory(os.path.dirname(temp_memory_directory_path)):
+		with open(get_temp_memory_lock_path(), 'w') as temp_memory_lock_file:
+			fcntl.flock(temp_memory_lock_file, fcntl.LOCK_EX)
+			temp_memory_reservations = get_temp_memory_reservations()
+			temp_memory_reservations.pop(temp_memory_directory_path, None)
+			temp_memory_size = min(temp_directory_size, calc_temp_memory_available(temp_memory_reservations, 0))
+
+			if state_manager.get_item('temp_frame_format') == 'raw' and temp_memory_size < temp_directory_size:
+				return False
+			if temp_memory_size > 0 and create_directory(temp_memory_directory_path):
+				temp_memory_reservations[temp_memory_directory_path] = temp_memory_size
+				return write_json(get_temp_memory_ledger_path(), temp_memory_reservations)
+	return False
+
+
+def spill_temp_frames(file_path : str, temp_frame_total : int, temp_frame_size : int) -> bool:
+	temp_memory_directory_path = get_temp_memory_directory_path(file_path)
+	temp_memory_size = get_temp_memory_reservations().get(temp_memory_directory_path)
+
+	if temp_memory_size and temp_frame_size > 0 and get_temp_directory_path(file_path) == temp_memory_directory_path:
+		temp_frames_pattern = get_temp_frames_pattern(file_path, '%08d')
+		temp_memory_frame_total = temp_memory_size // temp_frame_size
+
+		for frame_number in range(temp_memory_frame_total + 1, temp_frame_total + 1):
+			temp_frame_path = temp_frames_pattern % frame_number
+
+			if not os.path.lexists(temp_frame_path):
+				os.symlink(get_temp_disk_file_path(file_path, temp_frame_path), temp_frame_path)
+		return True
+	return False
+
+
+def balance_temp_memory(file_path : str) -> bool:
+	temp_memory_directory_path = get_temp_memory_directory_path(file_path)
+
+	if temp_memory_directory_path and is_directory(temp_memory_directory_path):
+		with open(get_temp_memory_lock_path(), 'w') as temp_memory_lock_file:
+			fcntl.flock(temp_memory_lock_file, fcntl.LOCK_EX)
+			temp_memory_reservations = get_temp_memory_reservations()
+			temp_memory_size = temp_memory_reservations.pop(temp_memory_directory_path, 0)
+			temp_memory_used = calc_temp_memory_used(temp_memory_directory_path)
+			temp_memory_available = calc_temp_memory_available(temp_memory_reservations, temp_memory_used)
+			prune_temp_frames(file_path)
+
+			if state_manager.get_item('temp_frame_format') != 'raw':
+				for temp_frame_path in reversed(resolve_temp_frame_paths(file_path)):
+					if temp_memory_used <= temp_memory_available:
+						break
+					if not os.path.islink(temp_frame_path):
+						temp_frame_size = os.path.getsize(temp_frame_path)
+						temp_disk_file_path = get_temp_disk_file_path(file_path, temp_frame_path)
+
+						if move_file(temp_frame_path, temp_disk_file_path):
+							os.symlink(temp_disk_file_path, temp_frame_path)
+							temp_memory_used -= temp_frame_size
+
+			temp_memory_reservations[temp_memory_directory_path] = max(temp_memory_size, temp_memory_used)
+			return write_json(get_temp_memory_ledger_path(), temp_memory_reservations)
+	return False
+
+
+def prune_temp_frames(file_path : str) -> None:
+	for temp_frame_path in resolve_temp_frame_paths(file_path):
+		if os.path.islink(temp_frame_path) and not os.path.exists(temp_frame_path):
+			os.remove(temp_frame_path)
+
+
+def calc_temp_memory_available(temp_memory_reservations : Dict[str, int], temp_memory_used : int) -> int:
+	temp_memory_limit = state_manager.get_item('temp_memory_limit') * (1024 ** 3)
+	return min(temp_memory_limit - sum(temp_memory_reservations.values()), temp_memory_used + shutil.disk_usage(TEMP_MEMORY_PATH).free)
+
+
+def calc_temp_memory_used(temp_memory_directory_path : str) -> int:
+	temp_memory_used = 0
+
+	for directory_path, _, file_names in os.walk(temp_memory_directory_path):
+		for file_name in file_names:
+			file_path = os.path.join(directory_path, file_name)
+
+			if not os.path.islink(file_path):
+				temp_memory_used += os.path.getsize(file_path)
+	return temp_memory_used
+
+
+def get_temp_disk_file_path(file_path : str, temp_file_path : str) -> str:
+	return os.path.join(get_temp_disk_directory_path(file_path), os.path.basename(temp_file_path))
+
+
+def release_temp_memory(temp_memory_directory_path : str) -> bool:
+	if is_file(get_temp_memory_ledger_path()):
+		with open(get_temp_memory_lock_path(), 'w') as temp_memory_lock_file:
+			fcntl.flock(temp_memory_lock_file, fcntl.LOCK_EX)
+			temp_memory_reservations = get_temp_memory_reservations()
+			temp_memory_reservations.pop(temp_memory_directory_path, None)
+			return write_json(get_temp_memory_ledger_path(), temp_memory_reservations)
+	return False
+
+
+def get_temp_memory_reservations() -> Dict[str, int]:
+	temp_memory_reservations = read_json(get_temp_memory_ledger_path()) or {}
+	return { temp_memory_directory_path: temp_directory_size for temp_memory_directory_path, temp_directory_size in temp_memory_reservations.items() if is_directory(temp_memory_directory_path) }
+
+
+def get_temp_memory_ledger_path() -> str:
+	return os.path.join(TEMP_MEMORY_PATH, 'ffedit', 'reservations.json')
+
+
+def get_temp_memory_lock_path() -> str:
+	return os.path.join(TEMP_MEMORY_PATH, 'ffedit', 'reservations.lock')
@@ -1,11 +1,14 @@
 import threading
 from contextlib import nullcontext
-from typing import ContextManager, Union
+from typing import ContextManager, Dict, Optional, Tuple, Union
 
+from ffedit import state_manager
 from ffedit.execution import has_execution_provider
 
 THREAD_LOCK : threading.Lock = threading.Lock()
 THREAD_SEMAPHORE : threading.Semaphore = threading.Semaphore()
+THREAD_SEMAPHORE_LOCK : threading.Lock = threading.Lock()
+THREAD_SEMAPHORE_SET : Dict[Tuple[str, int], threading.Semaphore] = {}
 NULL_CONTEXT : ContextManager[None] = nullcontext()
 
 
@@ -13,11 +16,35 @@ def thread_lock() -> threading.Lock:
 	return THREAD_LOCK
 
 
-def thread_semaphore() -> threading.Semaphore:
-	return THREAD_SEMAPHORE
-
-
-def conditional_thread_semaphore() -> Union[threading.Semaphore, ContextManager[None]]:
+def conditional_thread_semaphore(model_name : str) -> Union[threading.Semaphore, ContextManager[None]]:
 	if has_execution_provider('directml') or has_execution_provider('rocm'):
 		return THREAD_SEMAPHORE
+	model_limit = resolve_model_limit(model_name)
+
+	if model_limit > 0:
+		return get_model_semaphore(model_name, model_limit)
 	return NULL_CONTEXT
+
+
+def get_model_semaphore(model_name : str, model_limit : int) -> threading.Semaphore:
+	with THREAD_SEMAPHORE_LOCK:
+		if (model_name, model_limit) not in THREAD_SEMAPHORE_SET:
+			THREAD_SEMAPHORE_SET[(model_name, model_limit)] = threading.Semaphore(model_limit)
+		return THREAD_SEMAPHORE_SET.get((model_name, model_limit))
+
+
+def resolve_model_limit(model_name : str) -> int:
+	for execution_model_limit in state_manager.get_item('execution_model_limits') or []:
+		model_limit = parse_model_limit(execution_model_limit)
+
+		if model_limit and model_limit[0] == model_name:
+			return model_limit[1]
+	return 0
+
+
+def parse_model_limit(execution_model_limit : str) -> Optional[Tuple[str, int]]:
+	model_name, _, model_limit = execution_model_limit.partition(':')
+
+	if model_name and model_limit.isdigit() and int(model_limit) > 0:
+		return model_name, int(model_limit)
+	return None
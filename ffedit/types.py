@@ -1,5 +1,5 @@
 from collections import namedtuple
-from typing import Any, Callable, Dict, List, Literal, Optional, Tuple, TypeAlias, TypedDict
+from typing import Any, Callable, Dict, Iterator, List, Literal, Optional, Tuple, TypeAlias, TypedDict
 
 import cv2
 import numpy
@@ -48,17 +48,21 @@ FaceSet : TypeAlias = Dict[str, List[Face]]
 FaceStore = TypedDict('FaceStore',
 {
 	'static_faces' : FaceSet,
+	'matched_faces' : FaceSet,
 	'reference_faces' : FaceSet
 })
 VideoPoolSet : TypeAlias = Dict[str, cv2.VideoCapture]
 
 VisionFrame : TypeAlias = NDArray[Any]
+FrameStore : TypeAlias = numpy.memmap[Any, numpy.dtype[numpy.uint8]]
 Mask : TypeAlias = NDArray[Any]
 Points : TypeAlias = NDArray[Any]
 Distance : TypeAlias = NDArray[Any]
 Matrix : TypeAlias = NDArray[Any]
 Anchors : TypeAlias = NDArray[Any]
 Translation : TypeAlias = NDArray[Any]
+Fingerprint : TypeAlias = NDArray[Any]
+Histogram : TypeAlias = NDArray[Any]
 
 AudioBuffer : TypeAlias = bytes
 Audio : TypeAlias = NDArray[Any]
@@ -75,14 +79,22 @@ Orientation = Literal['landscape', 'portrait']
 Resolution : TypeAlias = Tuple[int, int]
 
 ProcessState = Literal['checking', 'processing', 'stopping', 'pending']
+ExecutionBackend = Literal['thread', 'process']
 QueuePayload = TypedDict('QueuePayload',
 {
 	'frame_number' : int,
 	'frame_path' : str
 })
+BatchTask = TypedDict('BatchTask',
+{
+	'source_paths' : List[str],
+	'target_path' : str,
+	'output_path' : str
+})
 Args : TypeAlias = Dict[str, Any]
 UpdateProgress : TypeAlias = Callable[[int], None]
 ProcessFrames : TypeAlias = Callable[[List[str], List[QueuePayload], UpdateProgress], None]
+ProcessVisionFrames : TypeAlias = Callable[[Iterator[VisionFrame]], Iterator[VisionFrame]]
 ProcessStep : TypeAlias = Callable[[str, int, Args], bool]
 
 Content : TypeAlias = Dict[str, Any]
@@ -101,6 +113,7 @@ TableHeaders = List[str]
 TableContents = List[List[Any]]
 
 FaceDetectorModel = Literal['many', 'retinaface', 'scrfd', 'yolo_face']
+FaceDetectorMode = Literal['full', 'roi']
 FaceLandmarkerModel = Literal['many', '2dfan4', 'peppa_wutz']
 FaceDetectorSet : TypeAlias = Dict[FaceDetectorModel, List[str]]
 FaceSelectorMode = Literal['many', 'one', 'reference']
@@ -116,7 +129,9 @@ FaceMaskAreaSet : TypeAlias = Dict[FaceMaskArea, List[int]]
 AudioFormat = Literal['flac', 'm4a', 'mp3', 'ogg', 'opus', 'wav']
 ImageFormat = Literal['bmp', 'jpeg', 'png', 'tiff', 'webp']
 VideoFormat = Literal['avi', 'm4v', 'mkv', 'mov', 'mp4', 'webm']
-TempFrameFormat = Literal['bmp', 'jpeg', 'png', 'tiff']
+TempFrameFormat = Literal['bmp', 'jpeg', 'png', 'tiff', 'raw']
+VideoPipeline = Literal['sequential', 'fused', 'streaming']
+ImagePipeline = Literal['memory', 'ffmpeg']
 AudioTypeSet : TypeAlias = Dict[AudioFormat, str]
 ImageTypeSet : TypeAlias = Dict[ImageFormat, str]
 VideoTypeSet : TypeAlias = Dict[VideoFormat, str]
@@ -136,6 +151,7 @@ BenchmarkCycleSet = TypedDict('BenchmarkCycleSet',
 {
 	'target_path' : str,
 	'cycle_count' : int,
+	'execution_backend' : ExecutionBackend,
 	'average_run' : float,
 	'fastest_run' : float,
 	'slowest_run' : float,
@@ -213,6 +229,16 @@ AppContext = Literal['cli', 'ui']
 
 InferencePool : TypeAlias = Dict[str, InferenceSession]
 InferencePoolSet : TypeAlias = Dict[AppContext, Dict[str, InferencePool]]
+InferenceInputFeed : TypeAlias = Dict[str, Any]
+InferenceOutputs : TypeAlias = List[Any]
+InferenceRequest = TypedDict('InferenceRequest',
+{
+	'batch_key' : str,
+	'output_names' : Optional[List[str]],
+	'input_feed' : InferenceInputFeed,
+	'outputs' : Optional[InferenceOutputs],
+	'error' : Optional[Exception]
+})
 
 UiWorkflow = Literal['instant_runner', 'job_runner', 'job_manager']
 
@@ -238,6 +264,29 @@ Job = TypedDict('Job',
 })
 JobSet : TypeAlias = Dict[str, Job]
 
+DuplicateFrameSet : TypeAlias = Dict[str, str]
+
+FrameRange : TypeAlias = List[int]
+Checkpoint = TypedDict('Checkpoint',
+{
+	'checkpoint_hash' : str,
+	'frames_extracted' : bool,
+	'frames_processed' : Dict[str, List[FrameRange]]
+})
+
+ShardManifest = TypedDict('ShardManifest',
+{
+	'shard_hash' : str,
+	'shard_index' : int,
+	'shard_total' : int,
+	'target_size' : int,
+	'trim_frame_start' : int,
+	'trim_frame_end' : int,
+	'frame_start' : int,
+	'frame_end' : int,
+	'frame_total' : int
+})
+
 StateKey = Literal\
 [
 	'command',
@@ -258,6 +307,10 @@ StateKey = Literal\
 	'face_detector_size',
 	'face_detector_angles',
 	'face_detector_score',
+	'face_detector_mode',
+	'face_detector_interval',
+	'scene_cut_threshold',
+	'face_tracker_score',
 	'face_landmarker_model',
 	'face_landmarker_score',
 	'face_selector_mode',
@@ -279,7 +332,11 @@ StateKey = Literal\
 	'trim_frame_start',
 	'trim_frame_end',
 	'temp_frame_format',
+	'video_pipeline',
+	'frame_duplicate_threshold',
+	'shard',
 	'keep_temp',
+	'image_pipeline',
 	'output_image_quality',
 	'output_image_resolution',
 	'output_audio_encoder',
@@ -297,9 +354,17 @@ StateKey = Literal\
 	'execution_device_id',
 	'execution_providers',
 	'execution_thread_count',
+	'execution_backend',
 	'execution_queue_count',
+	'execution_read_ahead_count',
+	'execution_write_behind_count',
+	'execution_batch_size',
+	'execution_batch_wait',
+	'execution_segment_count',
+	'execution_model_limits',
 	'video_memory_strategy',
 	'system_memory_limit',
+	'temp_memory_limit',
 	'log_level',
 	'halt_on_error',
 	'job_id',
@@ -326,6 +391,10 @@ State = TypedDict('State',
 	'face_detector_size' : str,
 	'face_detector_angles' : List[Angle],
 	'face_detector_score' : Score,
+	'face_detector_mode' : FaceDetectorMode,
+	'face_detector_interval' : int,
+	'scene_cut_threshold' : float,
+	'face_tracker_score' : Score,
 	'face_landmarker_model' : FaceLandmarkerModel,
 	'face_landmarker_score' : Score,
 	'face_selector_mode' : FaceSelectorMode,
@@ -347,7 +416,11 @@ State = TypedDict('State',
 	'trim_frame_start' : int,
 	'trim_frame_end' : int,
 	'temp_frame_format' : TempFrameFormat,
+	'video_pipeline' : VideoPipeline,
+	'frame_duplicate_threshold' : int,
+	'shard' : Optional[str],
 	'keep_temp' : bool,
+	'image_pipeline' : ImagePipeline,
 	'output_image_quality' : int,
 	'output_image_resolution' : str,
 	'output_audio_encoder' : AudioEncoder,
@@ -365,9 +438,17 @@ State = TypedDict('State',
 	'execution_device_id' : str,
 	'execution_providers' : List[ExecutionProvider],
 	'execution_thread_count' : int,
+	'execution_backend' : ExecutionBackend,
 	'execution_queue_count' : int,
+	'execution_read_ahead_count' : int,
+	'execution_write_behind_count' : int,
+	'execution_batch_size' : int,
+	'execution_batch_wait' : int,
+	'execution_segment_count' : int,
+	'execution_model_limits' : List[str],
 	'video_memory_strategy' : VideoMemoryStrategy,
 	'system_memory_limit' : int,
+	'temp_memory_limit' : int,
 	'log_level' : LogLevel,
 	'halt_on_error' : bool,
 	'job_id' : str,
@@ -19,6 +19,7 @@ def render() -> None:
 		[
 			'target_path',
 			'cycle_count',
+			'execution_backend',
 			'average_run',
 			'fastest_run',
 			'slowest_run',
@@ -28,6 +29,7 @@ def render() -> None:
 		[
 			'str',
 			'number',
+			'str',
 			'number',
 			'number',
 			'number',
@@ -55,6 +57,7 @@ def start(benchmark_resolutions : List[BenchmarkResolution], benchmark_cycle_cou
 	state_manager.set_item('benchmark_cycle_count', benchmark_cycle_count)
 	state_manager.sync_item('execution_providers')
 	state_manager.sync_item('execution_thread_count')
+	state_manager.sync_item('execution_backend')
 	state_manager.sync_item('execution_queue_count')
 
 	for benchmark in benchmarker.run():
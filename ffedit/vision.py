@@ -1,6 +1,6 @@
 import math
 from functools import lru_cache
-from typing import List, Optional, Tuple
+from typing import List, Optional, Sequence, Tuple
 
 import cv2
 import numpy
@@ -8,9 +8,9 @@ from cv2.typing import Size
 
 import ffedit.choices
 from ffedit.common_helper import is_windows
-from ffedit.filesystem import get_file_extension, is_image, is_video
-from ffedit.thread_helper import thread_semaphore
-from ffedit.types import Duration, Fps, Orientation, Resolution, VisionFrame
+from ffedit.filesystem import get_file_extension, get_file_format, is_image, is_video
+from ffedit.thread_helper import thread_lock
+from ffedit.types import Duration, Fingerprint, Fps, Histogram, Orientation, Resolution, VisionFrame
 from ffedit.video_manager import get_video_capture
 
 
@@ -37,17 +37,31 @@ def read_image(image_path : str) -> Optional[VisionFrame]:
 	return None
 
 
-def write_image(image_path : str, vision_frame : VisionFrame) -> bool:
+def write_image(image_path : str, vision_frame : VisionFrame, image_options : Sequence[int] = ()) -> bool:
 	if image_path:
 		if is_windows():
 			image_file_extension = get_file_extension(image_path)
-			_, vision_frame = cv2.imencode(image_file_extension, vision_frame)
+			_, vision_frame = cv2.imencode(image_file_extension, vision_frame, image_options)
 			vision_frame.tofile(image_path)
 			return is_image(image_path)
-		return cv2.imwrite(image_path, vision_frame)
+		return cv2.imwrite(image_path, vision_frame, image_options)
 	return False
 
 
+def create_image_options(image_path : str, image_quality : int) -> List[int]:
+	if get_file_format(image_path) == 'jpeg':
+		return [ cv2.IMWRITE_JPEG_QUALITY, image_quality ]
+	if get_file_format(image_path) == 'png':
+		return [ cv2.IMWRITE_PNG_COMPRESSION, round(9 - (image_quality * 0.09)) ]
+	if get_file_format(image_path) == 'webp':
+		return [ cv2.IMWRITE_WEBP_QUALITY, max(image_quality, 1) ]
+	return []
+
+
+def has_image_writer(image_path : str) -> bool:
+	return cv2.haveImageWriter(image_path)
+
+
 def detect_image_resolution(image_path : str) -> Optional[Resolution]:
 	if is_image(image_path):
 		image = read_image(image_path)
@@ -88,7 +102,7 @@ def read_video_frame(video_path : str, frame_number : int = 0) -> Optional[Visio
 		if video_capture.isOpened():
 			frame_total = video_capture.get(cv2.CAP_PROP_FRAME_COUNT)
 
-			with thread_semaphore():
+			with thread_lock():
 				video_capture.set(cv2.CAP_PROP_POS_FRAMES, min(frame_total, frame_number - 1))
 				has_vision_frame, vision_frame = video_capture.read()
 
@@ -103,7 +117,7 @@ def count_video_frame_total(video_path : str) -> int:
 		video_capture = get_video_capture(video_path)
 
 		if video_capture.isOpened():
-			with thread_semaphore():
+			with thread_lock():
 				video_frame_total = int(video_capture.get(cv2.CAP_PROP_FRAME_COUNT))
 				return video_frame_total
 
@@ -123,7 +137,7 @@ def detect_video_fps(video_path : str) -> Optional[float]:
 		video_capture = get_video_capture(video_path)
 
 		if video_capture.isOpened():
-			with thread_semaphore():
+			with thread_lock():
 				video_fps = video_capture.get(cv2.CAP_PROP_FPS)
 				return video_fps
 
@@ -153,6 +167,22 @@ def count_trim_frame_total(video_path : str, trim_frame_start : Optional[int], t
 	return trim_frame_end - trim_frame_start
 
 
+def create_video_segments(trim_frame_start : int, trim_frame_end : int, key_frame_numbers : List[int], segment_total : int) -> List[Tuple[int, int]]:
+	segment_size = (trim_frame_end - trim_frame_start) / max(segment_total, 1)
+	segment_bounds = [ trim_frame_start ]
+
+	for segment_index in range(1, segment_total):
+		segment_bound = trim_frame_start + round(segment_size * segment_index)
+		nearby_key_frame_numbers = [ key_frame_number for key_frame_number in key_frame_numbers if abs(key_frame_number - segment_bound) <= segment_size / 2 ]
+
+		if nearby_key_frame_numbers:
+			segment_bound = min(nearby_key_frame_numbers, key = lambda key_frame_number : abs(key_frame_number - segment_bound))
+		if segment_bounds[-1] < segment_bound < trim_frame_end:
+			segment_bounds.append(segment_bound)
+	segment_bounds.append(trim_frame_end)
+	return list(zip(segment_bounds[:-1], segment_bounds[1:]))
+
+
 def restrict_trim_frame(video_path : str, trim_frame_start : Optional[int], trim_frame_end : Optional[int]) -> Tuple[int, int]:
 	video_frame_total = count_video_frame_total(video_path)
 
@@ -176,7 +206,7 @@ def detect_video_resolution(video_path : str) -> Optional[Resolution]:
 		video_capture = get_video_capture(video_path)
 
 		if video_capture.isOpened():
-			with thread_semaphore():
+			with thread_lock():
 				width = video_capture.get(cv2.CAP_PROP_FRAME_WIDTH)
 				height = video_capture.get(cv2.CAP_PROP_FRAME_HEIGHT)
 				return int(width), int(height)
@@ -230,6 +260,16 @@ def unpack_resolution(resolution : str) -> Resolution:
 	return width, height
 
 
+def resize_frame(vision_frame : VisionFrame, resolution : Resolution) -> VisionFrame:
+	height, width = vision_frame.shape[:2]
+
+	if (width, height) != resolution:
+		if resolution[0] < width:
+			return cv2.resize(vision_frame, resolution, interpolation = cv2.INTER_AREA)
+		return cv2.resize(vision_frame, resolution, interpolation = cv2.INTER_CUBIC)
+	return vision_frame
+
+
 def detect_frame_orientation(vision_frame : VisionFrame) -> Orientation:
 	height, width = vision_frame.shape[:2]
 
@@ -292,40 +332,59 @@ def equalize_frame_color(source_vision_frame : VisionFrame, target_vision_frame
 
 
 def calc_histogram_difference(source_vision_frame : VisionFrame, target_vision_frame : VisionFrame) -> float:
-	histogram_source = cv2.calcHist([cv2.cvtColor(source_vision_frame, cv2.COLOR_BGR2HSV)], [ 0, 1 ], None, [ 50, 60 ], [ 0, 180, 0, 256 ])
-	histogram_target = cv2.calcHist([cv2.cvtColor(target_vision_frame, cv2.COLOR_BGR2HSV)], [ 0, 1 ], None, [ 50, 60 ], [ 0, 180, 0, 256 ])
-	histogram_difference = float(numpy.interp(cv2.compareHist(histogram_source, histogram_target, cv2.HISTCMP_CORREL), [ -1, 1 ], [ 0, 1 ]))
+	histogram_source = calc_histogram(source_vision_frame)
+	histogram_target = calc_histogram(target_vision_frame)
+	return compare_histograms(histogram_source, histogram_target)
+
+
+def calc_histogram(vision_frame : VisionFrame) -> Histogram:
+	histogram = cv2.calcHist([cv2.cvtColor(vision_frame, cv2.COLOR_BGR2HSV)], [ 0, 1 ], None, [ 50, 60 ], [ 0, 180, 0, 256 ])
+	return histogram
+
+
+def compare_histograms(source_histogram : Histogram, target_histogram : Histogram) -> float:
+	histogram_difference = float(numpy.interp(cv2.compareHist(source_histogram, target_histogram, cv2.HISTCMP_CORREL), [ -1, 1 ], [ 0, 1 ]))
 	return histogram_difference
 
 
+def create_frame_fingerprint(vision_frame : VisionFrame) -> Fingerprint:
+	gray_vision_frame = cv2.cvtColor(vision_frame, cv2.COLOR_BGR2GRAY)
+	frame_fingerprint = cv2.resize(gray_vision_frame, (64, 64), interpolation = cv2.INTER_AREA)
+	return frame_fingerprint
+
+
+def calc_fingerprint_distance(source_fingerprint : Fingerprint, target_fingerprint : Fingerprint) -> int:
+	fingerprint_distance = int(numpy.max(cv2.absdiff(source_fingerprint, target_fingerprint)))
+	return fingerprint_distance
+
+
 def blend_vision_frames(source_vision_frame : VisionFrame, target_vision_frame : VisionFrame, blend_factor : float) -> VisionFrame:
 	blend_vision_frame = cv2.addWeighted(source_vision_frame, 1 - blend_factor, target_vision_frame, blend_factor, 0)
 	return blend_vision_frame
 
 
 def create_tile_frames(vision_frame : VisionFrame, size : Size) -> Tuple[List[VisionFrame], int, int]:
-	vision_frame = numpy.pad(vision_frame, ((size[1], size[1]), (size[1], size[1]), (0, 0)))
-	tile_width = size[0] - 2 * size[2]
-	pad_size_bottom = size[2] + tile_width - vision_frame.shape[0] % tile_width
-	pad_size_right = size[2] + tile_width - vision_frame.shape[1] % tile_width
-	pad_vision_frame = numpy.pad(vision_frame, ((size[2], pad_size_bottom), (size[2], pad_size_right), (0, 0)))
-	pad_height, pad_width = pad_vision_frame.shape[:2]
-	row_range = range(size[2], pad_height - size[2], tile_width)
-	col_range = range(size[2], pad_width - size[2], tile_width)
-	tile_vision_frames = []
-
-	for row_vision_frame in row_range:
-		top = row_vision_frame - size[2]
-		bottom = row_vision_frame + size[2] + tile_width
-
-		for column_vision_frame in col_range:
-			left = column_vision_frame - size[2]
-			right = column_vision_frame + size[2] + tile_width
-			tile_vision_frames.append(pad_vision_frame[top:bottom, left:right, :])
-
+	tile_positions, pad_width, pad_height = create_static_tile_grid(vision_frame.shape[1], vision_frame.shape[0], tuple(size))
+	pad_size_bottom = pad_height - vision_frame.shape[0] - size[1] - size[2]
+	pad_size_right = pad_width - vision_frame.shape[1] - size[1] - size[2]
+	pad_vision_frame = numpy.pad(vision_frame, ((size[1] + size[2], pad_size_bottom), (size[1] + size[2], pad_size_right), (0, 0)))
+	tile_vision_frames = [ pad_vision_frame[top:top + size[0], left:left + size[0], :] for top, left in tile_positions ]
 	return tile_vision_frames, pad_width, pad_height
 
 
+@lru_cache(maxsize = None)
+def create_static_tile_grid(frame_width : int, frame_height : int, size : Tuple[int, ...]) -> Tuple[List[Tuple[int, int]], int, int]:
+	frame_width += 2 * size[1]
+	frame_height += 2 * size[1]
+	tile_width = size[0] - 2 * size[2]
+	pad_height = frame_height + 2 * size[2] + tile_width - frame_height % tile_width
+	pad_width = frame_width + 2 * size[2] + tile_width - frame_width % tile_width
+	row_range = range(0, pad_height - 2 * size[2], tile_width)
+	col_range = range(0, pad_width - 2 * size[2], tile_width)
+	tile_positions = [ (top, left) for top in row_range for left in col_range ]
+	return tile_positions, pad_width, pad_height
+
+
 def merge_tile_frames(tile_vision_frames : List[VisionFrame], temp_width : int, temp_height : int, pad_width : int, pad_height : int, size : Size) -> VisionFrame:
 	merge_vision_frame = numpy.zeros((pad_height, pad_width, 3)).astype(numpy.uint8)
 	tile_width = tile_vision_frames[0].shape[1] - 2 * size[2]
@@ -7,7 +7,7 @@ import scipy
 from ffedit import inference_manager
 from ffedit.download import conditional_download_hashes, conditional_download_sources, resolve_download_url
 from ffedit.filesystem import resolve_relative_path
-from ffedit.thread_helper import thread_semaphore
+from ffedit.thread_helper import conditional_thread_semaphore
 from ffedit.types import Audio, AudioChunk, DownloadScope, InferencePool, ModelOptions, ModelSet
 
 
@@ -88,7 +88,7 @@ def extract_voice(temp_audio_chunk : AudioChunk) -> AudioChunk:
 def forward(temp_audio_chunk : AudioChunk) -> AudioChunk:
 	voice_extractor = get_inference_pool().get('voice_extractor')
 
-	with thread_semaphore():
+	with conditional_thread_semaphore('kim_vocal_2'):
 		temp_audio_chunk = voice_extractor.run(None,
 		{
 			'input': temp_audio_chunk
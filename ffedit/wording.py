@@ -7,25 +7,53 @@ WORDING : Dict[str, Any] =\
 	'curl_not_installed': 'cURL is not installed',
 	'ffmpeg_not_installed': 'FFMpeg is not installed',
 	'creating_temp': 'Creating temporary resources',
+	'resuming_temp': 'Resuming from temporary resources',
 	'extracting_frames': 'Extracting frames with a resolution of {resolution} and {fps} frames per second',
 	'extracting_frames_succeed': 'Extracting frames succeed',
 	'extracting_frames_failed': 'Extracting frames failed',
+	'extracting_frames_skipped': 'Extracting frames skipped',
 	'analysing': 'Analysing',
+	'face_detector_mode_roi_skipped': 'Detecting faces on regions of interest skipped, set a face detector interval or a face tracker score',
 	'extracting': 'Extracting',
 	'streaming': 'Streaming',
 	'processing': 'Processing',
 	'merging': 'Merging',
 	'downloading': 'Downloading',
 	'temp_frames_not_found': 'Temporary frames not found',
+	'temp_frame_resolution_mismatch': 'Temporary frame resolution {resolution} does not match the frame store resolution {frame_store_resolution}',
 	'copying_image': 'Copying image with a resolution of {resolution}',
 	'copying_image_succeed': 'Copying image succeed',
 	'copying_image_failed': 'Copying image failed',
+	'processing_image_in_memory_skipped': 'Processing image in memory skipped',
+	'processing_batch_report': 'Processing {succeed_total} of {image_total} images succeed and {failed_total} failed in {seconds} seconds',
+	'batch_image_stopped': 'processing stopped',
+	'batch_image_invalid_output': 'invalid output path',
+	'batch_image_invalid_target': 'invalid target image',
+	'batch_image_content_rejected': 'content rejected',
+	'batch_image_write_failed': 'writing output failed',
 	'finalizing_image': 'Finalizing image with a resolution of {resolution}',
 	'finalizing_image_succeed': 'Finalizing image succeed',
 	'finalizing_image_skipped': 'Finalizing image skipped',
 	'merging_video': 'Merging video with a resolution of {resolution} and {fps} frames per second',
 	'merging_video_succeed': 'Merging video succeed',
 	'merging_video_failed': 'Merging video failed',
+	'encoding_frames_succeed': 'Encoding frames while processing succeed',
+	'processing_segments': 'Processing video in {segment_total} segments',
+	'processing_segments_succeed': 'Processing segments succeed',
+	'processing_segments_failed': 'Processing segments failed',
+	'processing_shard': 'Processing shard {shard_index} of {shard_total} from frame {frame_start} to {frame_end}',
+	'processing_shard_succeed': 'Processing shard succeed',
+	'processing_shard_failed': 'Processing shard failed',
+	'shard_invalid': 'Shard must be given as SHARD_INDEX/SHARD_TOTAL',
+	'execution_model_limit_invalid': 'Model limit {execution_model_limit} must be given as MODEL_NAME:LIMIT with a known model and a positive limit',
+	'shard_out_of_range': 'Shard {shard_index} exceeds the frame range',
+	'merging_shards': 'Merging {shard_total} shards',
+	'merging_shards_succeed': 'Merging shards succeed in {seconds} seconds',
+	'merging_shards_failed': 'Merging shards failed',
+	'validating_shards_failed': 'Validating shards failed',
+	'streaming_video': 'Streaming video with a resolution of {resolution} and {fps} frames per second',
+	'streaming_video_succeed': 'Streaming video succeed',
+	'streaming_video_failed': 'Streaming video failed',
 	'skipping_audio': 'Skipping audio',
 	'replacing_audio_succeed': 'Replacing audio succeed',
 	'replacing_audio_skipped': 'Replacing audio skipped',
@@ -33,6 +61,7 @@ WORDING : Dict[str, Any] =\
 	'restoring_audio_skipped': 'Restoring audio skipped',
 	'clearing_temp': 'Clearing temporary resources',
 	'processing_stopped': 'Processing stopped',
+	'reusing_duplicate_frames': 'Reusing {frame_total} duplicate frames ({frame_ratio}%)',
 	'processing_image_succeed': 'Processing to image succeed in {seconds} seconds',
 	'processing_image_failed': 'Processing to image failed',
 	'processing_video_succeed': 'Processing to video succeed in {seconds} seconds',
@@ -43,6 +72,7 @@ WORDING : Dict[str, Any] =\
 	'choose_image_or_video_target': 'Choose a image or video for the target',
 	'specify_image_or_video_output': 'Specify the output image or video within a directory',
 	'match_target_and_output_extension': 'Match the target and output extension',
+	'choose_image_temp_frame_format': 'Choose an image format for the temp frames',
 	'no_source_face_detected': 'No source face detected',
 	'processor_not_loaded': 'Processor {processor} could not be loaded',
 	'processor_not_implemented': 'Processor {processor} not implemented correctly',
@@ -112,6 +142,10 @@ WORDING : Dict[str, Any] =\
 		'face_detector_size': 'specify the frame size provided to the face detector',
 		'face_detector_angles': 'specify the angles to rotate the frame before detecting faces',
 		'face_detector_score': 'filter the detected faces base on the confidence score',
+		'face_detector_mode': 'choose whether to detect on the full frame or on a mosaic of padded crops around the faces of the previous frame while propagating (requires a face detector interval or a face tracker score)',
+		'face_detector_interval': 'fully analyse the faces at every scene cut and every n frames while only landmarking the previous faces in between (leave empty to analyse every frame)',
+		'scene_cut_threshold': 'specify the histogram similarity below which a frame starts a new scene',
+		'face_tracker_score': 'track the faces by their landmarks between the analysed frames and detect again at every face detector interval or once the landmark score drops below the threshold (leave empty to detect every frame)',
 		# face landmarker
 		'face_landmarker_model': 'choose the model responsible for detecting the face landmarks',
 		'face_landmarker_score': 'filter the detected face landmarks base on the confidence score',
@@ -137,8 +171,13 @@ WORDING : Dict[str, Any] =\
 		'trim_frame_start': 'specify the starting frame of the target video',
 		'trim_frame_end': 'specify the ending frame of the target video',
 		'temp_frame_format': 'specify the temporary resources format',
+		'video_pipeline': 'choose how frames pass through the processors (sequential runs one pass per processor, fused chains all processors in a single pass, streaming avoids temporary frames)',
+		'frame_duplicate_threshold': 'reuse the output of the previous distinct frame for frames that differ less than the threshold (leave empty to process every frame)',
 		'keep_temp': 'keep the temporary resources after processing',
+		# sharding
+		'shard': 'process only one slice of the trim range and emit it as a segment with a manifest (for example 3/16)',
 		# output creation
+		'image_pipeline': 'choose how images pass through the processors (memory decodes and encodes once while chaining all processors, ffmpeg copies and finalizes the image using temporary files)',
 		'output_image_quality': 'specify the image quality which translates to the image compression',
 		'output_image_resolution': 'specify the image resolution based on the target image',
 		'output_audio_encoder': 'specify the encoder used for the audio',
@@ -199,10 +238,18 @@ WORDING : Dict[str, Any] =\
 		'execution_device_id': 'specify the device used for processing',
 		'execution_providers': 'inference using different providers (choices: {choices}, ...)',
 		'execution_thread_count': 'specify the amount of parallel threads while processing',
-		'execution_queue_count': 'specify the amount of frames each thread is processing',
+		'execution_backend': 'choose whether the parallel threads run inside one process or as worker processes with their own inference sessions',
+		'execution_queue_count': 'specify the minimum amount of frames each thread picks from the queue at once',
+		'execution_read_ahead_count': 'specify the amount of temporary frames each thread decodes ahead of processing',
+		'execution_write_behind_count': 'specify the amount of processed frames each thread can hand over to be written in the background',
+		'execution_batch_size': 'specify the maximum amount of concurrent model calls that are merged into one batched inference run',
+		'execution_batch_wait': 'specify the milliseconds a model call waits for others to join its batch',
+		'execution_segment_count': 'specify the amount of video segments processed in parallel worker processes',
+		'execution_model_limits': 'limit the concurrent runs per model name as MODEL_NAME:LIMIT pairs (e.g. gfpgan_1.4:1 yolo_face:2)',
 		# memory
 		'video_memory_strategy': 'balance fast processing and low VRAM usage',
 		'system_memory_limit': 'limit the available RAM that can be used while processing',
+		'temp_memory_limit': 'keep the temporary resources of a job in shared memory up to this many gigabytes and spill larger jobs to the temp path',
 		# misc
 		'log_level': 'adjust the message severity displayed in the terminal',
 		'halt_on_error': 'halt the program once an error occurred',
@@ -231,7 +278,8 @@ WORDING : Dict[str, Any] =\
 		'job_run': 'run a queued job',
 		'job_run_all': 'run all queued jobs',
 		'job_retry': 'retry a failed job',
-		'job_retry_all': 'retry all failed jobs'
+		'job_retry_all': 'retry all failed jobs',
+		'job_merge_shards': 'merge the shards of an output into one video'
 	},
 	'about':
 	{
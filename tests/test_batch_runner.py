@@ -0,0 +1,96 @@
+from typing import List
+from unittest.mock import patch
+
+import numpy
+import pytest
+
+from ffedit import logger, process_manager, state_manager
+from ffedit.batch_runner import process_batch_image, resolve_output_image_resolution, run_batch_images
+from ffedit.filesystem import create_directory, is_file
+from ffedit.types import BatchTask
+from ffedit.vision import detect_image_resolution, write_image
+from .helper import get_test_example_file, get_test_examples_directory, get_test_output_file, prepare_test_output_directory
+
+
+@pytest.fixture(scope = 'module', autouse = True)
+def before_all() -> None:
+	logger.init('error')
+	state_manager.init_item('processors', [])
+	state_manager.init_item('face_selector_mode', 'many')
+	state_manager.init_item('execution_thread_count', 2)
+	state_manager.init_item('execution_providers', [ 'cpu' ])
+	state_manager.init_item('output_image_quality', 80)
+	create_directory(get_test_examples_directory())
+	for frame_index in range(2):
+		write_image(get_test_example_file('target-batch-' + str(frame_index + 1) + '.jpg'), numpy.random.default_rng(frame_index).integers(0, 255, (226, 426, 3), dtype = numpy.uint8))
+
+
+@pytest.fixture(scope = 'function', autouse = True)
+def before_each() -> None:
+	prepare_test_output_directory()
+	process_manager.start()
+
+
+def test_resolve_output_image_resolution() -> None:
+	assert resolve_output_image_resolution(get_test_example_file('target-batch-1.jpg'), None) == (426, 226)
+	assert resolve_output_image_resolution(get_test_example_file('target-batch-1.jpg'), '852x452') == (852, 452)
+	assert resolve_output_image_resolution(get_test_example_file('target-batch-1.jpg'), '123x456') == (426, 226)
+
+
+def test_process_batch_image() -> None:
+	assert process_batch_image([], None, None,
+	{
+		'source_paths': [],
+		'target_path': get_test_example_file('target-batch-1.jpg'),
+		'output_path': get_test_output_file('test-process-batch-image.jpg')
+	}) is None
+	assert is_file(get_test_output_file('test-process-batch-image.jpg')) is True
+	assert detect_image_resolution(get_test_output_file('test-process-batch-image.jpg')) == (426, 226)
+
+
+def test_process_batch_image_isolates_failure() -> None:
+	assert process_batch_image([], None, None,
+	{
+		'source_paths': [],
+		'target_path': get_test_example_file('invalid.jpg'),
+		'output_path': get_test_output_file('test-process-batch-image.jpg')
+	}) is not None
+	assert process_batch_image([], None, None,
+	{
+		'source_paths': [],
+		'target_path': get_test_example_file('target-batch-1.jpg'),
+		'output_path': get_test_output_file('test-process-batch-image.png')
+	}) is not None
+
+
+def test_run_batch_images() -> None:
+	batch_tasks : List[BatchTask] =\
+	[
+		{
+			'source_paths': [],
+			'target_path': get_test_example_file('target-batch-1.jpg'),
+			'output_path': get_test_output_file('test-run-batch-images-1.jpg')
+		},
+		{
+			'source_paths': [],
+			'target_path': get_test_example_file('target-batch-2.jpg'),
+			'output_path': get_test_output_file('test-run-batch-images-2.jpg')
+		}
+	]
+
+	with patch('ffedit.batch_runner.report_batch_images') as report_batch_images:
+		assert run_batch_images(batch_tasks, '852x452') is True
+
+	assert report_batch_images.call_args.args[1] == []
+	assert detect_image_resolution(get_test_output_file('test-run-batch-images-1.jpg')) == (852, 452)
+	assert detect_image_resolution(get_test_output_file('test-run-batch-images-2.jpg')) == (852, 452)
+
+	batch_tasks[1]['target_path'] = get_test_example_file('invalid.jpg')
+	batch_tasks[1]['output_path'] = get_test_output_file('test-run-batch-images-3.jpg')
+
+	with patch('ffedit.batch_runner.report_batch_images') as report_batch_images:
+		assert run_batch_images(batch_tasks, None) is False
+
+	assert [ batch_task for batch_task, _ in report_batch_images.call_args.args[1] ] == [ batch_tasks[1] ]
+	assert is_file(get_test_output_file('test-run-batch-images-1.jpg')) is True
+	assert is_file(get_test_output_file('test-run-batch-images-3.jpg')) is False
@@ -0,0 +1,78 @@
+import tempfile
+
+import pytest
+
+from ffedit import state_manager
+from ffedit.checkpoint_manager import append_processed_frame_number, append_processed_frame_numbers, create_checkpoint, get_processed_frame_numbers, has_frames_extracted, pack_frame_ranges, set_frames_extracted, unpack_frame_ranges, validate_checkpoint
+from ffedit.temp_helper import clear_temp_directory, create_temp_directory
+from .helper import get_test_example_file
+
+
+@pytest.fixture(scope = 'module', autouse = True)
+def before_all() -> None:
+	state_manager.init_item('temp_path', tempfile.mkdtemp())
+
+
+@pytest.fixture(scope = 'function', autouse = True)
+def before_each() -> None:
+	clear_temp_directory(get_test_example_file('target-240p.mp4'))
+	create_temp_directory(get_test_example_file('target-240p.mp4'))
+
+
+def test_create_checkpoint() -> None:
+	target_path = get_test_example_file('target-240p.mp4')
+
+	assert validate_checkpoint(target_path, 'a') is False
+	assert create_checkpoint(target_path, 'a') is True
+	assert validate_checkpoint(target_path, 'a') is True
+	assert validate_checkpoint(target_path, 'b') is False
+
+
+def test_set_frames_extracted() -> None:
+	target_path = get_test_example_file('target-240p.mp4')
+
+	assert set_frames_extracted(target_path) is False
+
+	create_checkpoint(target_path, 'a')
+
+	assert has_frames_extracted(target_path) is False
+	assert set_frames_extracted(target_path) is True
+	assert has_frames_extracted(target_path) is True
+
+
+def test_append_processed_frame_numbers() -> None:
+	target_path = get_test_example_file('target-240p.mp4')
+
+	assert append_processed_frame_numbers(target_path, 'face_swapper', [ 0, 1 ]) is False
+
+	create_checkpoint(target_path, 'a')
+
+	assert append_processed_frame_numbers(target_path, 'face_swapper', [ 0, 1, 2 ]) is True
+	assert append_processed_frame_numbers(target_path, 'face_swapper', [ 5, 3 ]) is True
+	assert get_processed_frame_numbers(target_path, 'face_swapper') == [ 0, 1, 2, 3, 5 ]
+	assert get_processed_frame_numbers(target_path, 'face_enhancer') == []
+
+
+def test_append_processed_frame_number() -> None:
+	target_path = get_test_example_file('target-240p.mp4')
+
+	assert append_processed_frame_number(target_path, 'face_swapper', 0) is False
+
+	create_checkpoint(target_path, 'a')
+
+	assert append_processed_frame_number(target_path, 'face_swapper', 4) is True
+	assert append_processed_frame_number(target_path, 'face_swapper', 2) is True
+	assert append_processed_frame_numbers(target_path, 'face_swapper', [ 0, 2 ]) is True
+	assert get_processed_frame_numbers(target_path, 'face_swapper') == [ 0, 2, 4 ]
+	assert get_processed_frame_numbers(target_path, 'face_enhancer') == []
+
+
+def test_pack_frame_ranges() -> None:
+	assert pack_frame_ranges([]) == []
+	assert pack_frame_ranges([ 0, 1, 2, 5, 6, 9 ]) == [ [ 0, 3 ], [ 5, 7 ], [ 9, 10 ] ]
+	assert pack_frame_ranges([ 3, 1, 2, 2 ]) == [ [ 1, 4 ] ]
+
+
+def test_unpack_frame_ranges() -> None:
+	assert unpack_frame_ranges([]) == []
+	assert unpack_frame_ranges([ [ 0, 3 ], [ 5, 7 ], [ 9, 10 ] ]) == [ 0, 1, 2, 5, 6, 9 ]
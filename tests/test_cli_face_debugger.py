@@ -37,3 +37,24 @@ def test_debug_face_to_video() -> None:
 
 	assert subprocess.run(commands).returncode == 0
 	assert is_test_output_file('test-debug-face-to-video.mp4') is True
+
+
+def test_debug_face_to_video_fused() -> None:
+	commands = [ sys.executable, 'ffedit.py', 'headless-run', '--jobs-path', get_test_jobs_directory(), '--processors', 'face_debugger', 'frame_colorizer', '-t', get_test_example_file('target-240p.mp4'), '-o', get_test_output_file('test-debug-face-to-video-fused.mp4'), '--trim-frame-end', '1', '--video-pipeline', 'fused' ]
+
+	assert subprocess.run(commands).returncode == 0
+	assert is_test_output_file('test-debug-face-to-video-fused.mp4') is True
+
+
+def test_debug_face_to_video_streaming() -> None:
+	commands = [ sys.executable, 'ffedit.py', 'headless-run', '--jobs-path', get_test_jobs_directory(), '--processors', 'face_debugger', 'frame_colorizer', '-t', get_test_example_file('target-240p.mp4'), '-o', get_test_output_file('test-debug-face-to-video-streaming.mp4'), '--trim-frame-end', '1', '--video-pipeline', 'streaming' ]
+
+	assert subprocess.run(commands).returncode == 0
+	assert is_test_output_file('test-debug-face-to-video-streaming.mp4') is True
+
+
+def test_debug_face_to_video_process_backend() -> None:
+	commands = [ sys.executable, 'ffedit.py', 'headless-run', '--jobs-path', get_test_jobs_directory(), '--processors', 'face_debugger', '-t', get_test_example_file('target-240p.mp4'), '-o', get_test_output_file('test-debug-face-to-video-process-backend.mp4'), '--trim-frame-end', '10', '--execution-backend', 'process', '--execution-thread-count', '2' ]
+
+	assert subprocess.run(commands).returncode == 0
+	assert is_test_output_file('test-debug-face-to-video-process-backend.mp4') is True
@@ -0,0 +1,93 @@
+from unittest.mock import MagicMock, patch
+
+import numpy
+import pytest
+
+from ffedit import face_detector, face_recognizer, frame_stager, logger, process_manager, state_manager
+from ffedit.core import model_limits_pre_check, process_image, process_memory_image, process_video_frames
+from ffedit.vision import read_image, write_image
+from .helper import get_test_output_file, prepare_test_output_directory
+
+
+@pytest.fixture(scope = 'module', autouse = True)
+def before_all() -> None:
+	logger.init('error')
+	state_manager.init_item('processors', [])
+	state_manager.init_item('source_paths', [])
+	state_manager.init_item('face_selector_mode', 'many')
+
+
+@pytest.fixture(scope = 'function', autouse = True)
+def before_each() -> None:
+	prepare_test_output_directory()
+	state_manager.set_item('target_path', get_test_output_file('target.png'))
+	state_manager.set_item('output_image_quality', 100)
+	write_image(get_test_output_file('target.png'), numpy.random.default_rng(0).integers(0, 255, (120, 160, 3), dtype = numpy.uint8))
+
+
+def test_process_memory_image() -> None:
+	state_manager.set_item('output_path', get_test_output_file('output.png'))
+	state_manager.set_item('output_image_resolution', '160x120')
+	process_manager.start()
+
+	assert process_memory_image('160x120') == 0
+	assert numpy.array_equal(read_image(get_test_output_file('output.png')), read_image(get_test_output_file('target.png')))
+
+	state_manager.set_item('output_image_resolution', '80x60')
+
+	assert process_memory_image('160x120') == 0
+	assert read_image(get_test_output_file('output.png')).shape == (60, 80, 3)
+
+	process_manager.end()
+
+
+@pytest.mark.parametrize('image_pipeline, has_image_writer, process_name',
+[
+	('memory', True, 'process_memory_image'),
+	('memory', False, 'process_temp_image'),
+	('ffmpeg', True, 'process_temp_image')
+])
+def test_process_image(image_pipeline : str, has_image_writer : bool, process_name : str) -> None:
+	state_manager.set_item('image_pipeline', image_pipeline)
+	state_manager.set_item('output_path', get_test_output_file('output.png'))
+	state_manager.set_item('output_image_resolution', '160x120')
+
+	with patch('ffedit.core.analyse_image', return_value = False), patch('ffedit.core.has_image_writer', return_value = has_image_writer), patch('ffedit.core.' + process_name, return_value = 1) as process_method:
+		assert process_image(0) == 1
+
+	assert process_method.call_count == 1
+
+
+@pytest.mark.parametrize('video_pipeline', [ 'sequential', 'fused' ])
+def test_process_video_frames_with_failing_processor(video_pipeline : str) -> None:
+	state_manager.set_item('video_pipeline', video_pipeline)
+	state_manager.set_item('target_path', get_test_output_file('target.mp4'))
+	state_manager.set_item('output_video_resolution', '160x120')
+	state_manager.set_item('output_video_fps', 25.0)
+	processor_module = MagicMock()
+	processor_module.__name__ = 'ffedit.processors.modules.failing'
+	processor_module.process_video.side_effect = RuntimeError
+	process_manager.start()
+
+	with patch('ffedit.core.has_frames_extracted', return_value = True), patch('ffedit.core.resolve_temp_frames', return_value = [ get_test_output_file('target.png') ]), patch('ffedit.core.detect_duplicate_frames'), patch('ffedit.core.analyse_scene_faces'), patch('ffedit.core.get_processors_modules', return_value = [ processor_module ]), patch('ffedit.core.process_fused_video', side_effect = RuntimeError):
+		with pytest.raises(RuntimeError):
+			process_video_frames('160x120', 25.0, 0, 1)
+
+	assert frame_stager.ENCODE_BEHIND_QUEUE is None
+	assert frame_stager.ENCODE_BEHIND_FUTURE is None
+
+	process_manager.end()
+
+
+def test_model_limits_pre_check() -> None:
+	state_manager.init_item('download_providers', [ 'github' ])
+	state_manager.init_item('execution_model_limits', [ 'yolo_face:2', 'arcface:1', 'gfpgan_1.4:1' ])
+
+	assert model_limits_pre_check([ face_detector, face_recognizer ]) is True
+
+	for execution_model_limit in [ 'yolo_fase:2', 'yolo_face:0', 'yolo_face', 'yolo_face:one' ]:
+		state_manager.set_item('execution_model_limits', [ execution_model_limit ])
+
+		assert model_limits_pre_check([ face_detector, face_recognizer ]) is False
+
+	state_manager.set_item('execution_model_limits', [])
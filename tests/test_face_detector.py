@@ -0,0 +1,24 @@
+import cv2
+import numpy
+
+from ffedit.face_detector import create_roi_mosaic
+
+
+def test_create_roi_mosaic() -> None:
+	vision_frame = numpy.random.randint(0, 255, (2160, 3840, 3), dtype = numpy.uint8)
+	roi_bounding_boxes = [ numpy.array([ 100, 100, 200, 200 ]), numpy.array([ 3000, 1500, 3100, 1600 ]), numpy.array([ 3800, 2100, 3840, 2160 ]) ]
+	mosaic_vision_frame, mosaic_cells = create_roi_mosaic(vision_frame, roi_bounding_boxes, (640, 640))
+
+	assert mosaic_vision_frame.shape == (640, 640, 3)
+	assert len(mosaic_cells) == 3
+
+	cell_origin, cell_size, crop_origin, crop_scale = mosaic_cells[0]
+	assert numpy.all(cell_origin == [ 0, 0 ])
+	assert numpy.all(cell_size == [ 320, 320 ])
+	assert numpy.all(crop_origin == [ 50, 50 ])
+	assert crop_scale == 1.6
+	assert numpy.array_equal(mosaic_vision_frame[:320, :320], cv2.resize(vision_frame[50:250, 50:250], (320, 320)))
+
+	cell_origin, cell_size, crop_origin, crop_scale = mosaic_cells[2]
+	assert numpy.all(cell_origin == [ 0, 320 ])
+	assert numpy.all(crop_origin == [ 3760, 2070 ])
@@ -0,0 +1,137 @@
+from typing import Any, Dict, List, Union
+from unittest.mock import patch
+
+import numpy
+import onnx
+import pytest
+from onnxruntime import InferenceSession
+
+from ffedit import state_manager
+from ffedit.processors.modules.face_swapper import crop_face, forward_swap_face, normalize_crop_frame, paste_face, prepare_crop_frame, process_frame, process_frames_batch, swap_face
+from ffedit.processors.types import FaceSwapperInputs
+from ffedit.types import Face, VisionFrame
+from .helper import get_test_output_file, prepare_test_output_directory
+
+
+@pytest.fixture(scope = 'module', autouse = True)
+def before_all() -> None:
+	prepare_test_output_directory()
+	create_face_swapper_model(get_test_output_file('face_swapper_dynamic.onnx'), 'batch')
+	create_face_swapper_model(get_test_output_file('face_swapper_fixed.onnx'), 1)
+	state_manager.init_item('face_selector_mode', 'many')
+	state_manager.init_item('face_swapper_pixel_boost', '256x256')
+	state_manager.init_item('face_mask_types', [ 'box' ])
+	state_manager.init_item('face_mask_blur', 0.3)
+	state_manager.init_item('face_mask_padding', (0, 0, 0, 0))
+	state_manager.init_item('execution_providers', [ 'cpu' ])
+
+
+def create_face_swapper_model(model_path : str, batch_axis : Union[int, str]) -> None:
+	source_info = onnx.helper.make_tensor_value_info('source', onnx.TensorProto.FLOAT, [ batch_axis, 512 ])
+	target_info = onnx.helper.make_tensor_value_info('target', onnx.TensorProto.FLOAT, [ batch_axis, 3, 128, 128 ])
+	output_info = onnx.helper.make_tensor_value_info('output', onnx.TensorProto.FLOAT, [ batch_axis, 3, 128, 128 ])
+	model_nodes =\
+	[
+		onnx.helper.make_node('ReduceMean', [ 'source' ], [ 'source_mean' ], axes = [ 1 ], keepdims = 1),
+		onnx.helper.make_node('Reshape', [ 'source_mean', 'source_shape' ], [ 'source_bias' ]),
+		onnx.helper.make_node('Mul', [ 'target', 'target_scale' ], [ 'target_scaled' ]),
+		onnx.helper.make_node('Add', [ 'target_scaled', 'source_bias' ], [ 'output' ])
+	]
+	model_initializers =\
+	[
+		onnx.helper.make_tensor('source_shape', onnx.TensorProto.INT64, [ 4 ], [ -1, 1, 1, 1 ]),
+		onnx.helper.make_tensor('target_scale', onnx.TensorProto.FLOAT, [ 1 ], [ 0.5 ])
+	]
+	model_graph = onnx.helper.make_graph(model_nodes, 'face_swapper', [ source_info, target_info ], [ output_info ], model_initializers)
+	onnx.save(onnx.helper.make_model(model_graph, opset_imports = [ onnx.helper.make_opsetid('', 13) ], ir_version = 8), model_path)
+
+
+def create_face(face_landmark_5 : List[List[float]]) -> Face:
+	return Face(
+		bounding_box = numpy.array([ 60, 60, 196, 200 ]),
+		score_set = {},
+		landmark_set =
+		{
+			'5/68': numpy.array(face_landmark_5, dtype = numpy.float32),
+			'68': numpy.zeros((68, 2), dtype = numpy.float32)
+		},
+		angle = 0,
+		embedding = numpy.linspace(-1, 1, 512, dtype = numpy.float32),
+		normed_embedding = numpy.linspace(-0.1, 0.3, 512, dtype = numpy.float32),
+		gender = None,
+		age = None,
+		race = None
+	)
+
+
+def get_model_options() -> Dict[str, Any]:
+	return\
+	{
+		'type': 'hyperswap',
+		'template': 'arcface_128',
+		'size': (128, 128),
+		'mean': [ 0.5, 0.5, 0.5 ],
+		'standard_deviation': [ 0.5, 0.5, 0.5 ]
+	}
+
+
+def swap_face_per_tile(source_face : Face, target_face : Face, temp_vision_frame : VisionFrame) -> VisionFrame:
+	pixel_boost_vision_frames, crop_masks, affine_matrix = crop_face(target_face, temp_vision_frame)
+	temp_vision_frames = [ normalize_crop_frame(forward_swap_face(source_face, prepare_crop_frame(pixel_boost_vision_frame))) for pixel_boost_vision_frame in pixel_boost_vision_frames ]
+	return paste_face(target_face, temp_vision_frame, temp_vision_frames, crop_masks, affine_matrix)
+
+
+@pytest.mark.parametrize('model_name, batch_sizes', [ ('face_swapper_dynamic.onnx', [ 4 ]), ('face_swapper_fixed.onnx', [ 1, 1, 1, 1 ]) ])
+def test_swap_face(model_name : str, batch_sizes : List[int]) -> None:
+	inference_pool =\
+	{
+		'face_swapper': InferenceSession(get_test_output_file(model_name), providers = [ 'CPUExecutionProvider' ])
+	}
+	model_options = get_model_options()
+	source_face = create_face([ [ 100, 110 ], [ 156, 110 ], [ 128, 140 ], [ 106, 170 ], [ 150, 170 ] ])
+	target_face = create_face([ [ 96, 104 ], [ 160, 106 ], [ 130, 142 ], [ 104, 174 ], [ 154, 176 ] ])
+	temp_vision_frame = numpy.random.default_rng(0).integers(0, 255, (256, 256, 3), dtype = numpy.uint8)
+	run_batch_sizes : List[int] = []
+	run_inference = InferenceSession.run
+
+	def spy_inference(*args : Any, **kwargs : Any) -> Any:
+		run_batch_sizes.append(len(args[2].get('target')))
+		return run_inference(*args, **kwargs)
+
+	with patch('ffedit.processors.modules.face_swapper.get_inference_pool', return_value = inference_pool), patch('ffedit.processors.modules.face_swapper.get_model_options', return_value = model_options):
+		with patch.object(InferenceSession, 'run', spy_inference):
+			output_vision_frame = swap_face(source_face, target_face, temp_vision_frame)
+
+		assert run_batch_sizes == batch_sizes
+
+		assert numpy.array_equal(output_vision_frame, swap_face_per_tile(source_face, target_face, temp_vision_frame))
+		assert not numpy.array_equal(output_vision_frame, temp_vision_frame)
+
+
+def test_process_frames_batch() -> None:
+	inference_pool =\
+	{
+		'face_swapper': InferenceSession(get_test_output_file('face_swapper_dynamic.onnx'), providers = [ 'CPUExecutionProvider' ])
+	}
+	source_face = create_face([ [ 100, 110 ], [ 156, 110 ], [ 128, 140 ], [ 106, 170 ], [ 150, 170 ] ])
+	target_faces =\
+	[
+		create_face([ [ 96, 104 ], [ 160, 106 ], [ 130, 142 ], [ 104, 174 ], [ 154, 176 ] ]),
+		create_face([ [ 116, 114 ], [ 180, 116 ], [ 150, 152 ], [ 124, 184 ], [ 174, 186 ] ])
+	]
+	inputs_batch : List[FaceSwapperInputs] =\
+	[
+		{
+			'reference_faces': None,
+			'source_face': source_face,
+			'target_vision_frame': numpy.random.default_rng(frame_index).integers(0, 255, (256, 256, 3), dtype = numpy.uint8)
+		}
+		for frame_index in range(2)
+	]
+
+	with patch('ffedit.processors.modules.face_swapper.get_inference_pool', return_value = inference_pool), patch('ffedit.processors.modules.face_swapper.get_model_options', return_value = get_model_options()):
+		with patch('ffedit.processors.modules.face_swapper.get_many_faces', return_value = target_faces), patch('ffedit.processors.core.get_many_faces', return_value = target_faces):
+			output_vision_frames = process_frames_batch(inputs_batch)
+
+			for inputs, output_vision_frame in zip(inputs_batch, output_vision_frames):
+				assert numpy.array_equal(output_vision_frame, process_frame(inputs))
@@ -0,0 +1,154 @@
+from typing import List
+from unittest.mock import patch
+
+import numpy
+import pytest
+
+import ffedit.choices
+from ffedit import process_manager, state_manager
+from ffedit.face_store import append_reference_face, clear_reference_faces, clear_static_faces, get_matched_faces, get_static_faces
+from ffedit.face_tracker import estimate_track_bounding_box, track_faces
+from ffedit.processors.core import select_target_faces
+from ffedit.scene_analyser import analyse_frame_faces, analyse_range_faces, create_analysis_ranges, resolve_analysis_interval
+from ffedit.types import Face, VisionFrame
+
+
+@pytest.fixture(scope = 'module', autouse = True)
+def before_all() -> None:
+	state_manager.init_item('face_detector_interval', None)
+	state_manager.init_item('face_tracker_score', 0.5)
+	state_manager.init_item('reference_face_distance', 0.3)
+
+
+@pytest.fixture(scope = 'function', autouse = True)
+def before_each() -> None:
+	state_manager.init_item('face_selector_mode', 'many')
+	clear_static_faces()
+	clear_reference_faces()
+
+
+def create_face(face_offset : int) -> Face:
+	return Face(
+		bounding_box = numpy.array([ face_offset, face_offset, face_offset + 32, face_offset + 32 ]),
+		score_set = {},
+		landmark_set =
+		{
+			'68': numpy.stack([ numpy.linspace(4, 28, 68), numpy.linspace(28, 4, 68) ], axis = 1) + face_offset
+		},
+		angle = 0,
+		embedding = numpy.ones(512),
+		normed_embedding = numpy.full(512, 1 / numpy.sqrt(512)),
+		gender = None,
+		age = None,
+		race = None
+	)
+
+
+def read_temp_frame(frame_path : str) -> VisionFrame:
+	return numpy.full((64, 64, 3), int(frame_path) + 1, dtype = numpy.uint8)
+
+
+def keep_track_faces(vision_frame : VisionFrame, previous_faces : List[Face], track_score : float) -> List[Face]:
+	return previous_faces
+
+
+def test_estimate_track_bounding_box() -> None:
+	bounding_box = numpy.array([ 10, 10, 50, 50 ])
+	face_landmark_68 = numpy.stack([ numpy.linspace(10, 50, 68), numpy.linspace(50, 10, 68) ], axis = 1)
+
+	assert numpy.allclose(estimate_track_bounding_box(bounding_box, face_landmark_68, face_landmark_68), [ 10, 10, 50, 50 ])
+	assert numpy.allclose(estimate_track_bounding_box(bounding_box, face_landmark_68, face_landmark_68 + [ 5, -5 ]), [ 15, 5, 55, 45 ])
+	assert numpy.allclose(estimate_track_bounding_box(bounding_box, face_landmark_68, (face_landmark_68 - 30) * 2 + 30), [ -10, -10, 70, 70 ])
+
+
+def test_track_faces() -> None:
+	assert track_faces(numpy.zeros((64, 64, 3), dtype = numpy.uint8), [], 0.5) is None
+
+
+def test_track_faces_lost() -> None:
+	vision_frame = numpy.zeros((64, 64, 3), dtype = numpy.uint8)
+	previous_face = create_face(0)
+	face_landmark_68 = previous_face.landmark_set.get('68')
+
+	with patch('ffedit.face_tracker.detect_face_landmark', return_value = (face_landmark_68, 0.1)):
+		assert track_faces(vision_frame, [ previous_face ], 0.5) is None
+
+	with patch('ffedit.face_tracker.detect_face_landmark', return_value = (face_landmark_68 + 24, 0.9)):
+		assert track_faces(vision_frame, [ previous_face ], 0.5) is None
+
+	with patch('ffedit.face_tracker.detect_face_landmark', side_effect = [ (face_landmark_68, 0.9), (face_landmark_68, 0.1) ]), patch('ffedit.face_tracker.estimate_face_landmark_68_5', return_value = face_landmark_68):
+		assert track_faces(vision_frame, [ previous_face, create_face(16) ], 0.5) is None
+
+
+def test_redetect_lost_faces() -> None:
+	vision_frame = read_temp_frame('0')
+	previous_faces = [ create_face(0) ]
+
+	with patch('ffedit.scene_analyser.track_faces', return_value = None), patch('ffedit.scene_analyser.propagate_faces', return_value = previous_faces) as propagate_faces:
+		analyse_frame_faces(vision_frame, previous_faces)
+
+	assert propagate_faces.call_args.args[1] == previous_faces
+
+	with patch('ffedit.scene_analyser.propagate_faces', return_value = previous_faces) as propagate_faces:
+		analyse_frame_faces(vision_frame, None)
+
+	assert propagate_faces.call_args.args[1] == []
+
+
+def test_redetect_faces_at_interval() -> None:
+	frame_total = ffedit.choices.face_tracker_interval + 5
+	temp_frame_paths = [ str(frame_number) for frame_number in range(frame_total) ]
+	detect_frame_numbers = []
+
+	def detect_faces(vision_frame : VisionFrame, previous_faces : List[Face]) -> List[Face]:
+		detect_frame_numbers.append(int(vision_frame[0][0][0]) - 1)
+		return [ create_face(0) ]
+
+	process_manager.start()
+
+	with patch('ffedit.scene_analyser.read_temp_frame', side_effect = read_temp_frame), patch('ffedit.scene_analyser.propagate_faces', side_effect = detect_faces), patch('ffedit.scene_analyser.track_faces', side_effect = keep_track_faces):
+		for analysis_start, analysis_end in create_analysis_ranges(frame_total, [], resolve_analysis_interval(frame_total)):
+			analyse_range_faces(temp_frame_paths[analysis_start:analysis_end], lambda _: None)
+
+	process_manager.end()
+
+	assert detect_frame_numbers == [ 0, ffedit.choices.face_tracker_interval ]
+
+
+def test_detect_new_face_mid_track() -> None:
+	frame_total = ffedit.choices.face_tracker_interval + 5
+	temp_frame_paths = [ str(frame_number) for frame_number in range(frame_total) ]
+
+	def detect_faces(vision_frame : VisionFrame, previous_faces : List[Face]) -> List[Face]:
+		if int(vision_frame[0][0][0]) - 1 < 10:
+			return [ create_face(0) ]
+		return [ create_face(0), create_face(16) ]
+
+	process_manager.start()
+
+	with patch('ffedit.scene_analyser.read_temp_frame', side_effect = read_temp_frame), patch('ffedit.scene_analyser.propagate_faces', side_effect = detect_faces), patch('ffedit.scene_analyser.track_faces', side_effect = keep_track_faces):
+		for analysis_start, analysis_end in create_analysis_ranges(frame_total, [], resolve_analysis_interval(frame_total)):
+			analyse_range_faces(temp_frame_paths[analysis_start:analysis_end], lambda _: None)
+
+	process_manager.end()
+
+	assert len(get_static_faces(read_temp_frame('10'))) == 1
+	assert len(get_static_faces(read_temp_frame(str(ffedit.choices.face_tracker_interval - 1)))) == 1
+	assert len(get_static_faces(read_temp_frame(str(ffedit.choices.face_tracker_interval + 1)))) == 2
+
+
+def test_select_target_faces_from_track() -> None:
+	vision_frame = read_temp_frame('0')
+	previous_faces = [ create_face(0) ]
+	state_manager.init_item('face_selector_mode', 'reference')
+	append_reference_face('origin', create_face(0))
+
+	with patch('ffedit.scene_analyser.track_faces', side_effect = keep_track_faces):
+		analyse_frame_faces(vision_frame, previous_faces)
+
+	assert get_matched_faces(vision_frame) == previous_faces
+
+	with patch('ffedit.processors.core.find_similar_faces') as find_similar_faces:
+		assert select_target_faces({ 'origin': [ create_face(0) ] }, vision_frame) == previous_faces
+
+	assert find_similar_faces.call_count == 0
@@ -1,16 +1,19 @@
 import os
 import subprocess
 import tempfile
+from typing import Iterator, List
+from unittest.mock import patch
 
 import pytest
 
 import ffedit.ffmpeg
 from ffedit import process_manager, state_manager
 from ffedit.download import conditional_download
-from ffedit.ffmpeg import concat_video, extract_frames, merge_video, read_audio_buffer, replace_audio, restore_audio
+from ffedit.ffmpeg import concat_video, detect_video_key_frames, encode_frames, extract_frames, merge_video, open_ffmpeg, read_audio_buffer, replace_audio, restore_audio, stream_video
 from ffedit.filesystem import copy_file
 from ffedit.temp_helper import clear_temp_directory, create_temp_directory, get_temp_file_path, resolve_temp_frame_paths
-from ffedit.types import EncoderSet
+from ffedit.types import Commands, EncoderSet, VisionFrame
+from ffedit.vision import count_video_frame_total, read_image
 from .helper import get_test_example_file, get_test_examples_directory, get_test_output_file, prepare_test_output_directory
 
 
@@ -32,6 +35,7 @@ def before_all() -> None:
 		subprocess.run([ 'ffmpeg', '-i', get_test_example_file('source.mp3'), '-i', get_test_example_file('target-240p.mp4'), '-ar', '16000', get_test_example_file('target-240p-16khz.' + output_video_format) ])
 
 	subprocess.run([ 'ffmpeg', '-i', get_test_example_file('source.mp3'), '-i', get_test_example_file('target-240p.mp4'), '-ar', '48000', get_test_example_file('target-240p-48khz.mp4') ])
+	state_manager.init_item('source_paths', [])
 	state_manager.init_item('temp_path', tempfile.gettempdir())
 	state_manager.init_item('temp_frame_format', 'png')
 	state_manager.init_item('output_audio_encoder', 'aac')
@@ -64,6 +68,12 @@ def test_get_available_encoder_set() -> None:
 	assert 'libx264' in available_encoder_set.get('video')
 
 
+def test_detect_video_key_frames() -> None:
+	assert detect_video_key_frames(get_test_example_file('target-240p.mp4'))[0] == 0
+	assert detect_video_key_frames(get_test_example_file('target-240p-25fps.mp4'))[0] == 0
+	assert detect_video_key_frames('invalid') == []
+
+
 def test_extract_frames() -> None:
 	test_set =\
 	[
@@ -109,12 +119,88 @@ def test_merge_video() -> None:
 			extract_frames(target_path, '452x240', 25.0, 0, 1)
 
 			assert merge_video(target_path, 25.0, '452x240', 25.0, 0, 1) is True
+			assert read_audio_buffer(get_temp_file_path(target_path), 16000, 16, 1)
 
 		clear_temp_directory(target_path)
 
 	state_manager.init_item('output_video_encoder', 'libx264')
 
 
+def test_merge_video_without_audio() -> None:
+	target_path = get_test_example_file('target-240p-16khz.mp4')
+	source_path = get_test_output_file('invalid.mp3')
+
+	with open(source_path, 'wb') as source_file:
+		source_file.write(b'invalid')
+	state_manager.init_item('source_paths', [ source_path ])
+	create_temp_directory(target_path)
+	extract_frames(target_path, '452x240', 25.0, 0, 1)
+
+	assert merge_video(target_path, 25.0, '452x240', 25.0, 0, 1) is True
+	assert read_audio_buffer(get_temp_file_path(target_path), 16000, 16, 1) is None
+
+	clear_temp_directory(target_path)
+	state_manager.init_item('source_paths', [])
+
+
+def test_stream_video() -> None:
+	test_set =\
+	[
+		(get_test_example_file('target-240p-25fps.mp4'), 0, 270, 324),
+		(get_test_example_file('target-240p-30fps.mp4'), 124, 224, 100),
+		(get_test_example_file('target-240p-60fps.mp4'), 0, 100, 50)
+	]
+
+	for target_path, trim_frame_start, trim_frame_end, frame_total in test_set:
+		create_temp_directory(target_path)
+
+		assert stream_video(target_path, '452x240', 30.0, '452x240', 30.0, trim_frame_start, trim_frame_end, lambda temp_vision_frames: temp_vision_frames) is True
+		assert count_video_frame_total(get_temp_file_path(target_path)) == frame_total
+		assert resolve_temp_frame_paths(target_path) == []
+
+		clear_temp_directory(target_path)
+
+
+def test_stream_video_with_failing_processor() -> None:
+	target_path = get_test_example_file('target-240p-25fps.mp4')
+	ffmpeg_processes : List[subprocess.Popen[bytes]] = []
+
+	def open_tracked_ffmpeg(commands : Commands) -> subprocess.Popen[bytes]:
+		ffmpeg_processes.append(open_ffmpeg(commands))
+		return ffmpeg_processes[-1]
+
+	def process_vision_frames(temp_vision_frames : Iterator[VisionFrame]) -> Iterator[VisionFrame]:
+		for frame_number, temp_vision_frame in enumerate(temp_vision_frames):
+			if frame_number == 10:
+				raise RuntimeError
+			yield temp_vision_frame
+
+	create_temp_directory(target_path)
+
+	with patch('ffedit.ffmpeg.open_ffmpeg', side_effect = open_tracked_ffmpeg):
+		with pytest.raises(RuntimeError):
+			stream_video(target_path, '452x240', 30.0, '452x240', 30.0, 0, 270, process_vision_frames)
+
+	assert len(ffmpeg_processes) == 2
+	for ffmpeg_process in ffmpeg_processes:
+		assert ffmpeg_process.poll() is not None
+		assert ffmpeg_process.stdin.closed is True
+
+	clear_temp_directory(target_path)
+
+
+def test_encode_frames() -> None:
+	target_path = get_test_example_file('target-240p-25fps.mp4')
+	create_temp_directory(target_path)
+	extract_frames(target_path, '452x240', 30.0, 0, 270)
+	temp_vision_frames = map(read_image, resolve_temp_frame_paths(target_path))
+
+	assert encode_frames(target_path, 30.0, '452x240', 30.0, 0, 270, temp_vision_frames) is True
+	assert count_video_frame_total(get_temp_file_path(target_path)) == 324
+
+	clear_temp_directory(target_path)
+
+
 def test_concat_video() -> None:
 	output_path = get_test_output_file('test-concat-video.mp4')
 	temp_output_paths =\
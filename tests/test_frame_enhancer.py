@@ -0,0 +1,52 @@
+from typing import Tuple
+from unittest.mock import patch
+
+import onnx
+import pytest
+from onnxruntime import InferenceSession
+
+from ffedit.processors.modules.frame_enhancer import estimate_tile_memory, get_static_tile_options
+from .helper import get_test_output_file, prepare_test_output_directory
+
+
+@pytest.fixture(scope = 'module', autouse = True)
+def before_all() -> None:
+	prepare_test_output_directory()
+	model_path = get_test_output_file('frame_enhancer.onnx')
+	input_info = onnx.helper.make_tensor_value_info('input', onnx.TensorProto.FLOAT, [ 'batch', 3, 'height', 'width' ])
+	output_info = onnx.helper.make_tensor_value_info('output', onnx.TensorProto.FLOAT, [ 'batch', 3, 'height', 'width' ])
+	model_graph = onnx.helper.make_graph([ onnx.helper.make_node('Relu', [ 'input' ], [ 'output' ]) ], 'frame_enhancer', [ input_info ], [ output_info ])
+	onnx.save(onnx.helper.make_model(model_graph, opset_imports = [ onnx.helper.make_opsetid('', 13) ], ir_version = 8), model_path)
+
+
+@pytest.mark.parametrize('free_memory_factor, execution_thread_count, tile_options',
+[
+	(0, 1, ((128, 8, 2), 1)),
+	(6, 1, ((128, 8, 2), 3)),
+	(6, 3, ((128, 8, 2), 1)),
+	(20, 1, ((256, 8, 2), 2)),
+	(4096, 1, ((512, 8, 2), 8))
+])
+def test_get_static_tile_options(free_memory_factor : int, execution_thread_count : int, tile_options : Tuple[Tuple[int, int, int], int]) -> None:
+	inference_pool =\
+	{
+		'frame_enhancer': InferenceSession(get_test_output_file('frame_enhancer.onnx'), providers = [ 'CPUExecutionProvider' ])
+	}
+	model_options =\
+	{
+		'size': (128, 8, 2),
+		'scale': 4
+	}
+
+	with patch('ffedit.processors.modules.frame_enhancer.get_inference_pool', return_value = inference_pool), patch('ffedit.processors.modules.frame_enhancer.get_model_options', return_value = model_options):
+		free_memory = estimate_tile_memory(128) * free_memory_factor
+
+		with patch('ffedit.processors.modules.frame_enhancer.detect_free_memory', return_value = free_memory):
+			get_static_tile_options.cache_clear()
+			model_size, tile_batch_size = get_static_tile_options('real_esrgan_x4', 8, execution_thread_count, 1024, 768)
+
+			assert (model_size, tile_batch_size) == tile_options
+			if tile_batch_size > 1:
+				assert tile_batch_size * execution_thread_count * estimate_tile_memory(model_size[0]) <= free_memory // 2
+
+	get_static_tile_options.cache_clear()
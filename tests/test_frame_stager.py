@@ -0,0 +1,117 @@
+from queue import Queue
+from typing import List, Optional
+from unittest.mock import patch
+
+import numpy
+import pytest
+
+from ffedit import frame_stager, process_manager, state_manager
+from ffedit.filesystem import is_file
+from ffedit.frame_stager import abort_frame_encoder, clear_frame_stager, conditional_write_behind_frame, encode_behind_frames, flush_frames, read_ahead_frame_batches, read_ahead_frames, reorder_queue_payloads, start_frame_encoder, write_behind_frame
+from ffedit.types import QueuePayload
+from ffedit.vision import read_image, write_image
+from .helper import get_test_output_file, prepare_test_output_directory
+
+
+@pytest.fixture(scope = 'module', autouse = True)
+def before_all() -> None:
+	state_manager.init_item('execution_thread_count', 2)
+	process_manager.start()
+
+
+@pytest.fixture(scope = 'function', autouse = True)
+def before_each() -> None:
+	prepare_test_output_directory()
+	clear_frame_stager()
+
+
+@pytest.mark.parametrize('read_ahead_count', [ 0, 1, 4 ])
+def test_read_ahead_frames(read_ahead_count : int) -> None:
+	state_manager.init_item('execution_read_ahead_count', read_ahead_count)
+	queue_payloads : List[QueuePayload] = []
+
+	for frame_number in range(6):
+		frame_path = get_test_output_file(str(frame_number) + '.png')
+		write_image(frame_path, numpy.full((8, 8, 3), frame_number, dtype = numpy.uint8))
+		queue_payloads.append(
+		{
+			'frame_number': frame_number,
+			'frame_path': frame_path
+		})
+
+	for queue_payload, vision_frame in read_ahead_frames(iter(queue_payloads)):
+		assert vision_frame[0][0][0] == queue_payload.get('frame_number')
+
+
+@pytest.mark.parametrize('batch_size, batch_lengths', [ (1, [ 1, 1, 1, 1, 1, 1 ]), (4, [ 4, 2 ]) ])
+def test_read_ahead_frame_batches(batch_size : int, batch_lengths : List[int]) -> None:
+	state_manager.init_item('execution_read_ahead_count', 1)
+	state_manager.init_item('execution_batch_size', batch_size)
+	queue_payloads : List[QueuePayload] = []
+
+	for frame_number in range(6):
+		frame_path = get_test_output_file(str(frame_number) + '.png')
+		write_image(frame_path, numpy.full((8, 8, 3), frame_number, dtype = numpy.uint8))
+		queue_payloads.append(
+		{
+			'frame_number': frame_number,
+			'frame_path': frame_path
+		})
+
+	frame_batches = list(read_ahead_frame_batches(iter(queue_payloads)))
+
+	assert [ len(frame_batch) for frame_batch in frame_batches ] == batch_lengths
+	for frame_batch in frame_batches:
+		for queue_payload, vision_frame in frame_batch:
+			assert vision_frame[0][0][0] == queue_payload.get('frame_number')
+
+
+@pytest.mark.parametrize('write_behind_count', [ 0, 1, 4 ])
+def test_write_behind_frame(write_behind_count : int) -> None:
+	state_manager.init_item('execution_write_behind_count', write_behind_count)
+
+	for frame_number in range(6):
+		write_behind_frame(get_test_output_file(str(frame_number) + '.png'), numpy.full((8, 8, 3), frame_number, dtype = numpy.uint8))
+	flush_frames()
+
+	for frame_number in range(6):
+		assert read_image(get_test_output_file(str(frame_number) + '.png'))[0][0][0] == frame_number
+
+
+def test_conditional_write_behind_frame() -> None:
+	state_manager.init_item('execution_write_behind_count', 1)
+	target_vision_frame = numpy.zeros((8, 8, 3), dtype = numpy.uint8)
+
+	conditional_write_behind_frame(get_test_output_file('unchanged.png'), target_vision_frame, target_vision_frame)
+	conditional_write_behind_frame(get_test_output_file('changed.png'), target_vision_frame, target_vision_frame.copy())
+	flush_frames()
+
+	assert is_file(get_test_output_file('unchanged.png')) is False
+	assert is_file(get_test_output_file('changed.png')) is True
+
+
+def test_reorder_queue_payloads() -> None:
+	encode_queue : Queue[Optional[List[QueuePayload]]] = Queue()
+	encode_queue.put([ { 'frame_number': 2, 'frame_path': '2.png' }, { 'frame_number': 3, 'frame_path': '3.png' } ])
+	encode_queue.put([ { 'frame_number': 0, 'frame_path': '0.png' } ])
+	encode_queue.put([ { 'frame_number': 5, 'frame_path': '5.png' } ])
+	encode_queue.put([ { 'frame_number': 1, 'frame_path': '1.png' } ])
+	encode_queue.put(None)
+
+	assert [ queue_payload.get('frame_number') for queue_payload in reorder_queue_payloads(encode_queue) ] == [ 0, 1, 2, 3 ]
+
+
+def test_abort_frame_encoder() -> None:
+	for frame_number in range(3):
+		write_image(get_test_output_file(str(frame_number) + '.png'), numpy.full((8, 8, 3), frame_number, dtype = numpy.uint8))
+
+	with patch('ffedit.frame_stager.encode_frames', side_effect = lambda *args: len(list(args[-1])) > 0):
+		start_frame_encoder(get_test_output_file('target.mp4'), 25.0, '8x8', 25.0, 0, 3)
+		encode_future = frame_stager.ENCODE_BEHIND_FUTURE
+		encode_behind_frames([ { 'frame_number': 1, 'frame_path': get_test_output_file('1.png') } ])
+		abort_frame_encoder()
+
+	assert encode_future.done() is True
+	assert isinstance(encode_future.exception(), InterruptedError)
+	assert frame_stager.ENCODE_BEHIND_QUEUE is None
+	assert frame_stager.ENCODE_BEHIND_FUTURE is None
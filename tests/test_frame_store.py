@@ -0,0 +1,79 @@
+import os
+from typing import Iterator
+
+import numpy
+import pytest
+
+from ffedit import state_manager
+from ffedit.frame_store import clear_frame_stores, copy_temp_frame, create_frame_store, get_frame_store_path, get_frame_store_resolution, read_temp_frame, resolve_temp_frames, write_temp_frame
+from ffedit.temp_helper import clear_temp_directory, create_temp_directory, get_temp_directory_path
+from .helper import get_test_example_file, get_test_output_file, prepare_test_output_directory
+
+
+@pytest.fixture(scope = 'module', autouse = True)
+def before_all() -> Iterator[None]:
+	state_manager.init_item('temp_path', get_test_output_file('temp'))
+	state_manager.init_item('temp_frame_format', 'raw')
+	yield
+	clear_frame_stores()
+	state_manager.init_item('temp_frame_format', 'png')
+
+
+@pytest.fixture(scope = 'function', autouse = True)
+def before_each() -> None:
+	clear_frame_stores()
+	prepare_test_output_directory()
+	target_path = get_test_example_file('target-240p.mp4')
+	create_temp_directory(target_path)
+	create_frame_store(target_path, '8x4')
+	numpy.zeros((3, 4, 8, 3), dtype = numpy.uint8).tofile(get_frame_store_path(get_temp_directory_path(target_path)))
+
+
+def test_resolve_temp_frames() -> None:
+	target_path = get_test_example_file('target-240p.mp4')
+	temp_directory_path = get_temp_directory_path(target_path)
+
+	assert resolve_temp_frames(target_path) == [ os.path.join(temp_directory_path, '00000001.raw'), os.path.join(temp_directory_path, '00000002.raw'), os.path.join(temp_directory_path, '00000003.raw') ]
+	assert get_frame_store_resolution(target_path) == '8x4'
+
+	clear_frame_stores()
+	clear_temp_directory(target_path)
+
+	assert resolve_temp_frames(target_path) == []
+	assert get_frame_store_resolution(target_path) is None
+
+
+def test_write_temp_frame() -> None:
+	frame_paths = resolve_temp_frames(get_test_example_file('target-240p.mp4'))
+
+	assert write_temp_frame(frame_paths[0], numpy.full((4, 8, 3), 1, dtype = numpy.uint8)) is True
+	assert write_temp_frame(frame_paths[1], numpy.full((8, 16, 3), 2, dtype = numpy.uint8)) is False
+	assert write_temp_frame(frame_paths[0].replace('00000001', '00000004'), numpy.zeros((4, 8, 3), dtype = numpy.uint8)) is False
+	assert numpy.all(read_temp_frame(frame_paths[0]) == 1)
+	assert numpy.all(read_temp_frame(frame_paths[1]) == 0)
+	assert numpy.all(read_temp_frame(frame_paths[2]) == 0)
+
+
+def test_read_temp_frame() -> None:
+	frame_paths = resolve_temp_frames(get_test_example_file('target-240p.mp4'))
+	vision_frame = read_temp_frame(frame_paths[0])
+
+	assert vision_frame.flags.writeable is False
+	with pytest.raises(ValueError):
+		vision_frame[:] = 5
+
+	write_temp_frame(frame_paths[0], numpy.full((4, 8, 3), 5, dtype = numpy.uint8))
+
+	assert numpy.all(vision_frame == 5)
+
+
+def test_copy_temp_frame() -> None:
+	frame_paths = resolve_temp_frames(get_test_example_file('target-240p.mp4'))
+	write_temp_frame(frame_paths[0], numpy.full((4, 8, 3), 3, dtype = numpy.uint8))
+
+	assert copy_temp_frame(frame_paths[0], frame_paths[2]) is True
+	assert numpy.all(read_temp_frame(frame_paths[2]) == 3)
+
+	clear_frame_stores()
+
+	assert numpy.all(read_temp_frame(frame_paths[2]) == 3)
@@ -1,10 +1,16 @@
+from concurrent.futures import ThreadPoolExecutor
+from time import monotonic
+from typing import Any, List
 from unittest.mock import patch
 
+import numpy
+import onnx
 import pytest
 from onnxruntime import InferenceSession
 
 from ffedit import content_analyser, state_manager
-from ffedit.inference_manager import INFERENCE_POOL_SET, get_inference_pool
+from ffedit.inference_manager import BatchInferenceSession, INFERENCE_POOL_SET, create_batch_key, create_inference_session, get_inference_pool, run_direct_inference
+from .helper import get_test_output_file, prepare_test_output_directory
 
 
 @pytest.fixture(scope = 'module', autouse = True)
@@ -30,3 +36,60 @@ def test_get_inference_pool() -> None:
 		assert isinstance(INFERENCE_POOL_SET.get('cli').get('ffedit.content_analyser.nsfw_1.nsfw_2.nsfw_3.0.cpu').get('nsfw_1'), InferenceSession)
 
 	assert INFERENCE_POOL_SET.get('cli').get('ffedit.content_analyser.nsfw_1.nsfw_2.nsfw_3.0.cpu').get('nsfw_1') == INFERENCE_POOL_SET.get('ui').get('ffedit.content_analyser.nsfw_1.nsfw_2.nsfw_3.0.cpu').get('nsfw_1')
+
+
+def test_batch_inference_session() -> None:
+	prepare_test_output_directory()
+	model_path = get_test_output_file('relu.onnx')
+	input_info = onnx.helper.make_tensor_value_info('input', onnx.TensorProto.FLOAT, [ 'batch', 4 ])
+	output_info = onnx.helper.make_tensor_value_info('output', onnx.TensorProto.FLOAT, [ 'batch', 4 ])
+	model_graph = onnx.helper.make_graph([ onnx.helper.make_node('Relu', [ 'input' ], [ 'output' ]) ], 'relu', [ input_info ], [ output_info ])
+	onnx.save(onnx.helper.make_model(model_graph, opset_imports = [ onnx.helper.make_opsetid('', 13) ], ir_version = 8), model_path)
+	state_manager.init_item('execution_batch_size', 4)
+	state_manager.init_item('execution_batch_wait', 50)
+	inference_session = create_inference_session(model_path, '0', [ 'cpu' ])
+	batch_sizes : List[int] = []
+	run_inference = InferenceSession.run
+
+	def spy_inference(*args : Any, **kwargs : Any) -> Any:
+		batch_sizes.append(len(args[2].get('input')))
+		return run_inference(*args, **kwargs)
+
+	def forward(index : int) -> bool:
+		input_frame = numpy.full((index % 2 + 1, 4), index - 4, dtype = numpy.float32)
+		output_frame = inference_session.run(None, { 'input': input_frame })[0]
+		return numpy.array_equal(output_frame, numpy.maximum(input_frame, 0))
+
+	assert isinstance(inference_session, BatchInferenceSession)
+
+	with patch.object(InferenceSession, 'run', spy_inference):
+		with ThreadPoolExecutor(max_workers = 8) as executor:
+			assert all(executor.map(forward, range(8)))
+
+	assert sum(batch_sizes) == 12
+	assert len(batch_sizes) < 8
+	assert max(batch_sizes) <= 4
+
+	batch_sizes.clear()
+
+	with patch.object(InferenceSession, 'run', spy_inference):
+		input_frame = numpy.full((8, 4), -1, dtype = numpy.float32)
+
+		assert numpy.array_equal(inference_session.run(None, { 'input': input_frame })[0], numpy.zeros((8, 4)))
+		assert numpy.array_equal(run_direct_inference(inference_session, None, { 'input': input_frame })[0], numpy.zeros((8, 4)))
+
+	assert batch_sizes == [ 8, 8 ]
+	assert create_batch_key(None, { 'input': input_frame }) is None
+	assert create_batch_key(None, { 'input': input_frame[:1] })
+
+	state_manager.init_item('execution_batch_wait', 100)
+	inference_session = create_inference_session(model_path, '0', [ 'cpu' ])
+	start_time = monotonic()
+
+	assert numpy.array_equal(inference_session.run(None, { 'input': input_frame[:1] })[0], numpy.zeros((1, 4)))
+	assert monotonic() - start_time < 0.1
+	assert inference_session.batch_running == 0
+
+	state_manager.init_item('execution_batch_size', 1)
+
+	assert not isinstance(create_inference_session(model_path, '0', [ 'cpu' ]), BatchInferenceSession)
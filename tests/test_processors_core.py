@@ -0,0 +1,97 @@
+import tempfile
+from typing import List
+
+import numpy
+
+from ffedit import process_manager, state_manager
+from ffedit.checkpoint_manager import create_checkpoint, get_processed_frame_numbers
+from ffedit.frame_stager import conditional_write_behind_frame, read_ahead_frames
+from ffedit.processors.core import calculate_queue_per_future, create_queue, create_queue_payloads, multi_process_frames, pick_queue
+from ffedit.temp_helper import clear_temp_directory, create_temp_directory, get_temp_frames_pattern
+from ffedit.types import QueuePayload, UpdateProgress
+from ffedit.vision import read_image, write_image
+from .helper import get_test_example_file
+
+INTERRUPT_FRAME_NUMBERS : List[int] = []
+
+
+def test_calculate_queue_per_future() -> None:
+	state_manager.init_item('execution_thread_count', 4)
+	state_manager.init_item('execution_queue_count', 1)
+
+	assert calculate_queue_per_future(160) == 10
+	assert calculate_queue_per_future(16) == 1
+	assert calculate_queue_per_future(15) == 1
+	assert calculate_queue_per_future(0) == 1
+
+	state_manager.init_item('execution_queue_count', 2)
+
+	assert calculate_queue_per_future(160) == 10
+	assert calculate_queue_per_future(15) == 2
+
+
+def test_pick_queue() -> None:
+	state_manager.init_item('execution_thread_count', 4)
+	state_manager.init_item('execution_queue_count', 1)
+	queue_payloads = create_queue_payloads([ '/tmp/' + str(frame_number).zfill(8) + '.png' for frame_number in range(1, 101) ])
+	queue = create_queue(queue_payloads)
+	future_queue_sizes = []
+	frame_numbers : List[int] = []
+
+	while not queue.empty():
+		future_queue_payloads = pick_queue(queue, calculate_queue_per_future(queue.qsize()))
+		future_queue_sizes.append(len(future_queue_payloads))
+		frame_numbers.extend(queue_payload.get('frame_number') for queue_payload in future_queue_payloads)
+
+	assert future_queue_sizes[0] == 6
+	assert future_queue_sizes == sorted(future_queue_sizes, reverse = True)
+	assert future_queue_sizes[-16:] == [ 1 ] * 16
+	assert frame_numbers == list(range(100))
+	assert pick_queue(create_queue(queue_payloads[:2]), 5) == queue_payloads[:2]
+
+
+def increment_frames(source_paths : List[str], queue_payloads : List[QueuePayload], update_progress : UpdateProgress) -> None:
+	for queue_payload, target_vision_frame in read_ahead_frames(process_manager.manage(queue_payloads)):
+		conditional_write_behind_frame(queue_payload.get('frame_path'), target_vision_frame, target_vision_frame + 1)
+		update_progress(1)
+
+		if queue_payload.get('frame_number') in INTERRUPT_FRAME_NUMBERS:
+			INTERRUPT_FRAME_NUMBERS.remove(queue_payload.get('frame_number'))
+			process_manager.stop()
+
+
+def test_multi_process_frames_resume() -> None:
+	target_path = get_test_example_file('target-240p.mp4')
+	state_manager.init_item('target_path', target_path)
+	state_manager.init_item('temp_path', tempfile.mkdtemp())
+	state_manager.init_item('temp_frame_format', 'png')
+	state_manager.init_item('execution_backend', 'thread')
+	state_manager.init_item('execution_thread_count', 1)
+	state_manager.init_item('execution_queue_count', 8)
+	state_manager.init_item('execution_read_ahead_count', 0)
+	state_manager.init_item('execution_write_behind_count', 1)
+	state_manager.init_item('execution_providers', [ 'cpu' ])
+	state_manager.init_item('log_level', 'error')
+	clear_temp_directory(target_path)
+	create_temp_directory(target_path)
+	create_checkpoint(target_path, 'a')
+	temp_frame_paths = [ get_temp_frames_pattern(target_path, '%08d') % frame_number for frame_number in range(1, 9) ]
+
+	for temp_frame_path in temp_frame_paths:
+		write_image(temp_frame_path, numpy.zeros((8, 8, 3), dtype = numpy.uint8))
+	INTERRUPT_FRAME_NUMBERS.append(2)
+	process_manager.start()
+	multi_process_frames([], temp_frame_paths, increment_frames)
+
+	assert process_manager.is_stopping()
+	assert get_processed_frame_numbers(target_path, increment_frames.__module__) == [ 0, 1, 2 ]
+
+	process_manager.start()
+	multi_process_frames([], temp_frame_paths, increment_frames)
+
+	assert get_processed_frame_numbers(target_path, increment_frames.__module__) == list(range(8))
+	for temp_frame_path in temp_frame_paths:
+		assert numpy.all(read_image(temp_frame_path) == 1)
+
+	process_manager.end()
+	clear_temp_directory(target_path)
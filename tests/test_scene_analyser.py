@@ -0,0 +1,171 @@
+from typing import List
+from unittest.mock import patch
+
+import numpy
+import pytest
+
+from ffedit import process_manager, state_manager
+from ffedit.face_store import clear_static_faces
+from ffedit.scene_analyser import analyse_frame_faces, analyse_range_faces, analyse_scene_faces, create_analysis_ranges, detect_scene_cuts, resolve_analysis_interval
+from ffedit.types import Face, VisionFrame
+from ffedit.vision import write_image
+from .helper import get_test_output_file, prepare_test_output_directory
+
+
+@pytest.fixture(scope = 'module', autouse = True)
+def before_all() -> None:
+	state_manager.init_item('execution_thread_count', 2)
+	state_manager.init_item('face_selector_mode', 'many')
+	state_manager.init_item('scene_cut_threshold', 0.75)
+	state_manager.init_item('temp_frame_format', 'png')
+
+
+@pytest.fixture(scope = 'function', autouse = True)
+def before_each() -> None:
+	clear_static_faces()
+	prepare_test_output_directory()
+
+
+def create_face() -> Face:
+	return Face(
+		bounding_box = numpy.array([ 0, 0, 32, 32 ]),
+		score_set = {},
+		landmark_set =
+		{
+			'68': numpy.stack([ numpy.linspace(4, 28, 68), numpy.linspace(28, 4, 68) ], axis = 1)
+		},
+		angle = 0,
+		embedding = numpy.zeros(512),
+		normed_embedding = numpy.zeros(512),
+		gender = None,
+		age = None,
+		race = None
+	)
+
+
+def test_detect_scene_cuts() -> None:
+	temp_frame_paths = []
+
+	for frame_number, frame_color in enumerate([ (0, 0, 255), (0, 0, 255), (255, 0, 0), (255, 0, 0), (255, 0, 0), (0, 255, 0) ]):
+		frame_path = get_test_output_file(str(frame_number) + '.png')
+		write_image(frame_path, numpy.full((64, 64, 3), frame_color, dtype = numpy.uint8))
+		temp_frame_paths.append(frame_path)
+
+	assert detect_scene_cuts(temp_frame_paths) == [ 2, 5 ]
+
+
+def test_create_analysis_ranges() -> None:
+	assert create_analysis_ranges(10, [], 10) == [ (0, 10) ]
+	assert create_analysis_ranges(10, [], 4) == [ (0, 4), (4, 8), (8, 10) ]
+	assert create_analysis_ranges(10, [ 3, 7 ], 10) == [ (0, 3), (3, 7), (7, 10) ]
+	assert create_analysis_ranges(10, [ 3 ], 2) == [ (0, 2), (2, 3), (3, 5), (5, 7), (7, 9), (9, 10) ]
+	assert create_analysis_ranges(10, [ 0, 10 ], 10) == [ (0, 10) ]
+
+
+def test_resolve_analysis_interval() -> None:
+	state_manager.set_item('face_tracker_score', None)
+	state_manager.set_item('face_detector_interval', None)
+
+	assert resolve_analysis_interval(100) == 100
+
+	state_manager.set_item('face_detector_interval', 10)
+
+	assert resolve_analysis_interval(100) == 10
+
+	state_manager.set_item('face_tracker_score', 0.5)
+
+	assert resolve_analysis_interval(100) == 10
+
+	state_manager.set_item('face_detector_interval', None)
+
+	assert resolve_analysis_interval(100) == 30
+	assert resolve_analysis_interval(20) == 20
+
+	state_manager.set_item('face_detector_interval', 60)
+
+	assert resolve_analysis_interval(100) == 60
+
+
+def test_analyse_range_faces() -> None:
+	temp_frame_paths = []
+	detect_frame_colors = []
+	face = create_face()
+
+	def detect_faces(vision_frame : VisionFrame, previous_faces : List[Face]) -> List[Face]:
+		detect_frame_colors.append(int(vision_frame.max()))
+
+		if numpy.any(vision_frame):
+			return [ face ]
+		return []
+
+	for frame_number, frame_color in enumerate([ 0, 255 ]):
+		frame_path = get_test_output_file(str(frame_number) + '.png')
+		write_image(frame_path, numpy.full((64, 64, 3), frame_color, dtype = numpy.uint8))
+		temp_frame_paths.append(frame_path)
+
+	state_manager.set_item('face_tracker_score', 0.5)
+	process_manager.start()
+
+	with patch('ffedit.scene_analyser.propagate_faces', side_effect = detect_faces):
+		analyse_range_faces(temp_frame_paths, lambda _: None)
+
+	process_manager.end()
+
+	assert detect_frame_colors == [ 0, 255 ]
+
+
+def test_analyse_scene_faces_failed() -> None:
+	temp_frame_paths = []
+
+	for frame_number in range(2):
+		frame_path = get_test_output_file(str(frame_number) + '.png')
+		write_image(frame_path, numpy.zeros((64, 64, 3), dtype = numpy.uint8))
+		temp_frame_paths.append(frame_path)
+
+	state_manager.set_item('face_tracker_score', 0.5)
+	process_manager.start()
+
+	with patch('ffedit.scene_analyser.propagate_faces', side_effect = MemoryError), pytest.raises(MemoryError):
+		analyse_scene_faces(temp_frame_paths)
+
+	process_manager.end()
+
+
+def test_analyse_frame_faces() -> None:
+	vision_frame = numpy.full((64, 64, 3), 128, dtype = numpy.uint8)
+	previous_face = create_face()
+	face_landmark_68 = previous_face.landmark_set.get('68') + [ 2, 2 ]
+
+	state_manager.set_item('face_tracker_score', None)
+	state_manager.set_item('face_landmarker_score', 0.5)
+
+	with patch('ffedit.face_tracker.detect_face_landmark', return_value = (face_landmark_68, 0.9)), patch('ffedit.face_tracker.estimate_face_landmark_68_5', return_value = face_landmark_68), patch('ffedit.scene_analyser.propagate_faces') as propagate_faces:
+		faces = analyse_frame_faces(vision_frame, [ previous_face ])
+
+	assert propagate_faces.call_count == 0
+	assert numpy.allclose(faces[0].bounding_box, [ 2, 2, 34, 34 ])
+	assert numpy.array_equal(faces[0].embedding, previous_face.embedding)
+
+	with patch('ffedit.face_tracker.detect_face_landmark', return_value = (face_landmark_68, 0.1)), patch('ffedit.scene_analyser.propagate_faces', return_value = []) as propagate_faces:
+		assert analyse_frame_faces(vision_frame, [ previous_face ]) == []
+
+	assert propagate_faces.call_count == 1
+
+
+def test_analyse_scene_faces_roi_skipped() -> None:
+	state_manager.set_item('face_tracker_score', None)
+	state_manager.set_item('face_detector_interval', None)
+	state_manager.set_item('face_detector_mode', 'roi')
+
+	with patch('ffedit.scene_analyser.logger.warn') as warn, patch('ffedit.scene_analyser.detect_scene_cuts') as detect_scene_cuts:
+		analyse_scene_faces([])
+
+	assert warn.call_count == 1
+	assert detect_scene_cuts.call_count == 0
+
+	state_manager.set_item('face_detector_mode', 'full')
+
+	with patch('ffedit.scene_analyser.logger.warn') as warn:
+		analyse_scene_faces([])
+
+	assert warn.call_count == 0
@@ -0,0 +1,62 @@
+import shutil
+
+import pytest
+
+from ffedit.filesystem import get_file_size
+from ffedit.shard_manager import create_shard_manifest, get_shard_manifest_path, get_shard_video_path, parse_shard, resolve_shard_manifests, resolve_shard_video_paths, validate_shard_manifests
+from ffedit.types import ShardManifest
+from .helper import get_test_example_file, get_test_output_file, prepare_test_output_directory
+
+
+@pytest.fixture(scope = 'function', autouse = True)
+def before_each() -> None:
+	prepare_test_output_directory()
+
+
+def create_test_shard_manifest(shard_index : int, frame_start : int, frame_end : int) -> ShardManifest:
+	shard_manifest : ShardManifest =\
+	{
+		'shard_hash': 'ffffffff',
+		'shard_index': shard_index,
+		'shard_total': 2,
+		'target_size': get_file_size(get_test_example_file('target-240p.mp4')),
+		'trim_frame_start': 0,
+		'trim_frame_end': 540,
+		'frame_start': frame_start,
+		'frame_end': frame_end,
+		'frame_total': 270
+	}
+	return shard_manifest
+
+
+def test_parse_shard() -> None:
+	assert parse_shard('3/16') == (3, 16)
+	assert parse_shard('16/16') == (16, 16)
+	assert parse_shard('0/16') is None
+	assert parse_shard('17/16') is None
+	assert parse_shard('3') is None
+	assert parse_shard('a/b') is None
+
+
+def test_get_shard_video_path() -> None:
+	assert get_shard_video_path('/tmp/output.mp4', 3, 16) == '/tmp/output-shard-3-of-16.mp4'
+	assert get_shard_manifest_path('/tmp/output-shard-3-of-16.mp4') == '/tmp/output-shard-3-of-16.json'
+
+
+def test_validate_shard_manifests() -> None:
+	target_path = get_test_example_file('target-240p.mp4')
+	output_path = get_test_output_file('output.mp4')
+
+	for shard_index, frame_start, frame_end in [ (1, 0, 270), (2, 270, 540) ]:
+		shard_video_path = get_shard_video_path(output_path, shard_index, 2)
+		shutil.copyfile(target_path, shard_video_path)
+		create_shard_manifest(shard_video_path, create_test_shard_manifest(shard_index, frame_start, frame_end))
+
+	shard_manifests = resolve_shard_manifests(output_path)
+
+	assert resolve_shard_video_paths(output_path, shard_manifests) == [ get_test_output_file('output-shard-1-of-2.mp4'), get_test_output_file('output-shard-2-of-2.mp4') ]
+	assert validate_shard_manifests(target_path, output_path, shard_manifests) is True
+	assert validate_shard_manifests(target_path, output_path, shard_manifests[:1]) is False
+	assert validate_shard_manifests(get_test_example_file('source.jpg'), output_path, shard_manifests) is False
+	assert validate_shard_manifests(target_path, output_path, [ shard_manifests[0], create_test_shard_manifest(2, 280, 540) ]) is False
+	assert validate_shard_manifests(target_path, output_path, []) is False
@@ -1,12 +1,14 @@
 import os.path
 import tempfile
+from unittest.mock import patch
 
 import pytest
 
 from ffedit import state_manager
 from ffedit.download import conditional_download
-from ffedit.temp_helper import get_temp_directory_path, get_temp_file_path, get_temp_frames_pattern
-from .helper import get_test_example_file, get_test_examples_directory
+from ffedit.filesystem import create_directory
+from ffedit.temp_helper import balance_temp_memory, clear_temp_directory, create_temp_directory, estimate_temp_frames_size, get_temp_directory_path, get_temp_disk_directory_path, get_temp_file_path, get_temp_frames_pattern, get_temp_memory_reservations, resolve_temp_frame_paths, spill_temp_frames
+from .helper import get_test_example_file, get_test_examples_directory, get_test_output_file, prepare_test_output_directory
 
 
 @pytest.fixture(scope = 'module', autouse = True)
@@ -17,6 +19,7 @@ def before_all() -> None:
 	])
 	state_manager.init_item('temp_path', tempfile.gettempdir())
 	state_manager.init_item('temp_frame_format', 'png')
+	state_manager.init_item('temp_memory_limit', 0)
 
 
 def test_get_temp_file_path() -> None:
@@ -32,3 +35,115 @@ def test_get_temp_directory_path() -> None:
 def test_get_temp_frames_pattern() -> None:
 	temp_directory = tempfile.gettempdir()
 	assert get_temp_frames_pattern(get_test_example_file('target-240p.mp4'), '%04d') == os.path.join(temp_directory, 'ffedit', 'target-240p', '%04d.png')
+
+
+def test_get_temp_directory_path_cache() -> None:
+	target_path = get_test_example_file('target-240p.mp4')
+
+	with patch('ffedit.temp_helper.resolve_temp_directory_path', return_value = get_test_output_file('shm')) as resolve_method:
+		clear_temp_directory(target_path)
+		get_temp_directory_path(target_path)
+		get_temp_directory_path(target_path)
+
+		assert resolve_method.call_count == 1
+
+		clear_temp_directory(target_path)
+		get_temp_directory_path(target_path)
+
+		assert resolve_method.call_count == 2
+
+	clear_temp_directory(target_path)
+
+
+def test_estimate_temp_frames_size() -> None:
+	assert estimate_temp_frames_size((452, 240), 10, 1) == 452 * 240 * 3 * 10
+	assert estimate_temp_frames_size((452, 240), 10, 4) == 452 * 240 * 3 * 10 * 16
+
+
+def test_create_temp_directory() -> None:
+	prepare_test_output_directory()
+	create_directory(get_test_output_file('shm'))
+	state_manager.init_item('temp_memory_limit', 1)
+	first_target_path = get_test_example_file('target-240p.mp4')
+	second_target_path = get_test_example_file('target-1080p.mp4')
+
+	with patch('ffedit.temp_helper.TEMP_MEMORY_PATH', get_test_output_file('shm')):
+		assert create_temp_directory(first_target_path, 600 * 1024 ** 2) is True
+		assert create_temp_directory(second_target_path, 600 * 1024 ** 2) is True
+		assert get_temp_directory_path(first_target_path).startswith(get_test_output_file('shm'))
+		assert get_temp_directory_path(second_target_path).startswith(get_test_output_file('shm'))
+		assert sorted(get_temp_memory_reservations().values()) == [ 424 * 1024 ** 2, 600 * 1024 ** 2 ]
+
+		clear_temp_directory(first_target_path)
+		clear_temp_directory(second_target_path)
+
+		assert get_temp_memory_reservations() == {}
+
+		state_manager.init_item('temp_frame_format', 'raw')
+
+		assert create_temp_directory(first_target_path, 2 * 1024 ** 3) is True
+		assert get_temp_directory_path(first_target_path) == get_temp_disk_directory_path(first_target_path)
+
+		clear_temp_directory(first_target_path)
+		state_manager.init_item('temp_frame_format', 'png')
+
+	state_manager.init_item('temp_memory_limit', 0)
+
+
+def test_spill_temp_frames() -> None:
+	prepare_test_output_directory()
+	create_directory(get_test_output_file('shm'))
+	state_manager.init_item('temp_memory_limit', 1)
+	target_path = get_test_example_file('target-240p.mp4')
+	temp_frame_size = 400 * 1024 ** 2
+
+	with patch('ffedit.temp_helper.TEMP_MEMORY_PATH', get_test_output_file('shm')):
+		create_temp_directory(target_path, 5 * temp_frame_size)
+
+		assert spill_temp_frames(target_path, 5, temp_frame_size) is True
+
+		temp_frames_pattern = get_temp_frames_pattern(target_path, '%08d')
+
+		for frame_number in range(1, 5):
+			with open(temp_frames_pattern % frame_number, 'wb') as temp_frame_file:
+				temp_frame_file.write(b'0' * 1024)
+
+		assert [ os.path.islink(temp_frame_path) for temp_frame_path in resolve_temp_frame_paths(target_path) ] == [ False, False, True, True, True ]
+		assert os.path.isfile(os.path.join(get_temp_disk_directory_path(target_path), '00000003.png')) is True
+
+		assert balance_temp_memory(target_path) is True
+		assert resolve_temp_frame_paths(target_path) == [ temp_frames_pattern % frame_number for frame_number in range(1, 5) ]
+
+		clear_temp_directory(target_path)
+
+	state_manager.init_item('temp_memory_limit', 0)
+
+
+def test_balance_temp_memory() -> None:
+	prepare_test_output_directory()
+	create_directory(get_test_output_file('shm'))
+	state_manager.init_item('temp_memory_limit', 1)
+	target_path = get_test_example_file('target-240p.mp4')
+
+	with patch('ffedit.temp_helper.TEMP_MEMORY_PATH', get_test_output_file('shm')):
+		create_temp_directory(target_path, 1024)
+		temp_frames_pattern = get_temp_frames_pattern(target_path, '%08d')
+
+		for frame_number in range(1, 5):
+			with open(temp_frames_pattern % frame_number, 'wb') as temp_frame_file:
+				temp_frame_file.write(b'0' * 1024)
+
+		with patch('ffedit.temp_helper.calc_temp_memory_available', return_value = 2048):
+			assert balance_temp_memory(target_path) is True
+
+		assert [ os.path.islink(temp_frame_path) for temp_frame_path in resolve_temp_frame_paths(target_path) ] == [ False, False, True, True ]
+		assert list(get_temp_memory_reservations().values()) == [ 2048 ]
+
+		with open(temp_frames_pattern % 4, 'rb') as temp_frame_file:
+			assert temp_frame_file.read() == b'0' * 1024
+
+		clear_temp_directory(target_path)
+
+		assert os.path.exists(get_temp_disk_directory_path(target_path)) is False
+
+	state_manager.init_item('temp_memory_limit', 0)
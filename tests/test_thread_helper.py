@@ -0,0 +1,45 @@
+from ffedit import state_manager
+from ffedit.execution import has_execution_provider
+from ffedit.thread_helper import NULL_CONTEXT, THREAD_SEMAPHORE_SET, conditional_thread_semaphore, parse_model_limit, resolve_model_limit
+
+
+def test_parse_model_limit() -> None:
+	assert parse_model_limit('gfpgan_1.4:1') == ('gfpgan_1.4', 1)
+	assert parse_model_limit('yolo_face:12') == ('yolo_face', 12)
+	assert parse_model_limit('yolo_face:0') is None
+	assert parse_model_limit('yolo_face:-1') is None
+	assert parse_model_limit('yolo_face:invalid') is None
+	assert parse_model_limit('yolo_face') is None
+	assert parse_model_limit(':1') is None
+
+
+def test_resolve_model_limit() -> None:
+	state_manager.init_item('execution_model_limits', [ 'gfpgan_1.4:1', 'yolo_face:2', 'real_esrgan_x4:invalid' ])
+
+	assert resolve_model_limit('gfpgan_1.4') == 1
+	assert resolve_model_limit('yolo_face') == 2
+	assert resolve_model_limit('real_esrgan_x4') == 0
+	assert resolve_model_limit('inswapper_128') == 0
+
+
+def test_conditional_thread_semaphore() -> None:
+	state_manager.init_item('execution_model_limits', [ 'gfpgan_1.4:1' ])
+	THREAD_SEMAPHORE_SET.clear()
+
+	if not has_execution_provider('directml') and not has_execution_provider('rocm'):
+		assert conditional_thread_semaphore('gfpgan_1.4') is conditional_thread_semaphore('gfpgan_1.4')
+		assert conditional_thread_semaphore('gfpgan_1.4') is not NULL_CONTEXT
+		assert conditional_thread_semaphore('codeformer') is NULL_CONTEXT
+		assert conditional_thread_semaphore('yolo_face') is NULL_CONTEXT
+
+		gfpgan_semaphore = conditional_thread_semaphore('gfpgan_1.4')
+		state_manager.set_item('execution_model_limits', [ 'gfpgan_1.4:2' ])
+
+		assert conditional_thread_semaphore('gfpgan_1.4') is not gfpgan_semaphore
+		state_manager.set_item('execution_model_limits', [ 'gfpgan_1.4:1' ])
+
+		assert conditional_thread_semaphore('gfpgan_1.4') is gfpgan_semaphore
+		state_manager.set_item('execution_model_limits', [])
+
+		assert conditional_thread_semaphore('gfpgan_1.4') is NULL_CONTEXT
+	THREAD_SEMAPHORE_SET.clear()
@@ -1,9 +1,12 @@
+import os
 import subprocess
 
+import cv2
+import numpy
 import pytest
 
 from ffedit.download import conditional_download
-from ffedit.vision import calc_histogram_difference, count_trim_frame_total, count_video_frame_total, create_image_resolutions, create_video_resolutions, detect_image_resolution, detect_video_duration, detect_video_fps, detect_video_resolution, match_frame_color, normalize_resolution, pack_resolution, predict_video_frame_total, read_image, read_video_frame, restrict_image_resolution, restrict_trim_frame, restrict_video_fps, restrict_video_resolution, unpack_resolution, write_image
+from ffedit.vision import calc_fingerprint_distance, calc_histogram_difference, count_trim_frame_total, count_video_frame_total, create_frame_fingerprint, create_image_options, create_image_resolutions, create_static_tile_grid, create_tile_frames, create_video_resolutions, create_video_segments, detect_image_resolution, detect_video_duration, detect_video_fps, detect_video_resolution, has_image_writer, match_frame_color, merge_tile_frames, normalize_resolution, pack_resolution, predict_video_frame_total, read_image, read_video_frame, resize_frame, restrict_image_resolution, restrict_trim_frame, restrict_video_fps, restrict_video_resolution, unpack_resolution, write_image
 from .helper import get_test_example_file, get_test_examples_directory, get_test_output_file, prepare_test_output_directory
 
 
@@ -44,6 +47,37 @@ def test_write_image() -> None:
 
 	assert write_image(get_test_output_file('target-240p.jpg'), vision_frame) is True
 	assert write_image(get_test_output_file('目标-240p.webp'), vision_frame) is True
+	assert write_image(get_test_output_file('target-240p-low.jpg'), vision_frame, create_image_options('target-240p-low.jpg', 10)) is True
+	assert write_image(get_test_output_file('target-240p-high.jpg'), vision_frame, create_image_options('target-240p-high.jpg', 90)) is True
+	assert os.path.getsize(get_test_output_file('target-240p-low.jpg')) < os.path.getsize(get_test_output_file('target-240p-high.jpg'))
+	assert write_image(get_test_output_file('target-240p-low.png'), vision_frame, create_image_options('target-240p-low.png', 10)) is True
+	assert write_image(get_test_output_file('target-240p-high.png'), vision_frame, create_image_options('target-240p-high.png', 90)) is True
+	assert os.path.getsize(get_test_output_file('target-240p-low.png')) < os.path.getsize(get_test_output_file('target-240p-high.png'))
+	assert numpy.array_equal(read_image(get_test_output_file('target-240p-low.png')), read_image(get_test_output_file('target-240p-high.png')))
+
+
+def test_create_image_options() -> None:
+	assert create_image_options('target.jpg', 80) == [ cv2.IMWRITE_JPEG_QUALITY, 80 ]
+	assert create_image_options('target.png', 0) == [ cv2.IMWRITE_PNG_COMPRESSION, 9 ]
+	assert create_image_options('target.png', 50) == [ cv2.IMWRITE_PNG_COMPRESSION, 4 ]
+	assert create_image_options('target.png', 100) == [ cv2.IMWRITE_PNG_COMPRESSION, 0 ]
+	assert create_image_options('target.webp', 0) == [ cv2.IMWRITE_WEBP_QUALITY, 1 ]
+	assert create_image_options('target.webp', 80) == [ cv2.IMWRITE_WEBP_QUALITY, 80 ]
+	assert create_image_options('target.bmp', 80) == []
+
+
+def test_has_image_writer() -> None:
+	assert has_image_writer('target.jpg') is True
+	assert has_image_writer('target.png') is True
+	assert has_image_writer('target.invalid') is False
+
+
+def test_resize_frame() -> None:
+	vision_frame = read_image(get_test_example_file('target-240p.jpg'))
+
+	assert resize_frame(vision_frame, (426, 226)) is vision_frame
+	assert resize_frame(vision_frame, (212, 112)).shape == (112, 212, 3)
+	assert resize_frame(vision_frame, (852, 452)).shape == (452, 852, 3)
 
 
 def test_detect_image_resolution() -> None:
@@ -115,6 +149,15 @@ def test_count_trim_frame_total() -> None:
 	assert count_trim_frame_total(get_test_example_file('target-240p.mp4'), None, None) == 270
 
 
+def test_create_video_segments() -> None:
+	assert create_video_segments(0, 270, [ 0, 250 ], 1) == [ (0, 270) ]
+	assert create_video_segments(0, 270, [ 0, 60, 130, 200 ], 4) == [ (0, 60), (60, 130), (130, 200), (200, 270) ]
+	assert create_video_segments(0, 270, [ 0 ], 3) == [ (0, 90), (90, 180), (180, 270) ]
+	assert create_video_segments(100, 200, [ 0, 150, 250 ], 2) == [ (100, 150), (150, 200) ]
+	assert create_video_segments(0, 2, [ 0 ], 4) == [ (0, 1), (1, 2) ]
+	assert create_video_segments(0, 0, [ 0 ], 4) == [ (0, 0) ]
+
+
 def test_restrict_trim_frame() -> None:
 	assert restrict_trim_frame(get_test_example_file('target-240p.mp4'), 0, 200) == (0, 200)
 	assert restrict_trim_frame(get_test_example_file('target-240p.mp4'), 70, 270) == (70, 270)
@@ -171,9 +214,38 @@ def test_calc_histogram_difference() -> None:
 	assert calc_histogram_difference(source_vision_frame, target_vision_frame) < 0.5
 
 
+def test_create_frame_fingerprint() -> None:
+	assert create_frame_fingerprint(read_image(get_test_example_file('target-240p.jpg'))).shape == (64, 64)
+	assert create_frame_fingerprint(read_image(get_test_example_file('target-240p-90deg.jpg'))).shape == (64, 64)
+
+
+def test_calc_fingerprint_distance() -> None:
+	source_fingerprint = create_frame_fingerprint(read_image(get_test_example_file('target-240p.jpg')))
+	target_fingerprint = create_frame_fingerprint(read_image(get_test_example_file('target-240p-0sat.jpg')))
+
+	assert calc_fingerprint_distance(source_fingerprint, source_fingerprint) == 0
+	assert calc_fingerprint_distance(source_fingerprint, target_fingerprint) > 0
+
+
 def test_match_frame_color() -> None:
 	source_vision_frame = read_image(get_test_example_file('target-240p.jpg'))
 	target_vision_frame = read_image(get_test_example_file('target-240p-0sat.jpg'))
 	output_vision_frame = match_frame_color(source_vision_frame, target_vision_frame)
 
 	assert calc_histogram_difference(source_vision_frame, output_vision_frame) > 0.5
+
+
+def test_create_tile_frames() -> None:
+	vision_frame = numpy.random.randint(0, 255, (226, 426, 3), dtype = numpy.uint8)
+	create_static_tile_grid.cache_clear()
+	tile_vision_frames, pad_width, pad_height = create_tile_frames(vision_frame, (128, 8, 4))
+
+	assert len(tile_vision_frames) == 12
+	assert tile_vision_frames[0].shape == (128, 128, 3)
+	assert (pad_width, pad_height) == (488, 368)
+	assert numpy.array_equal(merge_tile_frames(tile_vision_frames, 426, 226, pad_width, pad_height, (128, 8, 4)), vision_frame)
+	assert create_static_tile_grid.cache_info().currsize == 1
+
+	create_tile_frames(vision_frame, (128, 8, 4))
+
+	assert create_static_tile_grid.cache_info().hits == 1